@@ -0,0 +1,69 @@
+import sys
+import time
+from dictionary.word_frequency import WordFrequency
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.loader import load_columns
+
+
+# -------------------------------------------------------------------
+# Autocomplete latency of the TST for short prefixes.
+# Compares the cached top_words lookup against walking the whole
+# subtree below the prefix node (the approach used before caching).
+#
+# python3 -m benchmark.autocomplete_latency [data fileName] [max prefix length]
+# -------------------------------------------------------------------
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.autocomplete_latency', '[data fileName] [max prefix length]')
+    sys.exit(1)
+
+
+def walk_autocomplete(agent: TernarySearchTreeDictionary, word: str) -> [WordFrequency]:
+    """
+    autocomplete by collecting every word below the prefix node and sorting them
+    @param agent, word: the tree to be searched, the prefix
+    @return: a list of (at most) 3 most-frequent words with prefix 'word'
+    """
+    ac_lst = []
+    currNode = agent.search_from_node(agent.root, word, 0)
+    if not currNode:
+        return ac_lst
+    if currNode.end_word:
+        ac_lst.append(WordFrequency(word, currNode.frequency))
+    agent.add_ac_words(currNode.middle, word, ac_lst)
+    ac_lst.sort(key=lambda wordFrequency: wordFrequency.frequency, reverse=True)
+    return ac_lst[:3]
+
+
+def time_prefixes(autocomplete, prefixes: [str]) -> float:
+    """
+    @param autocomplete, prefixes: function to be timed, prefixes to autocomplete
+    @return: mean latency in microseconds per call
+    """
+    start_time = time.perf_counter()
+    for prefix in prefixes:
+        autocomplete(prefix)
+    return (time.perf_counter() - start_time) / len(prefixes) * 1e6
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) > 3:
+        usage()
+    data_filename = args[1] if len(args) > 1 else 'sampleData200k.txt'
+    max_prefix_length = int(args[2]) if len(args) > 2 else 3
+
+    words, frequencies = load_columns(data_filename)
+    agent = TernarySearchTreeDictionary()
+    agent.build_from_columns(words, frequencies)
+
+    print(f"{'prefix length':>13} {'prefixes':>9} {'walk (us)':>12} {'cached (us)':>12} {'speedup':>9}")
+    for prefix_length in range(1, max_prefix_length + 1):
+        # Every distinct prefix of this length occurring in the data file
+        prefixes = sorted({word[:prefix_length] for word in words if len(word) >= prefix_length})
+        walk_time = time_prefixes(lambda prefix: walk_autocomplete(agent, prefix), prefixes)
+        cached_time = time_prefixes(agent.autocomplete, prefixes)
+        print(f"{prefix_length:>13} {len(prefixes):>9} {walk_time:>12.1f} {cached_time:>12.1f} {walk_time / cached_time:>8.0f}x")
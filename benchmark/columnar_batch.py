@@ -0,0 +1,75 @@
+import sys
+import time
+from dictionary.list_dictionary import ListDictionary
+from dictionary.columnar_dictionary import ColumnarDictionary, np
+from dictionary.loader import load_columns
+
+
+# -------------------------------------------------------------------
+# Offline batches on the columnar dictionary against per-word calls on the
+# list dictionary: all the S words and all the AC prefixes of a command
+# file, each answered once as a single batch (search_many and
+# autocomplete_many) and once word by word. Both answers are checked to
+# agree. Needs NumPy.
+#
+# python3 -m benchmark.columnar_batch [data fileName] [command fileName]
+# -------------------------------------------------------------------
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.columnar_batch', '[data fileName] [command fileName]')
+    sys.exit(1)
+
+
+def read_commands(command_filename: str) -> ([str], [str]):
+    """
+    @param command_filename: a command file
+    @return: (words of the S commands, prefixes of the AC commands) in file order
+    """
+    words = []
+    prefixes = []
+    with open(command_filename, 'r') as command_file:
+        for line in command_file:
+            values = line.split()
+            if len(values) == 2 and values[0] == 'S':
+                words.append(values[1])
+            elif len(values) == 2 and values[0] == 'AC':
+                prefixes.append(values[1])
+    return words, prefixes
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) > 3:
+        usage()
+    if np == None:
+        print('benchmark.columnar_batch needs NumPy')
+        sys.exit(1)
+    data_filename = args[1] if len(args) > 1 else 'sampleData200k.txt'
+    command_filename = args[2] if len(args) > 2 else 'test.in'
+
+    data_words, data_frequencies = load_columns(data_filename)
+    words, prefixes = read_commands(command_filename)
+    agents = {'list': ListDictionary(), 'columnar': ColumnarDictionary()}
+    for agent in agents.values():
+        agent.build_from_columns(data_words, data_frequencies)
+
+    print(f"{'operation':>10} {'count':>8} {'list s':>9} {'columnar s':>11} {'speedup':>8}")
+    for name, single, batch, queries in (('S', 'search', 'search_many', words),
+                                         ('AC', 'autocomplete', 'autocomplete_many', prefixes)):
+        if not queries:
+            continue
+        start_time = time.perf_counter()
+        single_results = [getattr(agents['list'], single)(query) for query in queries]
+        single_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        batch_results = getattr(agents['columnar'], batch)(queries)
+        batch_time = time.perf_counter() - start_time
+        if name == 'AC':
+            single_results = [[(entry.word, entry.frequency) for entry in result] for result in single_results]
+            batch_results = [[(entry.word, entry.frequency) for entry in result] for result in batch_results]
+        if single_results != batch_results:
+            print(f"{name}: the columnar results differ from the list results")
+        print(f"{name:>10} {len(queries):>8} {single_time:>9.3f} {batch_time:>11.3f} {single_time / batch_time:>8.1f}")
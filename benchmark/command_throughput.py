@@ -0,0 +1,84 @@
+import random
+import sys
+import time
+from dictionary.word_frequency import WordFrequency
+from benchmark.common import APPROACHES, make_agent, read_words_frequencies
+
+
+# -------------------------------------------------------------------
+# Throughput of a sampleTest.in-style S/A/D command mix.
+# The dictionary is built from the first N words of the data file, then a
+# fixed, seeded mix of searches, adds and deletes is replayed against it.
+# Half of the words touched by the mix are in the dictionary, half are not.
+#
+# python3 -m benchmark.command_throughput <approach> [data fileName] [number of commands] [input sizes...]
+# -------------------------------------------------------------------
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.command_throughput',
+          '<approach> [data fileName] [number of commands] [input sizes...]')
+    print('<approach> = <' + ' | '.join(APPROACHES) + '>')
+    sys.exit(1)
+
+
+def generate_commands(words_frequencies: [WordFrequency], input_size: int, num_commands: int) -> list:
+    """
+    generate a seeded mix of 50% S, 25% A and 25% D commands
+    @param words_frequencies, input_size, num_commands: words_frequencies[:input_size] are in the dictionary
+    @return: list of (command, WordFrequency) pairs
+    """
+    rng = random.Random(input_size)
+    present = words_frequencies[:input_size]
+    # Words of the data file that are not loaded, or made-up words when the whole file is loaded
+    absent = words_frequencies[input_size:] or [WordFrequency(entry.word + 'zz', entry.frequency)
+                                                for entry in present]
+    commands = []
+    for _ in range(num_commands):
+        entry = rng.choice(present) if rng.random() < 0.5 else rng.choice(absent)
+        roll = rng.random()
+        if roll < 0.5:
+            commands.append(('S', entry))
+        elif roll < 0.75:
+            commands.append(('A', entry))
+        else:
+            commands.append(('D', entry))
+    return commands
+
+
+def run_commands(agent, commands: list) -> float:
+    """
+    @param agent, commands: dictionary to run against, list of (command, WordFrequency) pairs
+    @return: elapsed time in seconds
+    """
+    start_time = time.perf_counter()
+    for command, entry in commands:
+        if command == 'S':
+            agent.search(entry.word)
+        elif command == 'A':
+            agent.add_word_frequency(entry)
+        else:
+            agent.delete_word(entry.word)
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) < 2 or args[1] not in APPROACHES:
+        usage()
+    approach = args[1]
+    data_filename = args[2] if len(args) > 2 else 'sampleData200k.txt'
+    num_commands = int(args[3]) if len(args) > 3 else 100000
+    input_sizes = [int(size) for size in args[4:]] or [64000, 128000, 200000]
+
+    words_frequencies = read_words_frequencies(data_filename)
+    print(f"{'input size':>10} {'commands':>9} {'seconds':>9} {'commands/s':>12}")
+    for input_size in input_sizes:
+        commands = generate_commands(words_frequencies, input_size, num_commands)
+        agent = make_agent(approach)
+        agent.build_dictionary([WordFrequency(entry.word, entry.frequency)
+                                for entry in words_frequencies[:input_size]])
+        elapsed = run_commands(agent, commands)
+        print(f"{input_size:>10} {num_commands:>9} {elapsed:>9.3f} {num_commands / elapsed:>12.0f}")
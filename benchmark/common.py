@@ -0,0 +1,24 @@
+from dictionary.word_frequency import WordFrequency
+from dictionary.loader import load_columns
+from dictionary_file_based import make_agent
+
+
+# -------------------------------------------------------------------
+# Helpers shared by the benchmark scripts. The dictionaries are created by
+# make_agent of dictionary_file_based.py and the data files are parsed by
+# dictionary.loader.load_columns, so that the benchmarks measure the same
+# implementations and loading path as the driver.
+# -------------------------------------------------------------------
+
+# names of the approaches benchmarked, as accepted by make_agent. columnar is left out: it needs the optional
+# NumPy, without which the benchmarks building every approach would fail; benchmark.columnar_batch covers it.
+APPROACHES = ('list', 'hashtable', 'tst', 'arraytst', 'radix', 'dawg')
+
+
+def read_words_frequencies(data_filename: str) -> [WordFrequency]:
+    """
+    read a data file with load_columns, for the benchmarks needing WordFrequency objects
+    @param data_filename: the data file to be read
+    @return: list of (word, frequency) in file order
+    """
+    return list(map(WordFrequency, *load_columns(data_filename)))
@@ -0,0 +1,57 @@
+import random
+import sys
+import time
+import tracemalloc
+from dictionary.dawg_dictionary import DawgDictionary
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.loader import load_columns
+from benchmark.autocomplete_latency import time_prefixes
+
+
+# -------------------------------------------------------------------
+# The static DAWG against the TST on the same data: number of states,
+# memory held after the build (as traced by tracemalloc, the columns of the
+# data file excluded for both), build time, mean search latency and mean
+# autocomplete latency by prefix length.
+#
+# python3 -m benchmark.dawg_vs_tst [data fileName] [max prefix length]
+# -------------------------------------------------------------------
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.dawg_vs_tst', '[data fileName] [max prefix length]')
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) > 3:
+        usage()
+    data_filename = args[1] if len(args) > 1 else 'sampleData200k.txt'
+    max_prefix_length = int(args[2]) if len(args) > 2 else 4
+
+    words, frequencies = load_columns(data_filename)
+    agents = {}
+    print(f"{'approach':>8} {'MB':>7} {'build s':>8}")
+    for name, agent_class in (('tst', TernarySearchTreeDictionary), ('dawg', DawgDictionary)):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        agent = agent_class()
+        agent.build_from_columns(words, frequencies)
+        elapsed = time.perf_counter() - start_time
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        agents[name] = agent
+        print(f"{name:>8} {memory / 1e6:>7.1f} {elapsed:>8.2f}")
+    print(f"dawg states: {agents['dawg'].automaton.num_states}, edges: {len(agents['dawg'].automaton.edge_letter)}")
+
+    rng = random.Random(0)
+    sample = rng.sample(words, min(2000, len(words)))
+    print(f"\n{'operation':>13} " + ' '.join(f"{name + ' us':>9}" for name in agents))
+    print(f"{'search':>13} " + ' '.join(f"{time_prefixes(agent.search, sample):>9.2f}" for agent in agents.values()))
+    for length in range(1, max_prefix_length + 1):
+        prefixes = [word[:length] for word in sample]
+        print(f"{'AC ' + str(length):>13} " + ' '.join(f"{time_prefixes(agent.autocomplete, prefixes):>9.2f}"
+                                                      for agent in agents.values()))
@@ -0,0 +1,88 @@
+import random
+import sys
+import time
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.loader import load_columns
+from benchmark.autocomplete_latency import time_prefixes
+
+
+# -------------------------------------------------------------------
+# Latency of TST fuzzy_autocomplete against exact autocomplete, by prefix
+# length: prefixes of sampled words are mistyped by one substituted letter
+# and autocompleted within 1 and 2 edits, next to the exact autocomplete of
+# the correct prefixes. Also reports how often the intended word comes out
+# of the fuzzy autocomplete when the exact one returns it.
+#
+# python3 -m benchmark.fuzzy_latency [data fileName] [max prefix length]
+# -------------------------------------------------------------------
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.fuzzy_latency', '[data fileName] [max prefix length]')
+    sys.exit(1)
+
+
+def mistype(prefix: str, rng: random.Random) -> str:
+    """
+    @param prefix, rng: a prefix and the random generator choosing the typo
+    @return: the prefix with one letter replaced by a different one
+    """
+    position = rng.randrange(len(prefix))
+    letter = rng.choice([letter for letter in ALPHABET if letter != prefix[position]])
+    return prefix[:position] + letter + prefix[position + 1:]
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) > 3:
+        usage()
+    data_filename = args[1] if len(args) > 1 else 'sampleData200k.txt'
+    max_prefix_length = int(args[2]) if len(args) > 2 else 6
+
+    data_words, data_frequencies = load_columns(data_filename)
+    agent = TernarySearchTreeDictionary()
+    agent.build_from_columns(data_words, data_frequencies)
+    rng = random.Random(0)
+
+    print(f"{'prefix length':>13} {'exact us':>9} {'1 edit us':>10} {'2 edits us':>11} {'x exact':>8} {'recall':>7}")
+    for prefix_length in range(3, max_prefix_length + 1):
+        words = [word for word in data_words if len(word) >= prefix_length]
+        sample = rng.sample(words, min(500, len(words)))
+        prefixes = [word[:prefix_length] for word in sample]
+        typos = [mistype(prefix, rng) for prefix in prefixes]
+        exact = time_prefixes(agent.autocomplete, prefixes)
+        fuzzy = [time_prefixes(lambda typo: agent.fuzzy_autocomplete(typo, max_edits), typos)
+                 for max_edits in (1, 2)]
+        # Among the prefixes whose exact autocomplete returns the most frequent word, how often one edit finds it
+        found = 0
+        expected = 0
+        for prefix, typo in zip(prefixes, typos):
+            top = agent.autocomplete(prefix)[:1]
+            if top:
+                expected += 1
+                found += top[0] in agent.fuzzy_autocomplete(typo, 1)
+        print(f"{prefix_length:>13} {exact:>9.2f} {fuzzy[0]:>10.1f} {fuzzy[1]:>11.1f} {fuzzy[0] / exact:>8.0f} "
+              f"{found / expected if expected else 0:>7.2f}")
+
+    # The brute-force alternative: the prefix-edit distance to every word of the dictionary
+    typo = mistype(rng.choice(words)[:4], rng)
+    start_time = time.perf_counter()
+    matches = 0
+    for word in data_words:
+        row = list(range(len(typo) + 1))
+        best = row[-1]
+        for letter in word:
+            nextRow = [row[0] + 1]
+            for currIdx in range(1, len(row)):
+                nextRow.append(min(nextRow[currIdx - 1] + 1, row[currIdx] + 1,
+                                   row[currIdx - 1] + (typo[currIdx - 1] != letter)))
+            row = nextRow
+            best = min(best, row[-1])
+        matches += best <= 1
+    print(f"\nbrute force, one 4-letter prefix within 1 edit: {(time.perf_counter() - start_time) * 1e3:.0f} ms "
+          f"({matches} matching words)")
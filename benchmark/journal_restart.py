@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from dictionary.journal import MutationJournal, JournaledDictionary
+from dictionary.hashtable_dictionary import HashTableDictionary
+from dictionary.loader import load_columns
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------------------------
+# Cost of the mutation journal: the time to record changes by the number of
+# changes per group commit (one write and fsync per group), and the restart
+# time (loading the base file and replaying the journal) after a growing
+# number of changes, with and without compaction. Changes alternate between
+# deleting a word of the data file and adding it back with a new frequency.
+# The hashtable dictionary is used, so that replay costs little per change.
+#
+# python3 -m benchmark.journal_restart [data fileName] [max number of changes]
+# -------------------------------------------------------------------
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.journal_restart', '[data fileName] [max number of changes]')
+    sys.exit(1)
+
+
+def start(journal: MutationJournal) -> JournaledDictionary:
+    """
+    @param journal: a journal
+    @return: a dictionary built from its base file with the journal replayed
+    """
+    agent = HashTableDictionary()
+    agent.build_from_columns(*load_columns(journal.base_filename()))
+    journal.replay(agent)
+    return JournaledDictionary(agent, journal)
+
+
+def apply_changes(agent: JournaledDictionary, words: [str], num_changes: int, rng: random.Random):
+    """
+    delete a sampled word and add it back, num_changes / 2 times
+    """
+    for word in rng.sample(words, num_changes // 2):
+        agent.delete_word(word)
+        agent.add_word_frequency(WordFrequency(word, rng.randint(1, 1000000)))
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) > 3:
+        usage()
+    data_filename = args[1] if len(args) > 1 else 'sampleData200k.txt'
+    max_changes = int(args[2]) if len(args) > 2 else 200000
+
+    words = load_columns(data_filename)[0]
+    max_changes = min(max_changes, 2 * len(words))
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'fsync batch':>11} {'changes':>8} {'record us':>10}")
+        num_changes = min(max_changes, 20000)
+        for sync_every in (1, 16, 256):
+            journal = MutationJournal(os.path.join(directory, f"sync{sync_every}"), data_filename, sync_every)
+            agent = start(journal)
+            start_time = time.perf_counter()
+            apply_changes(agent, words, num_changes, rng)
+            journal.close()
+            elapsed = time.perf_counter() - start_time
+            print(f"{sync_every:>11} {num_changes:>8} {elapsed / num_changes * 1e6:>10.1f}")
+
+        print(f"\n{'changes':>8} {'compaction':>10} {'journal lines':>13} {'restart s':>10}")
+        num_changes = 12500
+        while num_changes <= max_changes:
+            for compact_size in (max_changes + 1, 1 << 14):
+                journal_filename = os.path.join(directory, f"restart{num_changes}-{compact_size}")
+                journal = MutationJournal(journal_filename, data_filename, 256, compact_size)
+                apply_changes(start(journal), words, num_changes, rng)
+                journal.close()
+                start_time = time.perf_counter()
+                journal = MutationJournal(journal_filename, data_filename, 256, compact_size)
+                start(journal)
+                elapsed = time.perf_counter() - start_time
+                journal.close()
+                with open(journal_filename, 'r') as journal_file:
+                    num_lines = sum(1 for _ in journal_file)
+                print(f"{num_changes:>8} {'yes' if compact_size <= max_changes else 'no':>10} {num_lines:>13} "
+                      f"{elapsed:>10.3f}")
+            num_changes *= 2
@@ -0,0 +1,49 @@
+import sys
+import time
+from dictionary.loader import load_columns
+from benchmark.common import APPROACHES, make_agent, read_words_frequencies
+
+
+# -------------------------------------------------------------------
+# Data file loading with dictionary.loader.load_columns, in lines/second,
+# with and without turning the columns into WordFrequency objects,
+# followed by the startup time (load + build) of every approach building
+# from the objects with build_dictionary and from the columns with
+# build_from_columns.
+#
+# python3 -m benchmark.loader_throughput [data fileName] [repeats]
+# -------------------------------------------------------------------
+
+def best_time(function, repeats: int) -> float:
+    """
+    @param function, repeats: function to be timed, number of runs
+    @return: the fastest run in seconds
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    data_filename = args[1] if len(args) > 1 else 'sampleData200k.txt'
+    repeats = int(args[2]) if len(args) > 2 else 3
+
+    num_lines = len(load_columns(data_filename)[0])
+    objects_time = best_time(lambda: read_words_frequencies(data_filename), repeats)
+    columns_time = best_time(lambda: load_columns(data_filename), repeats)
+    print(f"{'loader':<14} {'seconds':>9} {'lines/s':>12}")
+    print(f"{'objects':<14} {objects_time:>9.3f} {num_lines / objects_time:>12.0f}")
+    print(f"{'load_columns':<14} {columns_time:>9.3f} {num_lines / columns_time:>12.0f}")
+
+    print()
+    print(f"{'approach':<10} {'objects startup (s)':>20} {'columns startup (s)':>20}")
+    for approach in APPROACHES:
+        objects_startup = best_time(lambda: make_agent(approach).build_dictionary(
+            read_words_frequencies(data_filename)), 1)
+        columns_startup = best_time(lambda: make_agent(approach).build_from_columns(
+            *load_columns(data_filename)), 1)
+        print(f"{approach:<10} {objects_startup:>20.3f} {columns_startup:>20.3f}")
@@ -0,0 +1,222 @@
+import gc
+import getopt
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from benchmark.common import APPROACHES, make_agent, read_words_frequencies
+from benchmark.scenarios import INPUT_SIZES, copy_entries, summarise, regressions
+
+
+# -------------------------------------------------------------------
+# Memory footprint of the dictionaries built from a generation dataset at
+# the standard input sizes. Every (approach, input size) is measured in a
+# fresh process, so that the resident set size starts from the same
+# interpreter state. The dictionary is built twice there:
+#
+#   once untraced, with a thread sampling the resident set size (RSS):
+#              rss_peak      highest RSS during the build, over the RSS before
+#              rss_retained  RSS after the build, over the RSS before
+#              objects       number of objects reachable from the dictionary
+#   once under tracemalloc:
+#              traced        bytes allocated by the build and still held
+#              traced_peak   highest bytes allocated during the build
+#              bytes_per_word  traced / input size
+#              hot_spots     source lines holding the most traced bytes
+#
+# Each measure is reported per input size with the least-squares slope of
+# log2(bytes) over log2(size), as the time measures of benchmark.scenarios,
+# and a baseline (the JSON output of a previous run) is checked the same
+# way. The list of entries given to build_dictionary is created within both
+# measures, so the entries count for the dictionaries keeping them only.
+# RSS is read from /proc/self/statm and left out where it is missing.
+#
+# python3 -m benchmark.memory_profile [-d dataset number] [-n input sizes] [-k number of hot spots]
+#                                     [-o output fileName] [-b baseline fileName] [-s slope tolerance]
+#                                     [-t memory tolerance] [approach ...]
+# -------------------------------------------------------------------
+
+# seconds between two samples of the resident set size during a build
+RSS_INTERVAL = 0.001
+# number of most frequent object types reported per input size
+NUM_OBJECT_TYPES = 5
+
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.memory_profile', '[-d dataset number] [-n input sizes] [-k number of hot spots]',
+          '[-o output fileName] [-b baseline fileName] [-s slope tolerance] [-t memory tolerance] [approach ...]')
+    print('<approach> = <' + ' | '.join(APPROACHES) + '>, all of them by default')
+    print('-d: build from generation/dataset<number>.txt (default 0)')
+    print('-n: comma-separated input sizes (default ' + ','.join(str(size) for size in INPUT_SIZES) + ')')
+    print('-k: number of allocation hot spots reported per input size (default 5)')
+    print('-o: write the results as JSON to the file instead of the standard output')
+    print('-b: fail if a slope or the memory at the largest size regressed against the baseline results')
+    print('-s, -t: allowed slope increase and relative memory increase (default 0.25 and 0.2)')
+    sys.exit(1)
+
+
+def current_rss() -> int:
+    """
+    @return: the resident set size of this process in bytes, None if /proc/self/statm is missing
+    """
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return None
+
+
+def sample_rss(stop: threading.Event, peak: list):
+    """
+    body of the sampling thread: keep the highest resident set size in peak[0] until stop is set
+    """
+    while not stop.wait(RSS_INTERVAL):
+        peak[0] = max(peak[0], current_rss())
+
+
+def object_counts(agent) -> Counter:
+    """
+    @param agent: a dictionary
+    @return: number of objects reachable from it per type name, classes and modules excluded
+    """
+    counts = Counter()
+    seen = {id(agent)}
+    stack = [agent]
+    while stack:
+        obj = stack.pop()
+        counts[type(obj).__name__] += 1
+        for referent in gc.get_referents(obj):
+            if id(referent) not in seen and not isinstance(referent, (type, type(sys))):
+                seen.add(id(referent))
+                stack.append(referent)
+    return counts
+
+
+def measure(approach: str, dataset: int, input_size: int, num_hot_spots: int) -> dict:
+    """
+    build a dictionary of the approach from the first input_size words of the dataset, see the module comment
+    @return: {measure name: value}
+    """
+    entries = read_words_frequencies(f"generation/dataset{dataset}.txt")[:input_size]
+    result = {}
+
+    # Untraced build with RSS sampling
+    gc.collect()
+    rss_before = current_rss()
+    agent = make_agent(approach)
+    if rss_before != None:
+        peak = [rss_before]
+        stop = threading.Event()
+        sampler = threading.Thread(target=sample_rss, args=(stop, peak), daemon=True)
+        sampler.start()
+        agent.build_dictionary(copy_entries(entries))
+        gc.collect()
+        stop.set()
+        sampler.join()
+        rss_after = current_rss()
+        result['rss_peak'] = max(peak[0], rss_after) - rss_before
+        result['rss_retained'] = rss_after - rss_before
+    else:
+        agent.build_dictionary(copy_entries(entries))
+    counts = object_counts(agent)
+    result['objects'] = sum(counts.values())
+    result['object_types'] = dict(counts.most_common(NUM_OBJECT_TYPES))
+    del agent
+    gc.collect()
+
+    # Traced build
+    tracemalloc.start()
+    agent = make_agent(approach)
+    agent.build_dictionary(copy_entries(entries))
+    gc.collect()
+    traced, traced_peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    result['traced'] = traced
+    result['traced_peak'] = traced_peak
+    result['bytes_per_word'] = traced / input_size
+    result['hot_spots'] = [{'line': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                            'bytes': stat.size, 'blocks': stat.count}
+                           for stat in snapshot.statistics('lineno')[:num_hot_spots]]
+    return result
+
+
+def profile_approach(pool, approach: str, dataset: int, input_sizes: [int], num_hot_spots: int) -> (dict, dict):
+    """
+    @return: ({measure name: summary}, {input size: hot spots and object types})
+    """
+    per_size = pool.starmap(measure, [(approach, dataset, input_size, num_hot_spots) for input_size in input_sizes])
+    results = {}
+    for name in ('traced', 'traced_peak', 'bytes_per_word', 'rss_peak', 'rss_retained', 'objects'):
+        if all(name in measures for measures in per_size):
+            results[f"memory/{name}"] = summarise(input_sizes, [[measures[name] for measures in per_size]])
+    details = {input_size: {'hot_spots': measures['hot_spots'], 'object_types': measures['object_types']}
+               for input_size, measures in zip(input_sizes, per_size)}
+    print(f"{approach} done", file=sys.stderr)
+    return results, details
+
+
+if __name__ == '__main__':
+    try:
+        optList, approaches = getopt.gnu_getopt(sys.argv[1:], "d:n:k:o:b:s:t:")
+    except getopt.GetoptError as err:
+        print(str(err))
+        usage()
+
+    dataset = 0
+    input_sizes = INPUT_SIZES
+    num_hot_spots = 5
+    output_filename = None
+    baseline_filename = None
+    slope_tolerance = 0.25
+    memory_tolerance = 0.2
+    for opt, arg in optList:
+        if opt == '-d':
+            dataset = int(arg)
+        elif opt == '-n':
+            input_sizes = sorted(int(size) for size in arg.split(','))
+        elif opt == '-k':
+            num_hot_spots = int(arg)
+        elif opt == '-o':
+            output_filename = arg
+        elif opt == '-b':
+            baseline_filename = arg
+        elif opt == '-s':
+            slope_tolerance = float(arg)
+        elif opt == '-t':
+            memory_tolerance = float(arg)
+
+    approaches = approaches or list(APPROACHES)
+    if any(approach not in APPROACHES for approach in approaches):
+        usage()
+
+    # A fresh process per measurement: a worker exits after each task
+    with multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+        profiles = {approach: profile_approach(pool, approach, dataset, input_sizes, num_hot_spots)
+                    for approach in approaches}
+    report = {
+        'config': {'dataset': dataset, 'python': sys.version.split()[0]},
+        'results': {approach: results for approach, (results, _) in profiles.items()},
+        'details': {approach: details for approach, (_, details) in profiles.items()},
+    }
+    if output_filename != None:
+        with open(output_filename, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if baseline_filename != None:
+        with open(baseline_filename, 'r') as baseline_file:
+            baseline = json.load(baseline_file)
+        failures = regressions(report['results'], baseline['results'], slope_tolerance, memory_tolerance, ' bytes')
+        for failure in failures:
+            print('REGRESSION', failure, file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print('No regression against', baseline_filename, file=sys.stderr)
@@ -0,0 +1,71 @@
+import random
+import sys
+import time
+import tracemalloc
+from dictionary.radixtree_dictionary import RadixTreeDictionary
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.loader import load_columns
+from benchmark.autocomplete_latency import time_prefixes
+
+
+# -------------------------------------------------------------------
+# Structure of the radix tree against the TST on the same data: number of
+# nodes, memory held after the build (as traced by tracemalloc, the
+# columns given to build_from_columns included for both), build
+# time, and mean autocomplete latency by prefix length.
+#
+# python3 -m benchmark.radix_vs_tst [data fileName] [max prefix length]
+# -------------------------------------------------------------------
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.radix_vs_tst', '[data fileName] [max prefix length]')
+    sys.exit(1)
+
+
+def tst_node_count(agent: TernarySearchTreeDictionary) -> int:
+    """
+    @param agent: a tree
+    @return: the number of nodes holding a letter
+    """
+    count = 0
+    stack = [agent.root]
+    while stack:
+        currNode = stack.pop()
+        if currNode != None and currNode.letter != None:
+            count += 1
+            stack.extend((currNode.left, currNode.middle, currNode.right))
+    return count
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) > 3:
+        usage()
+    data_filename = args[1] if len(args) > 1 else 'sampleData200k.txt'
+    max_prefix_length = int(args[2]) if len(args) > 2 else 4
+
+    agents = {}
+    print(f"{'approach':>8} {'nodes':>9} {'MB':>7} {'build s':>8}")
+    for name, agent_class, node_count in (('tst', TernarySearchTreeDictionary, tst_node_count),
+                                          ('radix', RadixTreeDictionary, RadixTreeDictionary.node_count)):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        agent = agent_class()
+        agent.build_from_columns(*load_columns(data_filename))
+        elapsed = time.perf_counter() - start_time
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        agents[name] = agent
+        print(f"{name:>8} {node_count(agent):>9} {memory / 1e6:>7.1f} {elapsed:>8.2f}")
+
+    words = load_columns(data_filename)[0]
+    rng = random.Random(0)
+    sample = rng.sample(words, min(2000, len(words)))
+    print(f"\n{'prefix length':>13} " + ' '.join(f"{name + ' us':>9}" for name in agents))
+    for length in range(1, max_prefix_length + 1):
+        prefixes = [word[:length] for word in sample]
+        print(f"{length:>13} " + ' '.join(f"{time_prefixes(agent.autocomplete, prefixes):>9.2f}"
+                                           for agent in agents.values()))
@@ -0,0 +1,307 @@
+import getopt
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from dictionary.word_frequency import WordFrequency
+from benchmark.common import APPROACHES, make_agent, read_words_frequencies
+
+
+# -------------------------------------------------------------------
+# The growing, shrinking and static scenarios of the empirical analysis,
+# plus per-operation microbenchmarks, at the standard input sizes.
+#
+#   growing    add the words of a dataset one by one; cumulative time when
+#              the dictionary reaches each input size
+#   shrinking  delete every word of a full dictionary in shuffled order;
+#              cumulative time when each input size of words is deleted
+#   static     build a dictionary of each input size, then search the words
+#              at even indices (found) and as many words of another dataset
+#              (not found)
+#   micro      mean seconds per search, autocomplete, delete and add on a
+#              dictionary of each input size
+#
+# Every benchmark is run for warmup + repeats trials, and the warmup trials
+# are discarded. The median and spread of the trials are reported per input
+# size, along with the least-squares slope of log2(time) over log2(size),
+# i.e. the fitted growth exponent. Given a baseline (the JSON output of a
+# previous run), the run fails when a slope grows by more than the slope
+# tolerance or the time at the largest size by more than the time tolerance.
+#
+# python3 -m benchmark.scenarios [-d dataset number] [-n input sizes] [-r repeats] [-w warmup]
+#                                [-o output fileName] [-b baseline fileName] [-s slope tolerance]
+#                                [-t time tolerance] <approach> ...
+# -------------------------------------------------------------------
+
+INPUT_SIZES = [250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000]
+NUM_DATASETS = 3
+MICRO_SAMPLE_SIZE = 1000
+
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.scenarios', '[-d dataset number] [-n input sizes] [-r repeats] [-w warmup]',
+          '[-o output fileName] [-b baseline fileName] [-s slope tolerance] [-t time tolerance] <approach> ...')
+    print('<approach> = <' + ' | '.join(APPROACHES) + '>')
+    print('-d: use generation/dataset<number>.txt and generation/shuffled_dataset<number>.txt (default 0)')
+    print('-n: comma-separated input sizes (default ' + ','.join(str(size) for size in INPUT_SIZES) + ')')
+    print('-r, -w: number of measured and discarded trials (default 5 and 1)')
+    print('-o: write the results as JSON to the file instead of the standard output')
+    print('-b: fail if a slope or the time at the largest size regressed against the baseline results')
+    print('-s, -t: allowed slope increase and relative time increase (default 0.25 and 0.5)')
+    sys.exit(1)
+
+
+def cumulative_times(operation, entries: list, input_sizes: [int]) -> [float]:
+    """
+    apply operation to entries in order, timing each stretch between two input sizes
+    @param operation, entries, input_sizes: function applied to each entry, entries, checkpoints in entries
+    @return: the accumulated time after each checkpoint
+    """
+    times = []
+    elapsed = 0
+    done = 0
+    for input_size in input_sizes:
+        stretch = entries[done:input_size]
+        start_time = time.perf_counter()
+        for entry in stretch:
+            operation(entry)
+        elapsed += time.perf_counter() - start_time
+        done = input_size
+        times.append(elapsed)
+    return times
+
+
+def time_each(operation, entries: list) -> float:
+    """
+    @param operation, entries: function applied to each entry, entries
+    @return: elapsed time in seconds
+    """
+    start_time = time.perf_counter()
+    for entry in entries:
+        operation(entry)
+    return time.perf_counter() - start_time
+
+
+def copy_entries(entries: [WordFrequency]) -> [WordFrequency]:
+    """
+    @param entries: list of (word, frequency)
+    @return: fresh copies, so that a trial cannot see objects kept by a previous dictionary
+    """
+    return [WordFrequency(entry.word, entry.frequency) for entry in entries]
+
+
+def growing(approach: str, data: dict, input_sizes: [int]) -> dict:
+    """
+    Scenario 1: cumulative time of adding the words of the dataset
+    @return: {benchmark name: time per input size}
+    """
+    agent = make_agent(approach)
+    entries = copy_entries(data['words'][:input_sizes[-1]])
+    return {'growing/add': cumulative_times(agent.add_word_frequency, entries, input_sizes)}
+
+
+def shrinking(approach: str, data: dict, input_sizes: [int]) -> dict:
+    """
+    Scenario 2: cumulative time of deleting the words of a full dictionary in shuffled order
+    @return: {benchmark name: time per input size}
+    """
+    agent = make_agent(approach)
+    entries = copy_entries(data['words'][:input_sizes[-1]])
+    agent.build_dictionary(entries)
+    # the shuffled file covers the whole dataset, keep the order of the words actually in the dictionary
+    in_dictionary = {entry.word for entry in entries}
+    words = [entry.word for entry in data['shuffled'] if entry.word in in_dictionary]
+    return {'shrinking/delete': cumulative_times(agent.delete_word, words, input_sizes)}
+
+
+def static(approach: str, data: dict, input_sizes: [int]) -> dict:
+    """
+    Scenario 3: searches of found and not found words on a dictionary of each input size
+    @return: {benchmark name: time per input size}
+    """
+    found_times = []
+    not_found_times = []
+    for input_size in input_sizes:
+        agent = make_agent(approach)
+        agent.build_dictionary(copy_entries(data['words'][:input_size]))
+        found = [entry.word for entry in data['words'][:input_size:2]]
+        not_found = [entry.word for entry in data['other'][:input_size:2]]
+        found_times.append(time_each(agent.search, found))
+        not_found_times.append(time_each(agent.search, not_found))
+    return {'static/search_found': found_times, 'static/search_not_found': not_found_times}
+
+
+def micro(approach: str, data: dict, input_sizes: [int]) -> dict:
+    """
+    mean time per operation on a dictionary of each input size, deleting then re-adding the sampled words
+    @return: {benchmark name: time per input size}
+    """
+    results = {'micro/search': [], 'micro/autocomplete': [], 'micro/delete': [], 'micro/add': []}
+    for input_size in input_sizes:
+        entries = copy_entries(data['words'][:input_size])
+        agent = make_agent(approach)
+        agent.build_dictionary(entries)
+        sample = random.Random(input_size).sample(entries, min(MICRO_SAMPLE_SIZE, input_size))
+        words = [entry.word for entry in sample]
+        prefixes = [word[:max(1, len(word) // 2)] for word in words]
+        results['micro/search'].append(time_each(agent.search, words) / len(words))
+        results['micro/autocomplete'].append(time_each(agent.autocomplete, prefixes) / len(prefixes))
+        results['micro/delete'].append(time_each(agent.delete_word, words) / len(words))
+        results['micro/add'].append(time_each(agent.add_word_frequency, sample) / len(sample))
+    return results
+
+
+SCENARIOS = [growing, shrinking, static, micro]
+
+
+def fit_slope(input_sizes: [int], times: [float]) -> float:
+    """
+    least-squares slope of log2(time) over log2(input size), ignoring non-positive times
+    @param input_sizes, times: measured points
+    @return: the fitted growth exponent, None if fewer than 2 points are usable
+    """
+    points = [(math.log2(size), math.log2(seconds)) for size, seconds in zip(input_sizes, times) if seconds > 0]
+    if len(points) < 2:
+        return None
+    meanX = sum(x for x, _ in points) / len(points)
+    meanY = sum(y for _, y in points) / len(points)
+    sxx = sum((x - meanX) ** 2 for x, _ in points)
+    sxy = sum((x - meanX) * (y - meanY) for x, y in points)
+    return sxy / sxx if sxx > 0 else None
+
+
+def summarise(input_sizes: [int], trials: [[float]]) -> dict:
+    """
+    @param input_sizes, trials: input sizes, one list of times per trial
+    @return: median, min, max and standard deviation per input size and the slope of the medians
+    """
+    per_size = list(zip(*trials))
+    medians = [statistics.median(times) for times in per_size]
+    return {
+        'sizes': input_sizes,
+        'median': medians,
+        'min': [min(times) for times in per_size],
+        'max': [max(times) for times in per_size],
+        'stdev': [statistics.stdev(times) if len(times) > 1 else 0.0 for times in per_size],
+        'slope': fit_slope(input_sizes, medians),
+    }
+
+
+def run_approach(approach: str, data: dict, input_sizes: [int], repeats: int, warmup: int) -> dict:
+    """
+    @return: {benchmark name: summary} for every benchmark of every scenario
+    """
+    results = {}
+    for scenario in SCENARIOS:
+        trials = {}
+        for trial in range(warmup + repeats):
+            for name, times in scenario(approach, data, input_sizes).items():
+                if trial >= warmup:
+                    trials.setdefault(name, []).append(times)
+        for name, times in trials.items():
+            results[name] = summarise(input_sizes, times)
+        print(f"{approach} {scenario.__name__} done", file=sys.stderr)
+    return results
+
+
+def regressions(results: dict, baseline: dict, slope_tolerance: float, time_tolerance: float,
+                unit: str = 's') -> [str]:
+    """
+    compare results against a baseline run, benchmark by benchmark
+    @param results, baseline: {approach: {benchmark name: summary}}
+    @param slope_tolerance, time_tolerance: allowed slope increase, allowed relative increase of the median
+    @param unit: unit of the medians in the descriptions, seconds by default
+    @return: a description of every regression
+    """
+    failures = []
+    for approach, benchmarks in results.items():
+        for name, summary in benchmarks.items():
+            base = baseline.get(approach, {}).get(name)
+            if base == None:
+                continue
+            if summary['slope'] != None and base['slope'] != None \
+                    and summary['slope'] > base['slope'] + slope_tolerance:
+                failures.append(f"{approach} {name}: slope {summary['slope']:.3f} > "
+                                f"baseline {base['slope']:.3f} + {slope_tolerance}")
+            common_sizes = set(summary['sizes']) & set(base['sizes'])
+            if common_sizes:
+                size = max(common_sizes)
+                current = summary['median'][summary['sizes'].index(size)]
+                previous = base['median'][base['sizes'].index(size)]
+                if current > previous * (1 + time_tolerance):
+                    failures.append(f"{approach} {name}: {current:.6g}{unit} at {size} > "
+                                    f"baseline {previous:.6g}{unit} * {1 + time_tolerance}")
+    return failures
+
+
+if __name__ == '__main__':
+    try:
+        optList, approaches = getopt.gnu_getopt(sys.argv[1:], "d:n:r:w:o:b:s:t:")
+    except getopt.GetoptError as err:
+        print(str(err))
+        usage()
+
+    dataset = 0
+    input_sizes = INPUT_SIZES
+    repeats = 5
+    warmup = 1
+    output_filename = None
+    baseline_filename = None
+    slope_tolerance = 0.25
+    time_tolerance = 0.5
+    for opt, arg in optList:
+        if opt == '-d':
+            dataset = int(arg)
+        elif opt == '-n':
+            input_sizes = sorted(int(size) for size in arg.split(','))
+        elif opt == '-r':
+            repeats = int(arg)
+        elif opt == '-w':
+            warmup = int(arg)
+        elif opt == '-o':
+            output_filename = arg
+        elif opt == '-b':
+            baseline_filename = arg
+        elif opt == '-s':
+            slope_tolerance = float(arg)
+        elif opt == '-t':
+            time_tolerance = float(arg)
+
+    if not approaches or any(approach not in APPROACHES for approach in approaches) or repeats < 1:
+        usage()
+
+    data = {
+        'words': read_words_frequencies(f"generation/dataset{dataset}.txt"),
+        'shuffled': read_words_frequencies(f"generation/shuffled_dataset{dataset}.txt"),
+        # the words of another dataset are actual words guaranteed not to be in this one
+        'other': read_words_frequencies(f"generation/dataset{(dataset + 1) % NUM_DATASETS}.txt"),
+    }
+    if input_sizes[-1] > len(data['words']):
+        print(f"The largest input size must be at most {len(data['words'])}.")
+        usage()
+
+    report = {
+        'config': {'dataset': dataset, 'repeats': repeats, 'warmup': warmup, 'python': sys.version.split()[0]},
+        'results': {approach: run_approach(approach, data, input_sizes, repeats, warmup)
+                    for approach in approaches},
+    }
+    if output_filename != None:
+        with open(output_filename, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if baseline_filename != None:
+        with open(baseline_filename, 'r') as baseline_file:
+            baseline = json.load(baseline_file)
+        failures = regressions(report['results'], baseline['results'], slope_tolerance, time_tolerance)
+        for failure in failures:
+            print('REGRESSION', failure, file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print('No regression against', baseline_filename, file=sys.stderr)
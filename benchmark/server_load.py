@@ -0,0 +1,126 @@
+import asyncio
+import getopt
+import random
+import sys
+import time
+from dictionary.instrumented_dictionary import percentile
+from dictionary.loader import load_columns
+
+
+# -------------------------------------------------------------------
+# Load generator for dictionary_server.py.
+# Every connection replays keystrokes: for a random word of the data file,
+# it autocompletes each of its prefixes then searches the word. Up to
+# <pipeline depth> requests are kept in flight per connection, and the
+# latency of each request is measured from when it is written to when its
+# response line arrives.
+#
+# python3 dictionary_server.py tst sampleData200k.txt &
+# python3 -m benchmark.server_load [-p port | -u socket fileName] [-c connections] [-n requests]
+#                                  [-d pipeline depth] [data fileName]
+# -------------------------------------------------------------------
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.server_load', '[-p port | -u socket fileName] [-c connections] [-n requests]',
+          '[-d pipeline depth] [data fileName]')
+    print('-p, -u: address of the server, TCP port of localhost (default 7777) or Unix socket')
+    print('-c: number of concurrent connections (default 16)')
+    print('-n: number of requests per connection (default 10000)')
+    print('-d: maximum number of requests in flight per connection (default 8)')
+    sys.exit(1)
+
+
+def keystrokes(words: [str], num_requests: int, seed: int) -> [bytes]:
+    """
+    @param words, num_requests, seed: words to be typed, number of requests, seed of the connection
+    @return: AC request lines for each prefix of random words, each followed by an S request of the word
+    """
+    rng = random.Random(seed)
+    requests = []
+    while len(requests) < num_requests:
+        word = rng.choice(words)
+        requests.extend(f"AC {word[:length]}\n".encode() for length in range(1, len(word) + 1))
+        requests.append(f"S {word}\n".encode())
+    return requests[:num_requests]
+
+
+async def run_connection(open_connection, requests: [bytes], depth: int, latencies: [int]):
+    """
+    send the requests over one connection, keeping up to depth of them in flight
+    @param open_connection, requests, depth: coroutine opening the connection, request lines, pipeline depth
+    @param latencies: list the latency in nanoseconds of each request is appended to
+    """
+    reader, writer = await open_connection()
+    sent_times = []
+    sent = 0
+    received = 0
+    while received < len(requests):
+        # Fill the pipeline, then wait for the oldest response
+        burst = requests[sent:min(received + depth, len(requests))]
+        if burst:
+            now = time.perf_counter_ns()
+            writer.write(b''.join(burst))
+            sent_times.extend([now] * len(burst))
+            sent += len(burst)
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError('the server closed the connection')
+        latencies.append(time.perf_counter_ns() - sent_times[received])
+        received += 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(open_connection, words: [str], connections: int, num_requests: int, depth: int) -> ([int], float):
+    """
+    @return: the latency of every request in nanoseconds, the elapsed time in seconds
+    """
+    latencies = []
+    workloads = [keystrokes(words, num_requests, seed) for seed in range(connections)]
+    start_time = time.perf_counter()
+    await asyncio.gather(*[run_connection(open_connection, requests, depth, latencies) for requests in workloads])
+    return latencies, time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    try:
+        optList, args = getopt.gnu_getopt(sys.argv[1:], "p:u:c:n:d:")
+    except getopt.GetoptError as err:
+        print(str(err))
+        usage()
+
+    port = 7777
+    socket_filename = None
+    connections = 16
+    num_requests = 10000
+    depth = 8
+    for opt, arg in optList:
+        if opt == '-p':
+            port = int(arg)
+        elif opt == '-u':
+            socket_filename = arg
+        elif opt == '-c':
+            connections = int(arg)
+        elif opt == '-n':
+            num_requests = int(arg)
+        elif opt == '-d':
+            depth = int(arg)
+    if len(args) > 1 or connections < 1 or num_requests < 1 or depth < 1:
+        usage()
+    data_filename = args[0] if args else 'sampleData.txt'
+
+    if socket_filename != None:
+        open_connection = lambda: asyncio.open_unix_connection(socket_filename)
+    else:
+        open_connection = lambda: asyncio.open_connection('127.0.0.1', port)
+    words = load_columns(data_filename)[0]
+    latencies, elapsed = asyncio.run(run_load(open_connection, words, connections, num_requests, depth))
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {connections} connections, pipeline depth {depth}")
+    print(f"throughput: {len(latencies) / elapsed:.0f} requests/s in {elapsed:.3f} s")
+    print('latency (us): ' + '  '.join(f"p{percent} {percentile(latencies, percent) / 1000:.1f}"
+                                       for percent in (50, 95, 99)) + f"  max {latencies[-1] / 1000:.1f}")
@@ -0,0 +1,65 @@
+import random
+import sys
+import time
+from dictionary.sharded_dictionary import ShardedDictionary
+from dictionary.loader import load_columns
+from benchmark.common import APPROACHES, make_agent
+
+
+# -------------------------------------------------------------------
+# Autocomplete throughput of ShardedDictionary by number of shards.
+# The same seeded prefixes (the first 1 to 4 letters of random words) are
+# autocompleted in batches of autocomplete_many, so that all the shards
+# work at once, and the throughput is compared with a single process.
+#
+# python3 -m benchmark.sharded_throughput <approach> [data fileName] [number of prefixes] [numbers of shards...]
+# -------------------------------------------------------------------
+
+BATCH_SIZE = 1000
+
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.sharded_throughput',
+          '<approach> [data fileName] [number of prefixes] [numbers of shards...]')
+    print('<approach> = <' + ' | '.join(APPROACHES) + '>')
+    sys.exit(1)
+
+
+def time_batches(agent, prefixes: [str]) -> float:
+    """
+    @param agent, prefixes: dictionary to autocomplete with, prefixes
+    @return: elapsed time in seconds to autocomplete every prefix in batches of BATCH_SIZE
+    """
+    start_time = time.perf_counter()
+    for start in range(0, len(prefixes), BATCH_SIZE):
+        agent.autocomplete_many(prefixes[start:start + BATCH_SIZE])
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) < 2 or args[1] not in APPROACHES:
+        usage()
+    approach = args[1]
+    data_filename = args[2] if len(args) > 2 else 'sampleData200k.txt'
+    num_prefixes = int(args[3]) if len(args) > 3 else 100000
+    shard_counts = [int(count) for count in args[4:]] or [1, 2, 4]
+
+    words, frequencies = load_columns(data_filename)
+    rng = random.Random(0)
+    prefixes = [word[:rng.randint(1, 4)] for word in rng.choices(words, k=num_prefixes)]
+
+    agent = make_agent(approach)
+    agent.build_from_columns(words, frequencies)
+    baseline = time_batches(agent, prefixes)
+    print(f"{'shards':>8} {'seconds':>9} {'AC/s':>10} {'speedup':>8}")
+    print(f"{'none':>8} {baseline:>9.3f} {num_prefixes / baseline:>10.0f} {1:>8.2f}")
+    for num_shards in shard_counts:
+        sharded = ShardedDictionary(type(agent), num_shards)
+        sharded.build_from_columns(words, frequencies)
+        elapsed = time_batches(sharded, prefixes)
+        sharded.close()
+        print(f"{num_shards:>8} {elapsed:>9.3f} {num_prefixes / elapsed:>10.0f} {baseline / elapsed:>8.2f}")
@@ -0,0 +1,99 @@
+import random
+import sys
+import threading
+import time
+from dictionary.word_frequency import WordFrequency
+from dictionary.snapshot_dictionary import SnapshotDictionary
+from dictionary.loader import load_columns
+from benchmark.common import make_agent
+
+
+# -------------------------------------------------------------------
+# Reader threads autocompleting and searching a SnapshotDictionary while
+# one writer thread adds and deletes words.
+# The writer adds 'zzsnap0', 'zzsnap1', ... in order and deletes them
+# again in the same order, so that in every consistent version the words
+# present form a contiguous range of that sequence. Each reader takes a
+# snapshot, checks the range it sees has no hole and that autocomplete of
+# 'zzsnap' agrees with it, and reports any inconsistency.
+#
+# python3 -m benchmark.snapshot_readers <list | tst> [data fileName] [number of readers] [seconds]
+# -------------------------------------------------------------------
+
+PREFIX = 'zzsnap'
+WINDOW = 64
+# approaches supporting copy_for_write
+APPROACHES = ('list', 'tst')
+
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 -m benchmark.snapshot_readers', '<list | tst> [data fileName] [number of readers] [seconds]')
+    sys.exit(1)
+
+
+def write(agent: SnapshotDictionary, stop: threading.Event, counts: dict):
+    """
+    add the words of the sequence and delete them again, keeping WINDOW of them at most
+    """
+    added = 0
+    while not stop.is_set():
+        agent.add_word_frequency(WordFrequency(f"{PREFIX}{added}", added + 1))
+        added += 1
+        if added > WINDOW:
+            agent.delete_word(f"{PREFIX}{added - WINDOW - 1}")
+        counts['writes'] += 1
+
+
+def read(agent: SnapshotDictionary, words: [str], stop: threading.Event, counts: dict, seed: int):
+    """
+    search and autocomplete random words, checking the sequence in a snapshot after each of them
+    """
+    rng = random.Random(seed)
+    while not stop.is_set():
+        word = rng.choice(words)
+        agent.search(word)
+        agent.autocomplete(word[:2])
+        snapshot = agent.snapshot()
+        # The most frequent word of the sequence is the last added one, every word below it down to the
+        # oldest one kept must be present
+        top = snapshot.autocomplete(PREFIX)
+        if top:
+            last = top[0].frequency - 1
+            present = [snapshot.search(f"{PREFIX}{number}") > 0 for number in range(max(last - WINDOW, 0), last + 1)]
+            if not present[-1] or False in present[present.index(True):]:
+                counts['inconsistent'] += 1
+        counts['reads'] += 1
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) < 2 or args[1] not in APPROACHES:
+        usage()
+    data_filename = args[2] if len(args) > 2 else 'sampleData.txt'
+    num_readers = int(args[3]) if len(args) > 3 else 4
+    seconds = float(args[4]) if len(args) > 4 else 5
+
+    words, frequencies = load_columns(data_filename)
+    agent = SnapshotDictionary(make_agent(args[1]))
+    agent.build_from_columns(words, frequencies)
+
+    stop = threading.Event()
+    writer_counts = {'writes': 0}
+    reader_counts = [{'reads': 0, 'inconsistent': 0} for _ in range(num_readers)]
+    threads = [threading.Thread(target=write, args=(agent, stop, writer_counts))]
+    threads += [threading.Thread(target=read, args=(agent, words, stop, counts, seed))
+                for seed, counts in enumerate(reader_counts)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    reads = sum(counts['reads'] for counts in reader_counts)
+    inconsistent = sum(counts['inconsistent'] for counts in reader_counts)
+    print(f"{num_readers} readers: {reads / seconds:.0f} reads/s, 1 writer: {writer_counts['writes'] / seconds:.0f} writes/s")
+    print(f"inconsistent snapshots: {inconsistent}")
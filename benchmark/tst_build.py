@@ -0,0 +1,58 @@
+import sys
+import time
+from dictionary.word_frequency import WordFrequency
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from benchmark.common import read_words_frequencies
+
+
+# -------------------------------------------------------------------
+# Build time and average search depth of the TST, built one word at a
+# time in input order versus bulk-loaded median first, for each data file
+# both in its own order and sorted. After deleting half of the words and
+# adding them back, the depth is reported again before and after rebalance().
+#
+# python3 -m benchmark.tst_build [data fileNames...]
+# -------------------------------------------------------------------
+
+DEFAULT_DATA_FILES = ['generation/dataset0.txt', 'generation/dataset1.txt', 'generation/dataset2.txt',
+                      'generation/shuffled_dataset0.txt', 'generation/shuffled_dataset1.txt',
+                      'generation/shuffled_dataset2.txt']
+
+
+def build(words_frequencies: [WordFrequency], bulk_load: bool) -> (TernarySearchTreeDictionary, float):
+    """
+    @param words_frequencies, bulk_load: words to be stored, build mode
+    @return: (the built tree, build time in seconds)
+    """
+    agent = TernarySearchTreeDictionary(bulk_load=bulk_load)
+    start_time = time.perf_counter()
+    agent.build_dictionary(words_frequencies)
+    return agent, time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    data_filenames = sys.argv[1:] or DEFAULT_DATA_FILES
+
+    print(f"{'data file':<36} {'order':<7} {'mode':<10} {'build (s)':>9} {'avg depth':>9}")
+    for data_filename in data_filenames:
+        words_frequencies = read_words_frequencies(data_filename)
+        for order, entries in (('file', words_frequencies),
+                               ('sorted', sorted(words_frequencies, key=lambda entry: entry.word))):
+            for bulk_load in (False, True):
+                agent, build_time = build(entries, bulk_load)
+                mode = 'bulk' if bulk_load else 'one-by-one'
+                print(f"{data_filename:<36} {order:<7} {mode:<10} {build_time:>9.3f} {agent.average_search_depth():>9.2f}")
+
+        # Churn: delete the second half of the words and add it back in sorted order
+        agent, _ = build(words_frequencies, True)
+        churned = sorted(words_frequencies[len(words_frequencies) // 2:], key=lambda entry: entry.word)
+        for entry in churned:
+            agent.delete_word(entry.word)
+        for entry in churned:
+            agent.add_word_frequency(entry)
+        churn_depth = agent.average_search_depth()
+        start_time = time.perf_counter()
+        agent.rebalance()
+        rebalance_time = time.perf_counter() - start_time
+        print(f"{data_filename:<36} churn: avg depth {churn_depth:.2f}, after rebalance() "
+              f"{agent.average_search_depth():.2f} in {rebalance_time:.3f} s")
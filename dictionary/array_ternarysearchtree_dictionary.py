@@ -0,0 +1,284 @@
+from array import array
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Array-backed Ternary Search Tree implementation.
+#
+# Instead of one Node object per letter, every node lives at an integer index
+# in a set of parallel typed arrays (letter codes, child indices, frequencies,
+# end flags). Children are referenced by index, NIL (-1) standing for None.
+# Index 0 is always the root. Slots of pruned nodes are recycled through a
+# free list so that heavy delete/add churn does not grow the arrays.
+# ------------------------------------------------------------------------
+
+NIL = -1
+
+
+class ArrayTernarySearchTreeDictionary(BaseDictionary):
+    def __init__(self):
+        self.letter = array('i')        # code point of the letter stored at each node, NIL if empty
+        self.frequency = array('q')     # frequency of the word if the node is the end of a word
+        self.end_word = array('b')      # 1 if the node is the end of a word
+        self.left = array('i')          # index of the left child, which holds a letter < letter
+        self.middle = array('i')        # index of the middle child
+        self.right = array('i')         # index of the right child, which holds a letter > letter
+        self.free = []                  # indices of pruned nodes available for reuse
+        self.root = self.new_node()
+
+    def new_node(self, letter: int = NIL) -> int:
+        """
+        allocate a node, reusing a pruned slot if there is one
+        @param letter: code point of the letter to be stored
+        @return: the index of the new node
+        """
+        if self.free:
+            idx = self.free.pop()
+            self.letter[idx] = letter
+            self.frequency[idx] = 0
+            self.end_word[idx] = 0
+            self.left[idx] = NIL
+            self.middle[idx] = NIL
+            self.right[idx] = NIL
+            return idx
+        self.letter.append(letter)
+        self.frequency.append(0)
+        self.end_word.append(0)
+        self.left.append(NIL)
+        self.middle.append(NIL)
+        self.right.append(NIL)
+        return len(self.letter) - 1
+
+    def node_count(self) -> int:
+        """
+        @return: the number of live nodes in the tree
+        """
+        return len(self.letter) - len(self.free)
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        for entry in words_frequencies:
+            self.add_word_frequency(entry)
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        for word, frequency in zip(words, frequencies):
+            self.add_word_from_root(word, frequency)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        endNode = self.search_from_node(self.root, word)
+        if endNode == NIL or not self.end_word[endNode]:
+            return 0
+        return self.frequency[endNode]
+
+    def search_from_node(self, currNode: int, word: str) -> int:
+        """
+        walk down from currNode following the letters of word
+        @param currNode, word: index of the node to start from, the word to be searched
+        @return: the index of the node holding the last letter of word, NIL if there is none
+        """
+        letters, left, middle, right = self.letter, self.left, self.middle, self.right
+        lastIdx = len(word) - 1
+        currIdx = 0
+        currLetter = ord(word[0])
+        while currNode != NIL and letters[currNode] != NIL:
+            nodeLetter = letters[currNode]
+            if nodeLetter < currLetter:
+                currNode = right[currNode]
+            elif nodeLetter > currLetter:
+                currNode = left[currNode]
+            elif currIdx < lastIdx:
+                currNode = middle[currNode]
+                currIdx += 1
+                currLetter = ord(word[currIdx])
+            else:
+                return currNode
+        return NIL
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        return self.add_word_from_root(word_frequency.word, word_frequency.frequency)
+
+    def add_word_from_root(self, word: str, freq: int) -> bool:
+        """
+        add a word starting from the root, creating the missing nodes on the way
+        @param word, freq: the word to be added and its frequency
+        :return: True if addition is successful, false if the word being added already exists.
+        """
+        letters, left, middle, right = self.letter, self.left, self.middle, self.right
+        lastIdx = len(word) - 1
+        currIdx = 0
+        currLetter = ord(word[0])
+        currNode = self.root
+        # An empty root takes the first letter
+        if letters[currNode] == NIL:
+            letters[currNode] = currLetter
+        while True:
+            nodeLetter = letters[currNode]
+            if nodeLetter < currLetter:
+                if right[currNode] == NIL:
+                    right[currNode] = self.new_node(currLetter)
+                currNode = right[currNode]
+            elif nodeLetter > currLetter:
+                if left[currNode] == NIL:
+                    left[currNode] = self.new_node(currLetter)
+                currNode = left[currNode]
+            elif currIdx < lastIdx:
+                currIdx += 1
+                currLetter = ord(word[currIdx])
+                if middle[currNode] == NIL:
+                    middle[currNode] = self.new_node(currLetter)
+                currNode = middle[currNode]
+            else:
+                if self.end_word[currNode]:
+                    return False
+                self.frequency[currNode] = freq
+                self.end_word[currNode] = 1
+                return True
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        return self.delete_from_node(self.root, word)
+
+    def delete_from_node(self, currNode: int, word: str) -> bool:
+        """
+        delete a word and prune the nodes that no longer lead to any word
+        @param currNode, word: index of the node to start from, the word to be deleted
+        @return: False if not found or end_word equals False, True if found and end_word equals True
+        """
+        letters, left, middle, right = self.letter, self.left, self.middle, self.right
+        # (parent, child links of the parent) pairs from currNode down to the word's last letter
+        path = []
+        lastIdx = len(word) - 1
+        currIdx = 0
+        currLetter = ord(word[0])
+        links = None
+        while True:
+            if currNode == NIL or letters[currNode] == NIL:
+                return False
+            path.append((currNode, links))
+            nodeLetter = letters[currNode]
+            if nodeLetter < currLetter:
+                links = right
+            elif nodeLetter > currLetter:
+                links = left
+            elif currIdx < lastIdx:
+                links = middle
+                currIdx += 1
+                currLetter = ord(word[currIdx])
+            else:
+                break
+            currNode = links[currNode]
+
+        if not self.end_word[currNode]:
+            return False
+        self.end_word[currNode] = 0
+        self.frequency[currNode] = 0
+
+        # Unlink dead leaves bottom-up until a node still carries a word or a child
+        for depth in range(len(path) - 1, -1, -1):
+            node, links = path[depth]
+            if self.end_word[node] or left[node] != NIL or middle[node] != NIL or right[node] != NIL:
+                break
+            if depth == 0:
+                letters[node] = NIL
+                if node != self.root:
+                    self.free.append(node)
+            else:
+                links[path[depth - 1][0]] = NIL
+                letters[node] = NIL
+                self.free.append(node)
+        return True
+
+    def add_ac_words(self, currNode: int, compoundWord: str, ac_lst: list):
+        """
+        Traverse all the nodes below currNode (left, middle, right order) and create an instance of
+        WordFrequency using compoundWord and the frequency of each node whose end_word is set.
+        @param currNode, compoundWord, ac_lst: compoundWord to keep track of the word to be added
+        ac_lst: the list to which an instance of WordFrequency is added
+        """
+        letters, left, middle, right = self.letter, self.left, self.middle, self.right
+        end_word, frequency = self.end_word, self.frequency
+        stack = [(currNode, compoundWord)]
+        while stack:
+            currNode, compoundWord = stack.pop()
+            if currNode == NIL:
+                continue
+            word = compoundWord + chr(letters[currNode])
+            if end_word[currNode]:
+                ac_lst.append(WordFrequency(word, frequency[currNode]))
+            stack.append((right[currNode], compoundWord))
+            stack.append((middle[currNode], word))
+            stack.append((left[currNode], compoundWord))
+
+    def autocomplete(self, word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        ac_lst = []
+        currNode = self.search_from_node(self.root, word)
+        if currNode == NIL:
+            return ac_lst
+        if self.end_word[currNode]:
+            ac_lst.append(WordFrequency(word, self.frequency[currNode]))
+        self.add_ac_words(self.middle[currNode], word, ac_lst)
+
+        # Python's built-in Timsort
+        ac_lst.sort(key=lambda wordFrequency: wordFrequency.frequency, reverse=True)
+        return ac_lst[:3]
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: nodes visited on the way down, nodes an addition would create, candidates autocomplete sorts
+        """
+        letters, left, middle, right = self.letter, self.left, self.middle, self.right
+        visited = 0
+        matched = 0
+        lastNode = NIL
+        currNode = self.root
+        while currNode != NIL and letters[currNode] != NIL:
+            visited += 1
+            currLetter = ord(word[matched])
+            if letters[currNode] < currLetter:
+                currNode = right[currNode]
+            elif letters[currNode] > currLetter:
+                currNode = left[currNode]
+            else:
+                matched += 1
+                if matched == len(word):
+                    lastNode = currNode
+                    break
+                currNode = middle[currNode]
+        cost = {'nodes_visited': visited}
+        if command == 'A':
+            cost['nodes_created'] = 0 if lastNode != NIL and self.end_word[lastNode] else len(word) - matched
+        elif command == 'AC':
+            candidates = []
+            if lastNode != NIL:
+                self.add_ac_words(middle[lastNode], word, candidates)
+            cost['candidates'] = len(candidates) + (1 if lastNode != NIL and self.end_word[lastNode] else 0)
+        return cost
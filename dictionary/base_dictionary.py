@@ -16,6 +16,13 @@ class BaseDictionary:
         """
         pass
 
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.build_dictionary(list(map(WordFrequency, words, frequencies)))
+
     def search(self, word: str) -> int:
         """
         search for a word
@@ -48,4 +55,50 @@ class BaseDictionary:
         """
         pass
 
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        return [self.search(word) for word in words]
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes
+        @param prefix_words: the prefixes to be autocompleted
+        @return: the autocomplete list of each prefix
+        """
+        return [self.autocomplete(prefix_word) for prefix_word in prefix_words]
 
+    def add_many(self, words_frequencies: [WordFrequency]) -> [bool]:
+        """
+        add a batch of words
+        @param words_frequencies: list of (word, frequency) to be added
+        @return: whether each addition succeeded, as if they were added one by one in batch order
+        """
+        return [self.add_word_frequency(word_frequency) for word_frequency in words_frequencies]
+
+    def delete_many(self, words: [str]) -> [bool]:
+        """
+        delete a batch of words
+        @param words: words to be deleted
+        @return: whether each deletion succeeded, as if they were deleted one by one in batch order
+        """
+        return [self.delete_word(word) for word in words]
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: {counter name: count}, empty if the implementation does not report any
+        """
+        return {}
+
+    def copy_for_write(self, word: str):
+        """
+        copy the dictionary for SnapshotDictionary, sharing everything but what a change of 'word' would modify
+        @param word: the word about to be added or deleted
+        @return: a dictionary of the same class that can be changed without affecting this one
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support copy-on-write snapshots")
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Autocomplete result cache that can wrap any dictionary implementation.
+#
+# Results are kept in a bounded LRU keyed by prefix. Adding or deleting a
+# word can only change the results of the prefixes of that word, so only
+# those entries are invalidated.
+# ------------------------------------------------------------------------
+
+class CachedDictionary(BaseDictionary):
+    def __init__(self, agent: BaseDictionary, capacity: int = 1024):
+        self.agent = agent              # the wrapped dictionary
+        self.capacity = capacity        # maximum number of cached prefixes
+        self.cache = OrderedDict()      # prefix -> autocomplete result, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        """
+        @return: the cache counters
+        """
+        return {'capacity': self.capacity, 'size': len(self.cache), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'invalidations': self.invalidations}
+
+    def invalidate(self, word: str):
+        """
+        drop the cached results of every prefix of word
+        @param word: the word that was added or deleted
+        """
+        for length in range(len(word) + 1):
+            if self.cache.pop(word[:length], None) != None:
+                self.invalidations += 1
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.cache.clear()
+        self.agent.build_dictionary(words_frequencies)
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.cache.clear()
+        self.agent.build_from_columns(words, frequencies)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.agent.search(word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        return self.agent.search_many(words)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if self.agent.add_word_frequency(word_frequency):
+            self.invalidate(word_frequency.word)
+            return True
+        return False
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if self.agent.delete_word(word):
+            self.invalidate(word)
+            return True
+        return False
+
+    def add_many(self, words_frequencies: [WordFrequency]) -> [bool]:
+        """
+        add a batch of words
+        @param words_frequencies: list of (word, frequency) to be added
+        @return: whether each addition succeeded, as if they were added one by one in batch order
+        """
+        results = self.agent.add_many(words_frequencies)
+        for word_frequency, result in zip(words_frequencies, results):
+            if result:
+                self.invalidate(word_frequency.word)
+        return results
+
+    def delete_many(self, words: [str]) -> [bool]:
+        """
+        delete a batch of words
+        @param words: words to be deleted
+        @return: whether each deletion succeeded, as if they were deleted one by one in batch order
+        """
+        results = self.agent.delete_many(words)
+        for word, result in zip(words, results):
+            if result:
+                self.invalidate(word)
+        return results
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        result = self.cache.get(prefix_word)
+        if result != None:
+            self.hits += 1
+            self.cache.move_to_end(prefix_word)
+            return list(result)
+        self.misses += 1
+        result = self.agent.autocomplete(prefix_word)
+        if self.capacity > 0:
+            self.cache[prefix_word] = list(result)
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: the cost reported by the wrapped dictionary, nothing for a cached autocomplete
+        """
+        if command == 'AC' and word in self.cache:
+            return {}
+        return self.agent.operation_cost(command, word)
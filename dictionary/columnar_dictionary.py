@@ -0,0 +1,188 @@
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ------------------------------------------------------------------------
+# Columnar implementation on NumPy arrays, for large offline batches.
+#
+# The words are kept sorted in a fixed-width bytes array (UTF-8, whose byte
+# order is the order of str), next to an int64 array of their frequencies.
+# search_many looks up a whole batch with one vectorised searchsorted, and
+# autocomplete_many finds the range of every prefix of a batch with two.
+# The most frequent words of a range are selected with a partition instead
+# of sorting the range. Adding and deleting a word shift the arrays in C.
+#
+# NumPy is an optional dependency, needed only when this class is used.
+# ------------------------------------------------------------------------
+
+class ColumnarDictionary(BaseDictionary):
+    def __init__(self, ac_size: int = 3):
+        if np == None:
+            raise ImportError('ColumnarDictionary needs NumPy, e.g. pip install numpy')
+        self.words = np.array([], dtype='S1')
+        self.frequencies = np.array([], dtype=np.int64)
+        # number of most-frequent words returned by autocomplete
+        self.ac_size = ac_size
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.build_from_columns([entry.word for entry in words_frequencies],
+                                [entry.frequency for entry in words_frequencies])
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        encoded = self.encode(words)
+        frequencies = np.asarray(frequencies, dtype=np.int64)
+        # A stable sort keeps duplicates in file order, the first occurrence of a word wins
+        order = np.argsort(encoded, kind='stable')
+        encoded = encoded[order]
+        first = np.ones(len(encoded), dtype=bool)
+        first[1:] = encoded[1:] != encoded[:-1]
+        self.words = encoded[first]
+        self.frequencies = frequencies[order][first]
+
+    def encode(self, words: [str]):
+        """
+        @param words: words or prefixes
+        @return: their UTF-8 encodings as a fixed-width bytes array
+        """
+        encoded = [word.encode() for word in words]
+        return np.array(encoded, dtype=f"S{max(map(len, encoded), default=0) or 1}")
+
+    def width(self) -> int:
+        """
+        @return: the number of bytes of the longest word that fits in the words array
+        """
+        return self.words.dtype.itemsize
+
+    def position(self, word: str) -> (bool, int):
+        """
+        @param word: a word
+        @return: (whether it is in the dictionary, its position or the position it would be inserted at)
+        """
+        encoded = word.encode()
+        if len(encoded) > self.width():
+            # Longer than any stored word: compare on the fitting bytes, where it sorts after an equal word
+            position = int(np.searchsorted(self.words, encoded[:self.width()], side='right'))
+            return (False, position)
+        position = int(np.searchsorted(self.words, encoded))
+        return (position < len(self.words) and self.words[position] == encoded, position)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        found, position = self.position(word)
+        return int(self.frequencies[position]) if found else 0
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        if not words or not len(self.words):
+            return [0] * len(words)
+        queries = self.encode(words)
+        # Words longer than the stored ones are not in the dictionary, and must not match once cut to fit
+        fits = np.array([len(query) <= self.width() for query in queries], dtype=bool)
+        queries = queries.astype(self.words.dtype)
+        positions = np.minimum(np.searchsorted(self.words, queries), len(self.words) - 1)
+        found = fits & (self.words[positions] == queries)
+        return np.where(found, self.frequencies[positions], 0).tolist()
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        found, position = self.position(word_frequency.word)
+        if found:
+            return False
+        encoded = word_frequency.word.encode()
+        if len(encoded) > self.width():
+            self.words = self.words.astype(f"S{len(encoded)}")
+        self.words = np.insert(self.words, position, encoded)
+        self.frequencies = np.insert(self.frequencies, position, word_frequency.frequency)
+        return True
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        found, position = self.position(word)
+        if not found:
+            return False
+        self.words = np.delete(self.words, position)
+        self.frequencies = np.delete(self.frequencies, position)
+        return True
+
+    def prefix_bounds(self, prefix_words: [str]):
+        """
+        @param prefix_words: prefixes
+        @return: (array of lows, array of highs), the words having prefix i being words[lows[i]:highs[i]]
+        """
+        width = self.width()
+        encoded = [prefix_word.encode() for prefix_word in prefix_words]
+        # A prefix longer than every word matches none of them, its range is made empty
+        fitting = [prefix if len(prefix) <= width else b'\xff' * width for prefix in encoded]
+        # UTF-8 never has a 0xff byte: padding a prefix with them gives the last string having the prefix
+        lows = np.searchsorted(self.words, np.array(fitting, dtype=self.words.dtype), side='left')
+        highs = np.searchsorted(self.words, np.array([prefix.ljust(width, b'\xff') for prefix in fitting],
+                                                     dtype=self.words.dtype), side='right')
+        return lows, highs
+
+    def top_range(self, low: int, high: int) -> [WordFrequency]:
+        """
+        @param low, high: a range of positions, high excluded
+        @return: the ac_size most frequent words of the range, ties broken alphabetically
+        """
+        frequencies = self.frequencies[low:high]
+        if len(frequencies) > self.ac_size:
+            # The ac_size-th largest frequency: every word above it is kept, and among the words at it the
+            # alphabetically first ones, i.e. the first positions
+            kth = len(frequencies) - self.ac_size
+            threshold = frequencies[np.argpartition(frequencies, kth)[kth]]
+            above = np.flatnonzero(frequencies > threshold)
+            tied = np.flatnonzero(frequencies == threshold)[:self.ac_size - len(above)]
+            picked = np.concatenate((above, tied))
+        else:
+            picked = np.arange(len(frequencies))
+        # By frequency descending, then position (i.e. word) ascending
+        picked = picked[np.lexsort((picked, -frequencies[picked]))]
+        return [WordFrequency(self.words[low + position].decode(), int(frequencies[position])) for position in picked]
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        return self.autocomplete_many([prefix_word])[0]
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes
+        @param prefix_words: the prefixes to be autocompleted
+        @return: the autocomplete list of each prefix
+        """
+        if not prefix_words or not len(self.words):
+            return [[] for _ in prefix_words]
+        lows, highs = self.prefix_bounds(prefix_words)
+        return [self.top_range(low, high) if low < high else [] for low, high in zip(lows.tolist(), highs.tolist())]
@@ -0,0 +1,422 @@
+import bisect
+import heapq
+import itertools
+import threading
+from array import array
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Minimal acyclic automaton (DAWG) implementation for static dictionaries.
+#
+# WordAutomaton is built once from the sorted words, merging equivalent
+# states as the words are added (Daciuk et al.), then frozen into typed
+# arrays: the outgoing edges of every state are stored consecutively,
+# sorted by letter. Every edge also records how many words of its state
+# come before the words it leads to, so that adding them up along the path
+# of a word gives the rank of the word in sorted order: a perfect hash
+# indexing the frequencies. The words having a prefix are a contiguous
+# range of ranks, whose most frequent ones are found with a segment tree of
+# range maxima over the frequencies (packed with the ranks to break ties).
+# The answers for the prefixes of many words, the slowest to find, are
+# computed once when the automaton is built.
+#
+# DawgDictionary serves an automaton and keeps added and deleted words in a
+# small overlay consulted first. Once the overlay holds rebuild_threshold
+# words, a new automaton including them is built in a background thread and
+# replaces the old one.
+# ------------------------------------------------------------------------
+
+NIL = -1
+SMALL_RANGE = 32        # ranges of at most this many words are sorted instead of searched in the tree
+CACHED_RANGE = 16       # prefixes of at least this many words have their most frequent words precomputed
+
+
+class WordAutomaton:
+    def __init__(self, words: [str], frequencies: [int], ac_size: int = 3):
+        """
+        @param words, frequencies: distinct words in ascending order and their frequencies
+        @param ac_size: number of most-frequent words returned by autocomplete
+        """
+        self.num_words = len(words)
+        self.ac_size = ac_size
+        self.build(words)
+        self.build_max_tree(frequencies)
+        self.build_top_cache(words)
+
+    def build(self, words: [str]):
+        """
+        build the minimal automaton of the words and freeze it into arrays
+        @param words: distinct words in ascending order
+        """
+        transitions = [{}]      # letter -> state, per state; state 0 is the start state
+        final = [False]         # True if the state ends a word
+        register = {}           # (final, sorted transitions) -> representative state
+        unchecked = []          # (parent, letter, child) along the last word, not yet merged
+
+        def minimise(downTo: int):
+            # Replace the states below depth downTo of the last word with an equivalent registered state
+            while len(unchecked) > downTo:
+                parent, letter, child = unchecked.pop()
+                signature = (final[child], tuple(sorted(transitions[child].items())))
+                registered = register.get(signature)
+                if registered == None:
+                    register[signature] = child
+                else:
+                    transitions[parent][letter] = registered
+
+        previous = ''
+        for word in words:
+            common = 0
+            maxCommon = min(len(word), len(previous))
+            while common < maxCommon and word[common] == previous[common]:
+                common += 1
+            minimise(common)
+            currState = unchecked[-1][2] if unchecked else 0
+            for letter in word[common:]:
+                transitions.append({})
+                final.append(False)
+                transitions[currState][letter] = len(transitions) - 1
+                unchecked.append((currState, letter, len(transitions) - 1))
+                currState = len(transitions) - 1
+            final[currState] = True
+            previous = word
+        minimise(0)
+
+        # Number the states reachable from the start state, children before parents
+        number = {}
+        order = []
+        stack = [(0, False)]
+        while stack:
+            state, expanded = stack.pop()
+            if expanded:
+                number[state] = len(order)
+                order.append(state)
+            elif state not in number:
+                stack.append((state, True))
+                stack.extend((child, False) for child in transitions[state].values() if child not in number)
+        # Freeze: the edges of state i are edge_first[i] to edge_first[i + 1] - 1
+        self.final = array('b')
+        self.count = array('i')         # number of words from each state to an end
+        self.edge_first = array('i')
+        self.edge_letter = array('I')
+        self.edge_target = array('i')
+        self.edge_before = array('i')   # number of words of the state sorted before the words through the edge
+        for state in order:
+            self.final.append(final[state])
+            self.edge_first.append(len(self.edge_letter))
+            before = 1 if final[state] else 0
+            for letter, child in sorted(transitions[state].items()):
+                self.edge_letter.append(ord(letter))
+                self.edge_target.append(number[child])
+                self.edge_before.append(before)
+                before += self.count[number[child]]
+            self.count.append(before)
+        self.edge_first.append(len(self.edge_letter))
+        self.start = len(order) - 1
+        self.num_states = len(order)
+
+    def build_max_tree(self, frequencies: [int]):
+        """
+        build the segment tree of range maxima over the keys of the words: node i covers nodes 2i and 2i + 1,
+        leaves num_words to 2 * num_words - 1 are the ranks, and every node holds the largest key it covers.
+        The key of a word packs its frequency and its rank so that the larger key is the more frequent word,
+        the alphabetically first one on a tie.
+        @param frequencies: frequencies of the words in ascending order of word
+        """
+        n = self.num_words
+        keys = array('q', (frequency * n + n - 1 - rank for rank, frequency in enumerate(frequencies)))
+        self.max_tree = array('q', [0]) * n + keys
+        maxTree = self.max_tree
+        for node in range(n - 1, 0, -1):
+            maxTree[node] = max(maxTree[2 * node], maxTree[2 * node + 1])
+
+    def key_rank(self, key: int) -> int:
+        """
+        @return: the rank of the word of a key
+        """
+        return self.num_words - 1 - key % self.num_words
+
+    def key_frequency(self, key: int) -> int:
+        """
+        @return: the frequency of the word of a key
+        """
+        return key // self.num_words
+
+    def range_max(self, low: int, high: int) -> int:
+        """
+        @param low, high: a non-empty range of ranks, high excluded
+        @return: the key of the most frequent word in the range
+        """
+        maxTree = self.max_tree
+        best = NIL
+        low += self.num_words
+        high += self.num_words
+        while low < high:
+            if low & 1:
+                if maxTree[low] > best:
+                    best = maxTree[low]
+                low += 1
+            if high & 1:
+                high -= 1
+                if maxTree[high] > best:
+                    best = maxTree[high]
+            low >>= 1
+            high >>= 1
+        return best
+
+    def top_keys(self, low: int, high: int):
+        """
+        @param low, high: a range of ranks, high excluded
+        @return: an iterator over the keys of the range from the most to the least frequent word
+        """
+        if high - low <= SMALL_RANGE:
+            n = self.num_words
+            yield from sorted(self.max_tree[n + low:n + high], reverse=True)
+            return
+        heap = [(-self.range_max(low, high), low, high)]
+        while heap:
+            negKey, low, high = heapq.heappop(heap)
+            yield -negKey
+            # The rest of the range is the part before and the part after the word just returned
+            best = self.key_rank(-negKey)
+            for partLow, partHigh in ((low, best), (best + 1, high)):
+                if partLow < partHigh:
+                    heapq.heappush(heap, (-self.range_max(partLow, partHigh), partLow, partHigh))
+
+    def build_top_cache(self, words: [str]):
+        """
+        precompute the ac_size most frequent words of every prefix of at least CACHED_RANGE words,
+        whose ranges are the longest to search
+        @param words: distinct words in ascending order
+        """
+        self.top_cache = {}
+        # Ranges of the words sharing their first 'depth' letters
+        stack = [(0, self.num_words, 0)]
+        while stack:
+            low, high, depth = stack.pop()
+            if high - low < CACHED_RANGE:
+                continue
+            self.top_cache[words[low][:depth]] = [WordFrequency(words[self.key_rank(key)], self.key_frequency(key))
+                                                  for key in itertools.islice(self.top_keys(low, high), self.ac_size)]
+            # The prefix itself sorts first, then the words sharing one more letter are consecutive
+            currIdx = low
+            while currIdx < high and len(words[currIdx]) == depth:
+                currIdx += 1
+            while currIdx < high:
+                prefix = words[currIdx][:depth + 1]
+                nextIdx = bisect.bisect_left(words, prefix[:-1] + chr(ord(prefix[-1]) + 1), currIdx, high)
+                stack.append((currIdx, nextIdx, depth + 1))
+                currIdx = nextIdx
+
+    def walk(self, word: str) -> (int, int):
+        """
+        follow the letters of word from the start state
+        @param word: a word or prefix
+        @return: (state reached, number of words sorted before the words of that state), NIL state if none
+        """
+        edgeFirst, edgeLetter, edgeTarget, edgeBefore = self.edge_first, self.edge_letter, self.edge_target, self.edge_before
+        state = self.start
+        rank = 0
+        for letter in word:
+            code = ord(letter)
+            edge = bisect.bisect_left(edgeLetter, code, edgeFirst[state], edgeFirst[state + 1])
+            if edge == edgeFirst[state + 1] or edgeLetter[edge] != code:
+                return (NIL, 0)
+            rank += edgeBefore[edge]
+            state = edgeTarget[edge]
+        return (state, rank)
+
+    def frequency(self, rank: int) -> int:
+        """
+        @return: the frequency of the word of a given rank
+        """
+        return self.max_tree[self.num_words + rank] // self.num_words
+
+    def rank(self, word: str) -> int:
+        """
+        @param word: a word
+        @return: its rank in sorted order, NIL if it is not in the automaton
+        """
+        state, rank = self.walk(word)
+        if state == NIL or not self.final[state]:
+            return NIL
+        return rank
+
+    def word(self, state: int, rank: int, prefix: str) -> str:
+        """
+        spell the word of a given rank, starting from the state reached by its prefix
+        @param state, rank, prefix: state of the prefix, rank relative to the first word of the state, the prefix
+        @return: the word
+        """
+        edgeFirst, edgeLetter, edgeTarget, edgeBefore, final = (self.edge_first, self.edge_letter, self.edge_target,
+                                                                 self.edge_before, self.final)
+        letters = [prefix]
+        while rank > 0 or not final[state]:
+            # The last edge whose words start at or before the rank
+            edge = bisect.bisect_right(edgeBefore, rank, edgeFirst[state], edgeFirst[state + 1]) - 1
+            rank -= edgeBefore[edge]
+            letters.append(chr(edgeLetter[edge]))
+            state = edgeTarget[edge]
+        return ''.join(letters)
+
+    def words(self):
+        """
+        @return: an iterator over (word, frequency) in ascending order of word
+        """
+        for rank in range(self.num_words):
+            yield self.word(self.start, rank, ''), self.frequency(rank)
+
+    def top_words(self, prefix_word: str):
+        """
+        @param prefix_word: a prefix
+        @return: an iterator over the WordFrequency having the prefix, from the most to the least frequent
+        """
+        state, rank = self.walk(prefix_word)
+        if state == NIL:
+            return
+        for key in self.top_keys(rank, rank + self.count[state]):
+            yield WordFrequency(self.word(state, self.key_rank(key) - rank, prefix_word), self.key_frequency(key))
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        @param prefix_word: a prefix
+        @return: a list (could be empty) of (at most) ac_size most-frequent words with the prefix
+        """
+        cached = self.top_cache.get(prefix_word)
+        if cached != None:
+            return list(cached)
+        return list(itertools.islice(self.top_words(prefix_word), self.ac_size))
+
+
+class DawgDictionary(BaseDictionary):
+    def __init__(self, ac_size: int = 3, rebuild_threshold: int = 1024):
+        self.ac_size = ac_size
+        self.rebuild_threshold = rebuild_threshold
+        self.automaton = WordAutomaton([], [], ac_size)
+        self.pending = {}               # word added or deleted since the automaton was built -> frequency, 0 if deleted
+        self.lock = threading.Lock()    # guards pending and automaton while a rebuild is published
+        self.rebuilding = None          # background thread building the next automaton
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.build_from_columns([entry.word for entry in words_frequencies],
+                                [entry.frequency for entry in words_frequencies])
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.wait_rebuild()
+        # Sort by word, the first occurrence of a duplicate word wins
+        entries = {}
+        for word, frequency in zip(words, frequencies):
+            entries.setdefault(word, frequency)
+        sorted_words = sorted(entries)
+        self.automaton = WordAutomaton(sorted_words, [entries[word] for word in sorted_words], self.ac_size)
+        self.pending = {}
+
+    def wait_rebuild(self):
+        """
+        wait for the background rebuild, if any, to be published
+        """
+        if self.rebuilding != None:
+            self.rebuilding.join()
+
+    def rebuild(self, automaton: WordAutomaton, changes: dict):
+        """
+        body of the background thread: build an automaton from automaton and changes,
+        then publish it and drop the changes it includes from the overlay
+        @param automaton, changes: the automaton and the copy of the overlay the new one is built from
+        """
+        entries = dict(automaton.words())
+        for word, frequency in changes.items():
+            if frequency > 0:
+                entries[word] = frequency
+            else:
+                entries.pop(word, None)
+        sorted_words = sorted(entries)
+        rebuilt = WordAutomaton(sorted_words, [entries[word] for word in sorted_words], self.ac_size)
+        with self.lock:
+            self.automaton = rebuilt
+            for word, frequency in changes.items():
+                # A word changed again since the copy stays in the overlay
+                if self.pending.get(word) == frequency:
+                    del self.pending[word]
+            self.rebuilding = None
+
+    def record(self, word: str, frequency: int):
+        """
+        record an added (frequency > 0) or deleted (frequency 0) word in the overlay,
+        starting a background rebuild once the overlay is large enough
+        """
+        with self.lock:
+            self.pending[word] = frequency
+            if len(self.pending) >= self.rebuild_threshold and self.rebuilding == None:
+                self.rebuilding = threading.Thread(target=self.rebuild, args=(self.automaton, dict(self.pending)),
+                                                   daemon=True)
+                self.rebuilding.start()
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        frequency = self.pending.get(word)
+        if frequency != None:
+            return frequency
+        automaton = self.automaton
+        rank = automaton.rank(word)
+        return automaton.frequency(rank) if rank != NIL else 0
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if self.search(word_frequency.word) > 0:
+            return False
+        self.record(word_frequency.word, word_frequency.frequency)
+        return True
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if self.search(word) == 0:
+            return False
+        self.record(word, 0)
+        return True
+
+    def autocomplete(self, word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        with self.lock:
+            automaton = self.automaton
+            changes = [(key, frequency) for key, frequency in self.pending.items() if key.startswith(word)]
+        if not changes:
+            return automaton.autocomplete(word)
+        # The most frequent words of the automaton that are still in the dictionary
+        ac_lst = []
+        changed = {key for key, _ in changes}
+        for entry in automaton.top_words(word):
+            if len(ac_lst) == self.ac_size:
+                break
+            if entry.word not in changed:
+                ac_lst.append(entry)
+        # merged with the words added since it was built
+        ac_lst.extend(WordFrequency(key, frequency) for key, frequency in changes if frequency > 0)
+        ac_lst.sort(key=lambda entry: (-entry.frequency, entry.word))
+        return ac_lst[:self.ac_size]
@@ -1,3 +1,4 @@
+import heapq
 from dictionary.base_dictionary import BaseDictionary
 from dictionary.word_frequency import WordFrequency
 
@@ -9,8 +10,17 @@ from dictionary.word_frequency import WordFrequency
 # ------------------------------------------------------------------------
 
 class HashTableDictionary(BaseDictionary):
-    def __init__(self):
+    def __init__(self, index_prefix_length: int = 3, ac_size: int = 3):
         self.data = {}
+        # Prefixes of up to index_prefix_length letters are indexed, 0 disables the index. Indexing every word
+        # makes building the dictionary about 8 times slower (0.95 s instead of 0.11 s for 200k words).
+        self.index_prefix_length = index_prefix_length
+        # number of most-frequent words returned by autocomplete
+        self.ac_size = ac_size
+        self.prefix_top = {}        # indexed prefix -> its ac_size most frequent words, most frequent first
+        self.prefix_size = {}       # indexed prefix -> number of words having it
+        self.prefix_children = {'': set()}  # '' or indexed prefix shorter than index_prefix_length -> indexed prefixes one letter longer
+        self.prefix_words = {}      # prefix of exactly index_prefix_length letters -> set of words having it
 
     def build_dictionary(self, words_frequencies: [WordFrequency]):
         """
@@ -18,6 +28,90 @@ class HashTableDictionary(BaseDictionary):
         @param words_frequencies: list of (word, frequency) to be stored
         """
         self.data = {entry.word: entry.frequency for entry in words_frequencies}
+        self.prefix_top = {}
+        self.prefix_size = {}
+        self.prefix_children = {'': set()}
+        self.prefix_words = {}
+        for word in self.data:
+            self.index_word(word)
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.data = dict(zip(words, frequencies))
+        self.prefix_top = {}
+        self.prefix_size = {}
+        self.prefix_children = {'': set()}
+        self.prefix_words = {}
+        for word in self.data:
+            self.index_word(word)
+
+    def rank(self, word: str) -> (int, str):
+        """
+        @param word: a word in the dictionary
+        @return: sort key putting the most frequent word first, ties broken alphabetically
+        """
+        return (-self.data[word], word)
+
+    def index_word(self, word: str):
+        """
+        add a word already stored in self.data to the prefix index
+        @param word: the word to be indexed
+        """
+        for length in range(1, min(len(word), self.index_prefix_length) + 1):
+            prefix = word[:length]
+            top = self.prefix_top.get(prefix)
+            if top == None:
+                top = self.prefix_top[prefix] = []
+                self.prefix_size[prefix] = 0
+                if length < self.index_prefix_length:
+                    self.prefix_children[prefix] = set()
+                else:
+                    self.prefix_words[prefix] = set()
+                self.prefix_children[word[:length - 1]].add(prefix)
+            self.prefix_size[prefix] += 1
+            if length == self.index_prefix_length:
+                self.prefix_words[prefix].add(word)
+            # Insert the word in the top list if it is among the ac_size most frequent
+            key = self.rank(word)
+            i = len(top)
+            while i > 0 and self.rank(top[i - 1]) > key:
+                i -= 1
+            if i < self.ac_size:
+                top.insert(i, word)
+                del top[self.ac_size:]
+
+    def unindex_word(self, word: str):
+        """
+        remove a word from the prefix index while it is still in self.data,
+        longest prefix first so that shorter prefixes are recomputed from up-to-date children
+        @param word: the word to be removed
+        """
+        for length in range(min(len(word), self.index_prefix_length), 0, -1):
+            prefix = word[:length]
+            self.prefix_size[prefix] -= 1
+            if length == self.index_prefix_length:
+                self.prefix_words[prefix].discard(word)
+            if self.prefix_size[prefix] == 0:
+                del self.prefix_top[prefix]
+                del self.prefix_size[prefix]
+                self.prefix_children.pop(prefix, None)
+                self.prefix_words.pop(prefix, None)
+                self.prefix_children[word[:length - 1]].discard(prefix)
+            elif word in self.prefix_top[prefix]:
+                # Candidates are the prefix itself if it is a word, then the top words of the children
+                # or, at the last indexed level, every word having the prefix
+                if length == self.index_prefix_length:
+                    candidates = self.prefix_words[prefix]
+                else:
+                    candidates = [prefix] if prefix != word and prefix in self.data else []
+                    for child in self.prefix_children[prefix]:
+                        candidates.extend(self.prefix_top[child])
+                self.prefix_top[prefix] = heapq.nsmallest(self.ac_size + 1,
+                                                          (candidate for candidate in candidates if candidate != word),
+                                                          key=self.rank)[:self.ac_size]
 
     def search(self, word: str) -> int:
         """
@@ -27,6 +121,15 @@ class HashTableDictionary(BaseDictionary):
         """
         return self.data.get(word, 0)
 
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        get = self.data.get
+        return [get(word, 0) for word in words]
+
     def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
         """
         add a word and its frequency to the dictionary
@@ -38,6 +141,7 @@ class HashTableDictionary(BaseDictionary):
             return False
         else:
             self.data[word_frequency.word] = word_frequency.frequency
+            self.index_word(word_frequency.word)
             return True
 
     def delete_word(self, word: str) -> bool:
@@ -48,6 +152,7 @@ class HashTableDictionary(BaseDictionary):
         """
         freq = self.search(word)
         if freq > 0:
+            self.unindex_word(word)
             del self.data[word]
             return True
         else:
@@ -60,7 +165,36 @@ class HashTableDictionary(BaseDictionary):
         @param word: word to be autocompleted
         @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
         """
+        # Short prefixes are answered straight from the index
+        if 0 < len(word) <= self.index_prefix_length:
+            return [WordFrequency(key, self.data[key]) for key in self.prefix_top.get(word, [])]
+        if self.index_prefix_length > 0 and not word:
+            # Every word has the empty prefix: the most frequent ones are among the top words of the one-letter prefixes
+            candidates = [key for prefix in self.prefix_children[''] for key in self.prefix_top[prefix]]
+        elif self.index_prefix_length > 0:
+            # Longer prefixes only need to scan the words sharing their first index_prefix_length letters
+            candidates = self.prefix_words.get(word[:self.index_prefix_length], ())
+        else:
+            candidates = self.data
         # Find the keys that start with a given prefix
-        autoDic = {key: freq for key, freq in self.data.items() if key.startswith(word)}
-        # Use Python's built-in sorting algorithm to sort autoDic by frequency and return the last three elements in descending order.
-        return [WordFrequency(key, freq) for key, freq in sorted(autoDic.items(), key=lambda item: item[1], reverse=True)][:3]
+        matches = [key for key in candidates if key.startswith(word)]
+        return [WordFrequency(key, self.data[key]) for key in heapq.nsmallest(self.ac_size, matches, key=self.rank)]
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: prefixes of the index updated by an addition or a deletion, candidates scanned by autocomplete
+        """
+        if command == 'A' or command == 'D':
+            changed = (word in self.data) == (command == 'D')
+            return {'index_updates': min(len(word), self.index_prefix_length) if changed else 0}
+        elif command == 'AC':
+            if 0 < len(word) <= self.index_prefix_length:
+                return {'candidates': len(self.prefix_top.get(word, ()))}
+            elif self.index_prefix_length > 0 and not word:
+                return {'candidates': sum(len(self.prefix_top[prefix]) for prefix in self.prefix_children[''])}
+            elif self.index_prefix_length > 0:
+                return {'candidates': len(self.prefix_words.get(word[:self.index_prefix_length], ()))}
+            return {'candidates': len(self.data)}
+        return {}
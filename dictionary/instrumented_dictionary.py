@@ -0,0 +1,133 @@
+import time
+from array import array
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Instrumentation wrapper that can wrap any dictionary implementation.
+#
+# Every S, A, D and AC call is timed and its latency kept, so that the
+# percentiles and a histogram can be reported per command. Before the call,
+# the wrapped dictionary is asked through operation_cost() for the work the
+# call is about to do (nodes visited, comparisons, shifted elements,
+# autocomplete candidates...), and those counts are accumulated per command.
+# The counting happens outside the timed call, and an agent that is not
+# wrapped pays nothing at all.
+# ------------------------------------------------------------------------
+
+COMMANDS = ('S', 'A', 'D', 'AC')
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_latencies: array, percent: int) -> int:
+    """
+    @param sorted_latencies, percent: latencies in ascending order, percentile to be computed
+    @return: the nearest-rank percentile, 0 if there is no latency
+    """
+    if not sorted_latencies:
+        return 0
+    rank = max(-(-len(sorted_latencies) * percent // 100), 1)
+    return sorted_latencies[rank - 1]
+
+
+class InstrumentedDictionary(BaseDictionary):
+    def __init__(self, agent: BaseDictionary):
+        self.agent = agent                                              # the wrapped dictionary
+        self.latencies = {command: array('q') for command in COMMANDS}  # nanoseconds of each call
+        self.counters = {command: {} for command in COMMANDS}           # counter name -> total
+
+    def measure(self, command: str, word: str, operation, argument):
+        """
+        accumulate the cost of an operation and record its latency
+        @param command, word: the command and the word or prefix it applies to
+        @param operation, argument: the method of the wrapped dictionary and its argument
+        @return: what the operation returns
+        """
+        counters = self.counters[command]
+        for name, count in self.agent.operation_cost(command, word).items():
+            counters[name] = counters.get(name, 0) + count
+        start_time = time.perf_counter_ns()
+        result = operation(argument)
+        self.latencies[command].append(time.perf_counter_ns() - start_time)
+        return result
+
+    def stats(self) -> dict:
+        """
+        @return: per command, the number of calls, the latency percentiles and histogram in nanoseconds,
+        and the total and mean per call of each counter
+        """
+        stats = {}
+        for command in COMMANDS:
+            latencies = array('q', sorted(self.latencies[command]))
+            calls = len(latencies)
+            # Number of calls per power-of-two latency bucket, keyed by the upper bound of the bucket
+            histogram = {}
+            for latency in latencies:
+                bound = 1 << max(latency, 1).bit_length()
+                histogram[bound] = histogram.get(bound, 0) + 1
+            stats[command] = {
+                'calls': calls,
+                'latency_ns': {f"p{percent}": percentile(latencies, percent) for percent in PERCENTILES},
+                'histogram_ns': {f"<{bound}": count for bound, count in histogram.items()},
+                'counters': {name: {'total': total, 'mean': total / calls if calls else 0}
+                             for name, total in self.counters[command].items()},
+            }
+            if calls:
+                stats[command]['latency_ns']['max'] = latencies[-1]
+                stats[command]['latency_ns']['mean'] = sum(latencies) / calls
+        return stats
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.agent.build_dictionary(words_frequencies)
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.agent.build_from_columns(words, frequencies)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.measure('S', word, self.agent.search, word)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        return self.measure('A', word_frequency.word, self.agent.add_word_frequency, word_frequency)
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        return self.measure('D', word, self.agent.delete_word, word)
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.measure('AC', prefix_word, self.agent.autocomplete, prefix_word)
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: the cost reported by the wrapped dictionary
+        """
+        return self.agent.operation_cost(command, word)
@@ -0,0 +1,311 @@
+import os
+import threading
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.loader import load_columns
+
+
+# ------------------------------------------------------------------------
+# Append-only journal of the words added and deleted, so that they survive
+# the process without rewriting the whole data file after every change.
+#
+# Each successful change is one line in the command file format, 'A word
+# frequency' or 'D word'. Lines are written in groups: a group is written
+# and fsynced once sync_every lines are pending (group commit), and on
+# close. With sync_every > 1 a crash can lose the last sync_every - 1
+# acknowledged changes; with 1 every change is on disk before it returns.
+#
+# On startup the journal is replayed over the base file. A line cut by a
+# crash has no newline: it is ignored and cut off before appending again.
+#
+# Once compact_size lines are in the journal it is sealed (renamed to
+# <journal>.compacting) and a new one is started. A background thread folds
+# the sealed journal into the base, writes it to <journal>.base, fsyncs and
+# renames it in place, then removes the sealed journal. From then on the
+# base file is <journal>.base instead of the data file, and replay reads at
+# most the sealed journal and compact_size lines more.
+#
+# A crash between the rename and the removal replays the sealed journal
+# over a base that already includes it, which is harmless: for every word,
+# only the changes after its last delete count, and a repeated add of a
+# word already present fails.
+# ------------------------------------------------------------------------
+
+# number of journal lines after which the journal is compacted into a new base
+COMPACT_SIZE = 1 << 16
+
+
+class MutationJournal:
+    def __init__(self, journal_filename: str, data_filename: str, sync_every: int = 64,
+                 compact_size: int = COMPACT_SIZE):
+        self.journal_filename = journal_filename
+        self.sealed_filename = journal_filename + '.compacting'
+        self.compacted_filename = journal_filename + '.base'
+        self.data_filename = data_filename      # the base file until the first compaction
+        self.sync_every = sync_every            # lines per group commit
+        self.compact_size = compact_size
+        self.journal_file = None                # the journal, opened for appending by replay()
+        self.pending = []                       # lines not written yet
+        self.num_lines = 0                      # lines in the journal, pending ones included
+        self.compacting = None                  # background thread compacting the sealed journal
+        self.error = None                       # exception raised by the last compaction, if any
+
+    def base_filename(self) -> str:
+        """
+        @return: the file the dictionary is built from before the journal is replayed
+        """
+        return self.compacted_filename if os.path.isfile(self.compacted_filename) else self.data_filename
+
+    def replay(self, agent: BaseDictionary) -> int:
+        """
+        apply the sealed journal, if any, and the journal to a dictionary built from base_filename(),
+        then open the journal for appending
+        @param agent: the dictionary
+        @return: number of changes replayed
+        """
+        num_replayed = 0
+        if os.path.isfile(self.sealed_filename):
+            num_replayed += replay_file(agent, self.sealed_filename)[0]
+        if os.path.isfile(self.journal_filename):
+            num_lines, complete_size = replay_file(agent, self.journal_filename)
+            num_replayed += num_lines
+            self.num_lines = num_lines
+            # Cut off a line left incomplete by a crash
+            if complete_size < os.path.getsize(self.journal_filename):
+                os.truncate(self.journal_filename, complete_size)
+        self.journal_file = open(self.journal_filename, 'a')
+        if os.path.isfile(self.sealed_filename):
+            # The last compaction did not finish
+            self.start_compaction()
+        else:
+            self.maybe_compact()
+        return num_replayed
+
+    def record(self, command: str, word: str, frequency: int = None):
+        """
+        append a change to the journal
+        @param command, word, frequency: 'A' with the word and its frequency, or 'D' with the word
+        """
+        self.pending.append(f"A {word} {frequency}\n" if command == 'A' else f"D {word}\n")
+        self.num_lines += 1
+        if len(self.pending) >= self.sync_every:
+            self.sync()
+            self.maybe_compact()
+
+    def sync(self):
+        """
+        write the pending lines and fsync the journal
+        """
+        if self.pending:
+            self.journal_file.write(''.join(self.pending))
+            self.pending.clear()
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+
+    def maybe_compact(self):
+        """
+        seal the journal and start compacting it once it holds compact_size lines,
+        unless the previous compaction is still running or failed
+        """
+        if self.num_lines < self.compact_size or os.path.isfile(self.sealed_filename):
+            return
+        self.sync()
+        self.journal_file.close()
+        os.replace(self.journal_filename, self.sealed_filename)
+        self.journal_file = open(self.journal_filename, 'a')
+        sync_directory(self.journal_filename)
+        self.num_lines = 0
+        self.start_compaction()
+
+    def start_compaction(self):
+        """
+        start the background thread folding the sealed journal into the base
+        """
+        self.compacting = threading.Thread(target=self.compact, args=(self.base_filename(),), daemon=True)
+        self.compacting.start()
+
+    def compact(self, base_filename: str):
+        """
+        body of the background thread: write base_filename with the sealed journal applied as the new base
+        @param base_filename: the current base file
+        """
+        try:
+            words, frequencies = load_columns(base_filename)
+            # The first occurrence of a duplicate word wins, as when building the dictionary
+            entries = {}
+            for word, frequency in zip(words, frequencies):
+                entries.setdefault(word, frequency)
+            with open(self.sealed_filename, 'r') as sealed_file:
+                for line in sealed_file:
+                    values = line.split()
+                    if len(values) == 3 and values[0] == 'A':
+                        entries.setdefault(values[1], int(values[2]))
+                    elif len(values) == 2 and values[0] == 'D':
+                        entries.pop(values[1], None)
+            temporary_filename = self.compacted_filename + '.tmp'
+            with open(temporary_filename, 'w') as temporary_file:
+                temporary_file.write(''.join([f"{word} {frequency}\n" for word, frequency in entries.items()]))
+                temporary_file.flush()
+                os.fsync(temporary_file.fileno())
+            os.replace(temporary_filename, self.compacted_filename)
+            sync_directory(self.compacted_filename)
+            os.remove(self.sealed_filename)
+            sync_directory(self.sealed_filename)
+            self.error = None
+        except (OSError, ValueError) as e:
+            # The sealed journal is kept: it is replayed on startup and compacted again
+            self.error = e
+
+    def wait_compaction(self):
+        """
+        wait for the background compaction, if any, to finish
+        """
+        if self.compacting != None:
+            self.compacting.join()
+
+    def close(self):
+        """
+        write and fsync the pending lines, wait for the compaction and close the journal
+        """
+        if self.journal_file != None:
+            self.sync()
+            self.journal_file.close()
+            self.journal_file = None
+        self.wait_compaction()
+
+
+def replay_file(agent: BaseDictionary, journal_filename: str) -> (int, int):
+    """
+    apply the complete lines of a journal to a dictionary
+    @param agent, journal_filename: the dictionary, the journal to be replayed
+    @return: (number of complete lines, their size in bytes)
+    """
+    with open(journal_filename, 'rb') as journal_file:
+        text = journal_file.read()
+    complete_size = text.rfind(b'\n') + 1
+    lines = text[:complete_size].decode().splitlines()
+    for line in lines:
+        values = line.split()
+        if len(values) == 3 and values[0] == 'A':
+            agent.add_word_frequency(WordFrequency(values[1], int(values[2])))
+        elif len(values) == 2 and values[0] == 'D':
+            agent.delete_word(values[1])
+    return len(lines), complete_size
+
+
+def sync_directory(filename: str):
+    """
+    fsync the directory holding a file, so that a rename or removal in it is on disk
+    @param filename: the file
+    """
+    directory = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+class JournaledDictionary(BaseDictionary):
+    def __init__(self, agent: BaseDictionary, journal: MutationJournal):
+        self.agent = agent          # the wrapped dictionary, built from the base file with the journal replayed
+        self.journal = journal      # records every successful add and delete
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.agent.build_dictionary(words_frequencies)
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.agent.build_from_columns(words, frequencies)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.agent.search(word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        return self.agent.search_many(words)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if self.agent.add_word_frequency(word_frequency):
+            self.journal.record('A', word_frequency.word, word_frequency.frequency)
+            return True
+        return False
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if self.agent.delete_word(word):
+            self.journal.record('D', word)
+            return True
+        return False
+
+    def add_many(self, words_frequencies: [WordFrequency]) -> [bool]:
+        """
+        add a batch of words
+        @param words_frequencies: list of (word, frequency) to be added
+        @return: whether each addition succeeded, as if they were added one by one in batch order
+        """
+        results = self.agent.add_many(words_frequencies)
+        for word_frequency, result in zip(words_frequencies, results):
+            if result:
+                self.journal.record('A', word_frequency.word, word_frequency.frequency)
+        return results
+
+    def delete_many(self, words: [str]) -> [bool]:
+        """
+        delete a batch of words
+        @param words: words to be deleted
+        @return: whether each deletion succeeded, as if they were deleted one by one in batch order
+        """
+        results = self.agent.delete_many(words)
+        for word, result in zip(words, results):
+            if result:
+                self.journal.record('D', word)
+        return results
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.agent.autocomplete(prefix_word)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes
+        @param prefix_words: the prefixes to be autocompleted
+        @return: the autocomplete list of each prefix
+        """
+        return self.agent.autocomplete_many(prefix_words)
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: the cost reported by the wrapped dictionary
+        """
+        return self.agent.operation_cost(command, word)
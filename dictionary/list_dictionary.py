@@ -2,6 +2,17 @@ from dictionary.word_frequency import WordFrequency
 from dictionary.base_dictionary import BaseDictionary
 import time
 import math
+import bisect
+import copy
+import heapq
+import itertools
+import operator
+from array import array
+
+# position of a heap item of top_entries standing for a range of blocks rather than a range within a block
+BLOCK_RANGE = -1
+# key of the frequency of an entry
+FREQUENCY_KEY = operator.attrgetter('frequency')
 
 # ------------------------------------------------------------------------
 # This class is required TO BE IMPLEMENTED. List-based dictionary implementation.
@@ -11,8 +22,19 @@ import math
 # ------------------------------------------------------------------------
 
 class ListDictionary(BaseDictionary):
-    def __init__(self):
-        self.data = [];
+    def __init__(self, block_size: int = 512, ac_size: int = 3):
+        # The sorted words are kept in consecutive blocks so that an insertion or a deletion
+        # only shifts the elements of one block. A block is split once it exceeds 2 * block_size.
+        self.block_size = block_size
+        self.blocks = []    # sorted blocks of WordFrequency, all words of blocks[i] < all words of blocks[i + 1]
+        self.keys = []      # words of each block, parallel to self.blocks
+        self.mins = []      # first word of each block
+        # Range-maximum index over the frequencies for autocomplete
+        self.trees = []     # max tree over the frequencies of each block, None once the block changed
+        self.bests = []     # most frequent entry of each block
+        self.best_tree = self.build_max_tree([])    # max tree over the frequencies of self.bests
+        # number of most-frequent words returned by autocomplete
+        self.ac_size = ac_size
 
     def partition(self, data, i, k, by):
         midpoint = i + (k - i) // 2
@@ -93,6 +115,13 @@ class ListDictionary(BaseDictionary):
             # Merge left and right partition in sorted order
             self.merge(data, i, j, k, by)
 
+    @property
+    def data(self) -> [WordFrequency]:
+        """
+        @return: all the entries as a single list sorted by word
+        """
+        return [entry for block in self.blocks for entry in block]
+
     def __str__(self):
         str = ""
         for items in self.data:
@@ -104,79 +133,164 @@ class ListDictionary(BaseDictionary):
         construct the data structure to store nodes
         @param words_frequencies: list of (word, frequency) to be stored
         """
-        self.data = words_frequencies
         # self.quicksort(self.data, 0, len(self.data) - 1, "word")
-        self.data.sort(key=lambda x: x.word)
+        sorted_entries = sorted(words_frequencies, key=lambda x: x.word)
+        self.blocks = [sorted_entries[i:i + self.block_size] for i in range(0, len(sorted_entries), self.block_size)]
+        self.keys = [[entry.word for entry in block] for block in self.blocks]
+        self.mins = [keys[0] for keys in self.keys]
+        self.trees = [self.build_max_tree([entry.frequency for entry in block]) for block in self.blocks]
+        self.bests = [block[self.range_max(tree, 0, len(block))] for block, tree in zip(self.blocks, self.trees)]
+        self.build_best_tree()
+
+    def build_max_tree(self, values: [int]) -> (array, [int]):
+        """
+        build a max tree: node i covers nodes 2i and 2i + 1, leaves len(values) to 2 * len(values) - 1 are
+        the positions of values, and every node holds the position of the largest value it covers
+        @param values: the values, e.g. frequencies in alphabetical order of word
+        @return: (tree, values)
+        """
+        size = len(values)
+        tree = array('i', [0]) * size + array('i', range(size))
+        for node in range(size - 1, 0, -1):
+            left, right = tree[2 * node], tree[2 * node + 1]
+            tree[node] = left if values[left] >= values[right] else right
+        return (tree, values)
+
+    def range_max(self, max_tree: (array, [int]), low: int, high: int) -> int:
+        """
+        @param max_tree: (tree, values) as returned by build_max_tree
+        @param low, high: a non-empty range of positions, high excluded
+        @return: the position of the largest value in the range, the first one on a tie
+        """
+        tree, values = max_tree
+        size = len(values)
+        # Parts met from the left come in ascending position and parts from the right in descending position,
+        # so the earlier position wins a tie on each side, and the left side wins against the right
+        bestLeft = bestRight = -1
+        low += size
+        high += size
+        while low < high:
+            if low & 1:
+                if bestLeft < 0 or values[tree[low]] > values[bestLeft]:
+                    bestLeft = tree[low]
+                low += 1
+            if high & 1:
+                high -= 1
+                if bestRight < 0 or values[tree[high]] >= values[bestRight]:
+                    bestRight = tree[high]
+            low >>= 1
+            high >>= 1
+        if bestRight < 0 or (bestLeft >= 0 and values[bestLeft] >= values[bestRight]):
+            return bestLeft
+        return bestRight
+
+    def update_max_tree(self, max_tree: (array, [int]), position: int, value: int):
+        """
+        change one value of a max tree in place, recomputing the nodes above it
+        @param max_tree: (tree, values) as returned by build_max_tree
+        @param position, value: the position and its new value
+        """
+        tree, values = max_tree
+        values[position] = value
+        node = (len(values) + position) >> 1
+        while node > 0:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            tree[node] = left if values[left] >= values[right] else right
+            node >>= 1
+
+    def build_best_tree(self):
+        """
+        rebuild the max tree over the most frequent entry of each block, once blocks were split or dropped
+        """
+        self.best_tree = self.build_max_tree([best.frequency for best in self.bests])
+
+    def block_tree(self, blockIdx: int) -> (array, [int]):
+        """
+        @param blockIdx: a block
+        @return: the max tree over the frequencies of the block, rebuilt if the block changed since
+        """
+        if self.trees[blockIdx] == None:
+            self.trees[blockIdx] = self.build_max_tree([entry.frequency for entry in self.blocks[blockIdx]])
+        return self.trees[blockIdx]
+
+    def refresh_best(self, blockIdx: int):
+        """
+        recompute the most frequent entry of a block after it was deleted, updating the tree over the blocks
+        @param blockIdx: a block
+        """
+        block = self.blocks[blockIdx]
+        self.bests[blockIdx] = block[self.range_max(self.block_tree(blockIdx), 0, len(block))]
+        self.update_max_tree(self.best_tree, blockIdx, self.bests[blockIdx].frequency)
+
+    def lower_bound(self, word: str) -> (int, int):
+        """
+        binary search for the first position holding a word >= 'word'
+        @param word: the word to be searched
+        @return: (block index, index within the block); the index equals the block length only
+        when 'word' is greater than every word, in which case the block is the last one
+        """
+        if not self.blocks:
+            return (0, 0)
+        # The last block whose first word is <= word; the first block if there is none
+        blockIdx = max(bisect.bisect_right(self.mins, word) - 1, 0)
+        idx = bisect.bisect_left(self.keys[blockIdx], word)
+        # Every word in the block is smaller, so the position is the start of the next block
+        if idx == len(self.keys[blockIdx]) and blockIdx < len(self.blocks) - 1:
+            return (blockIdx + 1, 0)
+        return (blockIdx, idx)
 
-    def binSearch(self, word:str) -> (bool, int):
+    def binSearch(self, word:str) -> (bool, int, int):
         """
         binary search for a word
         @param word: the word to be searched
-        @return: (True, the index of word_frequencies) OR (False, the index of word_frequencies to be inserted into)
+        @return: (True, block index, index within the block) OR (False, block index, index within the block to be inserted into)
         """
-        low, mid, high = 0, 0, len(self.data) - 1
+        blockIdx, idx = self.lower_bound(word)
+        if self.blocks and idx < len(self.keys[blockIdx]) and self.keys[blockIdx][idx] == word:
+            return (True, blockIdx, idx)
+        return (False, blockIdx, idx)
 
-        while low <= high:
-            mid = (low + high) // 2
-            if self.data[mid].word > word:
-                high = mid - 1
-            elif self.data[mid].word < word:
-                low = mid + 1
-            else:
-                return (True, mid)
-        if word >= self.data[mid].word:
-            return (False, mid + 1)
-        else:
-            return (False, mid)
+    def prefix_range(self, prefix_word: str) -> ((int, int), (int, int)):
+        """
+        find the positions bounding all the words that have 'prefix_word' as a prefix with two binary searches
+        @param prefix_word: the prefix to be searched
+        @return: ((block, index) of the first word >= prefix_word, (block, index) of the first word past the prefix range)
+        """
+        low = self.lower_bound(prefix_word)
+        # The smallest string greater than every word starting with prefix_word
+        successor = prefix_word.rstrip(chr(0x10FFFF))
+        if not successor:
+            return (low, self.end_position())
+        successor = successor[:-1] + chr(ord(successor[-1]) + 1)
+        return (low, self.lower_bound(successor))
 
-    def binSearchAC(self, prefix_word:str) -> int:
+    def end_position(self) -> (int, int):
         """
-        binary search for a prefix
-        @param prefix: the prefix to be searched
-        @return: if found: the index of the first encountered word with the same prefix; if not: -1
+        @return: (block, index) just past the last word
         """
-        # The implementation is almost identical to binSearch except that prefix is compared to word upto its own length
-        low, mid, high = 0, 0, len(self.data) - 1
+        if not self.blocks:
+            return (0, 0)
+        return (len(self.blocks) - 1, len(self.blocks[-1]))
 
-        while low <= high:
-            mid = (low + high) // 2
-            if self.data[mid].word[:len(prefix_word)] > prefix_word:
-                high = mid - 1
-            elif self.data[mid].word[:len(prefix_word)] < prefix_word:
-                low = mid + 1
-            else:
-                return mid
-        return -1
-
-    def getAutocompleteList(self, prefix_word: str, idx: int) -> [WordFrequency]:
-        """
-        add all the words sharing the same prefix_word to a list and return it unsorted
-        @param prefix_word: the prefix_word to be searched, idx: the starting index to search from in both directions (left and right)
-        @return: an unsorted list containing all the words sharing the same prefix_word
-        """
-        res = []
-        # Add the first word
-        res.append(self.data[idx])
-        left_idx = idx - 1
-        right_idx = idx + 1
-
-        if left_idx >= 0:
-            curr_left_word = self.data[left_idx].word[:len(prefix_word)]
-        # Add words to the left of the first word
-        while left_idx > 0 and curr_left_word == prefix_word:
-            res.append(self.data[left_idx])
-            left_idx -= 1
-            curr_left_word = self.data[left_idx].word[:len(prefix_word)]
-
-        if right_idx <= len(self.data) - 1:
-            curr_right_word = self.data[right_idx].word[:len(prefix_word)]
-        # Add words to the right of the first word
-        while right_idx < len(self.data) - 1 and curr_right_word == prefix_word:
-            res.append(self.data[right_idx])
-            right_idx += 1
-            curr_right_word = self.data[right_idx].word[:len(prefix_word)]
-
-        return res
+    def copy_for_write(self, word: str):
+        """
+        copy the dictionary for SnapshotDictionary: the outer lists are copied, the blocks shared,
+        except the block in which 'word' would be added or deleted
+        @param word: the word about to be added or deleted
+        @return: a ListDictionary that can be changed without affecting this one
+        """
+        new = copy.copy(self)
+        new.blocks = list(self.blocks)
+        new.keys = list(self.keys)
+        new.mins = list(self.mins)
+        new.trees = list(self.trees)
+        new.bests = list(self.bests)
+        new.best_tree = (array('i', self.best_tree[0]), list(self.best_tree[1]))
+        if self.blocks:
+            isFound, blockIdx, idx = self.binSearch(word)
+            new.blocks[blockIdx] = list(self.blocks[blockIdx])
+            new.keys[blockIdx] = list(self.keys[blockIdx])
+        return new
 
     def search(self, word: str) -> int:
         """
@@ -185,11 +299,11 @@ class ListDictionary(BaseDictionary):
         @return: frequency > 0 if found and 0 if NOT found
         """
         # Employ binary search
-        isFound, foundIdx = self.binSearch(word)
+        isFound, blockIdx, foundIdx = self.binSearch(word)
         if not isFound:
             return 0
         else:
-            return self.data[foundIdx].frequency
+            return self.blocks[blockIdx][foundIdx].frequency
 
     def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
         """
@@ -197,23 +311,46 @@ class ListDictionary(BaseDictionary):
         @param word_frequency: (word, frequency) to be added
         :return: True whether succeeded, False when word is already in the dictionary
         """
+        word = word_frequency.word
+        if not self.blocks:
+            self.blocks.append([word_frequency])
+            self.keys.append([word])
+            self.mins.append(word)
+            self.trees.append(None)
+            self.bests.append(word_frequency)
+            self.build_best_tree()
+            return True
         # Employ binary search
-        if len(self.data) == 0:
-            self.data.append(word_frequency)
-        else:
-            word = word_frequency.word
-            isFound, foundIdx = self.binSearch(word)
-            actualLength = len(self.data)
-            if isFound:
-                return False
-            # If not found, add the word in self.data
-            else:
-                # Create space to shuffle elements to the right by 1
-                self.data.append(None)
-                for i in range(actualLength - 1, foundIdx - 1, -1):
-                    self.data[i + 1] = self.data[i]
-                self.data[foundIdx] = word_frequency
-                return True
+        isFound, blockIdx, foundIdx = self.binSearch(word)
+        if isFound:
+            return False
+        # If not found, add the word in its block, shifting only the rest of that block
+        block = self.blocks[blockIdx]
+        keys = self.keys[blockIdx]
+        block.insert(foundIdx, word_frequency)
+        keys.insert(foundIdx, word)
+        if foundIdx == 0:
+            self.mins[blockIdx] = word
+        self.trees[blockIdx] = None
+        best = self.bests[blockIdx]
+        if word_frequency.frequency > best.frequency or (word_frequency.frequency == best.frequency and word < best.word):
+            self.bests[blockIdx] = word_frequency
+            self.update_max_tree(self.best_tree, blockIdx, word_frequency.frequency)
+        # Split a block that has grown too large into two halves
+        if len(block) > 2 * self.block_size:
+            half = len(block) // 2
+            self.blocks[blockIdx + 1:blockIdx + 1] = [block[half:]]
+            self.keys[blockIdx + 1:blockIdx + 1] = [keys[half:]]
+            self.mins.insert(blockIdx + 1, keys[half])
+            del block[half:]
+            del keys[half:]
+            self.trees.insert(blockIdx + 1, None)
+            self.bests.insert(blockIdx + 1, None)
+            for halfIdx in (blockIdx, blockIdx + 1):
+                halfBlock = self.blocks[halfIdx]
+                self.bests[halfIdx] = halfBlock[self.range_max(self.block_tree(halfIdx), 0, len(halfBlock))]
+            self.build_best_tree()
+        return True
 
     def delete_word(self, word: str) -> bool:
         """
@@ -221,18 +358,203 @@ class ListDictionary(BaseDictionary):
         @param word: word to be deleted
         @return: whether succeeded, e.g. return False when point not found
         """
-        isFound, foundIdx = self.binSearch(word)
-        if isFound:
-            for i in range(foundIdx, len(self.data) - 1):
-                self.data[i] = self.data[i + 1]
-            # In all cases, the last element will be deleted if the word is found
-            del self.data[-1]
-            return True
-        # If found, delete the word in self.data
-        else:
+        isFound, blockIdx, foundIdx = self.binSearch(word)
+        # If not found, there is nothing to delete
+        if not isFound:
             return False
+        keys = self.keys[blockIdx]
+        deleted = self.blocks[blockIdx][foundIdx]
+        del self.blocks[blockIdx][foundIdx]
+        del keys[foundIdx]
+        self.trees[blockIdx] = None
+        # Drop a block once it is empty
+        if not keys:
+            del self.blocks[blockIdx]
+            del self.keys[blockIdx]
+            del self.mins[blockIdx]
+            del self.trees[blockIdx]
+            del self.bests[blockIdx]
+            self.build_best_tree()
+            return True
+        if foundIdx == 0:
+            self.mins[blockIdx] = keys[0]
+        if self.bests[blockIdx] is deleted:
+            self.refresh_best(blockIdx)
+        return True
+
+    def add_many(self, words_frequencies: [WordFrequency]) -> [bool]:
+        """
+        add a batch of words: the batch is sorted and grouped by block, so that each block it falls in is
+        updated once, its most frequent entry compared once, and blocks split and the max tree over the
+        blocks updated once for the whole batch
+        @param words_frequencies: list of (word, frequency) to be added
+        @return: whether each addition succeeded, as if they were added one by one in batch order
+        """
+        results = [False] * len(words_frequencies)
+        words = [entry.word for entry in words_frequencies]
+        # The stable sort keeps the duplicates of a word in batch order, the first one is added
+        order = sorted(range(len(words)), key=words.__getitem__)
+        # block index -> (indices within the block, new entries) in word order, kept in two lists so that
+        # no object tracked by the garbage collector is created per word
+        insertions = {}
+        mins, allKeys = self.mins, self.keys
+        blockIdx = 0
+        keys = allKeys[0] if allKeys else []
+        lastWord = None
+        for i in order:
+            word = words[i]
+            if word == lastWord:
+                continue
+            lastWord = word
+            # The batch is sorted: the block of a word is searched from the block of the previous word on.
+            # A word past the end of its block is added there, rather than at the start of the next block
+            nextIdx = bisect.bisect_right(mins, word, blockIdx) - 1
+            if nextIdx > blockIdx:
+                blockIdx = nextIdx
+                keys = allKeys[blockIdx]
+            idx = bisect.bisect_left(keys, word)
+            if idx == len(keys) or keys[idx] != word:
+                results[i] = True
+                blockInsertions = insertions.get(blockIdx)
+                if blockInsertions == None:
+                    insertions[blockIdx] = blockInsertions = ([], [])
+                blockInsertions[0].append(idx)
+                blockInsertions[1].append(words_frequencies[i])
+        if not insertions:
+            return results
+        if not self.blocks:
+            # The words are added to a first, empty block
+            self.blocks, self.keys, self.mins, self.trees, self.bests = [[]], [[]], [''], [None], [None]
+            self.best_tree = self.build_max_tree([0])
+
+        rebested = []       # blocks whose most frequent entry changed
+        for blockIdx, (indices, newEntries) in insertions.items():
+            block = self.blocks[blockIdx]
+            keys = self.keys[blockIdx]
+            if len(newEntries) > len(block):
+                # More new entries than entries: merge them into new lists in one pass, rather than shifting
+                # the growing block once per word
+                mergedBlock = []
+                mergedKeys = []
+                prevIdx = 0
+                for idx, entry in zip(indices, newEntries):
+                    mergedBlock.extend(block[prevIdx:idx])
+                    mergedKeys.extend(keys[prevIdx:idx])
+                    mergedBlock.append(entry)
+                    mergedKeys.append(entry.word)
+                    prevIdx = idx
+                mergedBlock.extend(block[prevIdx:])
+                mergedKeys.extend(keys[prevIdx:])
+                self.blocks[blockIdx] = mergedBlock
+                self.keys[blockIdx] = keys = mergedKeys
+            else:
+                # From the last position back, so that the positions found before the insertions stay valid
+                for idx, entry in zip(reversed(indices), reversed(newEntries)):
+                    block.insert(idx, entry)
+                    keys.insert(idx, entry.word)
+            self.mins[blockIdx] = keys[0]
+            self.trees[blockIdx] = None
+            # The new most frequent entry is the old one or an added one, the first in word order on a tie
+            best = self.bests[blockIdx]
+            for entry in newEntries:
+                if best == None or entry.frequency > best.frequency \
+                        or (entry.frequency == best.frequency and entry.word < best.word):
+                    best = entry
+            if best is not self.bests[blockIdx]:
+                self.bests[blockIdx] = best
+                rebested.append(blockIdx)
+        self.update_blocks(insertions, rebested)
+        return results
+
+    def delete_many(self, words: [str]) -> [bool]:
+        """
+        delete a batch of words: the batch is sorted and grouped by block, so that each block it falls in is
+        updated once, its most frequent entry recomputed at most once, and emptied blocks dropped and the max
+        tree over the blocks updated once for the whole batch
+        @param words: words to be deleted
+        @return: whether each deletion succeeded, as if they were deleted one by one in batch order
+        """
+        results = [False] * len(words)
+        order = sorted(range(len(words)), key=words.__getitem__)
+        deletions = {}      # block index -> ascending indices within the block
+        if not self.blocks:
+            return results
+        mins, allKeys = self.mins, self.keys
+        blockIdx = 0
+        keys = allKeys[0]
+        lastWord = None
+        for i in order:
+            word = words[i]
+            if word == lastWord:
+                continue
+            lastWord = word
+            # The batch is sorted: the block of a word is searched from the block of the previous word on
+            nextIdx = bisect.bisect_right(mins, word, blockIdx) - 1
+            if nextIdx > blockIdx:
+                blockIdx = nextIdx
+                keys = allKeys[blockIdx]
+            idx = bisect.bisect_left(keys, word)
+            if idx < len(keys) and keys[idx] == word:
+                results[i] = True
+                blockDeletions = deletions.get(blockIdx)
+                if blockDeletions == None:
+                    deletions[blockIdx] = blockDeletions = []
+                blockDeletions.append(idx)
 
+        rebested = []       # blocks whose most frequent entry changed
+        for blockIdx, blockDeletions in deletions.items():
+            block = self.blocks[blockIdx]
+            keys = self.keys[blockIdx]
+            best = self.bests[blockIdx]
+            isBestDeleted = False
+            # From the last position back, so that the positions found before the deletions stay valid
+            for idx in reversed(blockDeletions):
+                isBestDeleted = isBestDeleted or block[idx] is best
+                del block[idx]
+                del keys[idx]
+            self.trees[blockIdx] = None
+            if block:
+                self.mins[blockIdx] = keys[0]
+                if isBestDeleted:
+                    # max keeps the first of equal frequencies, i.e. the first in word order
+                    self.bests[blockIdx] = max(block, key=FREQUENCY_KEY)
+                    rebested.append(blockIdx)
+        self.update_blocks(deletions, rebested)
+        return results
 
+    def update_blocks(self, changed: dict, rebested: [int]):
+        """
+        after add_many or delete_many changed some blocks in place: split the blocks grown past
+        2 * block_size into blocks of block_size, drop the emptied blocks, and update the max tree over
+        the most frequent entry of each block
+        @param changed: the indices of the changed blocks, e.g. as the keys of a dict
+        @param rebested: the indices of the non-empty blocks whose most frequent entry changed
+        """
+        if all(0 < len(self.blocks[blockIdx]) <= 2 * self.block_size for blockIdx in changed):
+            for blockIdx in rebested:
+                self.update_max_tree(self.best_tree, blockIdx, self.bests[blockIdx].frequency)
+            return
+        blocks, keys, trees, bests = [], [], [], []
+        for blockIdx, block in enumerate(self.blocks):
+            if blockIdx not in changed or 0 < len(block) <= 2 * self.block_size:
+                blocks.append(block)
+                keys.append(self.keys[blockIdx])
+                trees.append(self.trees[blockIdx])
+                bests.append(self.bests[blockIdx])
+                continue
+            blockKeys = self.keys[blockIdx]
+            for i in range(0, len(block), self.block_size):
+                piece = block[i:i + self.block_size]
+                blocks.append(piece)
+                keys.append(blockKeys[i:i + self.block_size])
+                trees.append(None)
+                bests.append(max(piece, key=FREQUENCY_KEY))
+        self.blocks = blocks
+        self.keys = keys
+        self.mins = [blockKeys[0] for blockKeys in keys]
+        self.trees = trees
+        self.bests = bests
+        self.build_best_tree()
 
     def autocomplete(self, prefix_word: str) -> [WordFrequency]:
         """
@@ -240,13 +562,87 @@ class ListDictionary(BaseDictionary):
         @param prefix_word: word to be autocompleted
         @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
         """
-        # As soon as prefix_word matches with any word, scan all the words to its left and right and put them in a new list
-        # Iterate them only once to find the 3 most-frequent words
-        idx = self.binSearchAC(prefix_word)
-        if idx == -1:
-            return []
+        # The words sharing prefix_word are contiguous, so two bound searches delimit them exactly
+        low, high = self.prefix_range(prefix_word)
+        return list(itertools.islice(self.top_entries(low, high), self.ac_size))
+
+    def push_entries(self, heap: list, blockIdx: int, low: int, high: int):
+        """
+        push the most frequent entry of a range within a block onto the heap of top_entries
+        @param heap, blockIdx, low, high: the heap, the block and the range of indices in the block, high excluded
+        """
+        if low < high:
+            position = self.range_max(self.block_tree(blockIdx), low, high)
+            entry = self.blocks[blockIdx][position]
+            heapq.heappush(heap, (-entry.frequency, entry.word, blockIdx, low, high, position))
+
+    def push_blocks(self, heap: list, low: int, high: int):
+        """
+        push the most frequent entry of a range of whole blocks onto the heap of top_entries
+        @param heap, low, high: the heap and the range of blocks, high excluded
+        """
+        if low < high:
+            blockIdx = self.range_max(self.best_tree, low, high)
+            entry = self.bests[blockIdx]
+            heapq.heappush(heap, (-entry.frequency, entry.word, BLOCK_RANGE, low, high, blockIdx))
+
+    def top_entries(self, low: (int, int), high: (int, int)):
+        """
+        iterate over the entries between two positions from the most to the least frequent, ties in
+        alphabetical order: the heap holds ranges keyed by their most frequent entry, and the range
+        an entry is taken from is split around it, so k entries take O(k log n)
+        @param low, high: (block, index) of the first entry and (block, index) just past the last entry
+        @return: an iterator over the entries
+        """
+        if not self.blocks:
+            return
+        lowBlock, lowIdx = low
+        highBlock, highIdx = high
+        heap = []
+        if lowBlock == highBlock:
+            self.push_entries(heap, lowBlock, lowIdx, highIdx)
         else:
-            lst = self.getAutocompleteList(prefix_word, idx)
-            lst.sort(key=lambda x: x.frequency, reverse=True)
-            return lst[:3]
+            # The partial first and last blocks, and the whole blocks between them
+            self.push_entries(heap, lowBlock, lowIdx, len(self.blocks[lowBlock]))
+            self.push_blocks(heap, lowBlock + 1, highBlock)
+            self.push_entries(heap, highBlock, 0, highIdx)
+        while heap:
+            _, _, blockIdx, rangeLow, rangeHigh, position = heapq.heappop(heap)
+            if blockIdx == BLOCK_RANGE:
+                # A range of blocks is split into the block holding its most frequent entry and the blocks around
+                self.push_blocks(heap, rangeLow, position)
+                self.push_blocks(heap, position + 1, rangeHigh)
+                self.push_entries(heap, position, 0, len(self.blocks[position]))
+            else:
+                yield self.blocks[blockIdx][position]
+                self.push_entries(heap, blockIdx, rangeLow, position)
+                self.push_entries(heap, blockIdx, position + 1, rangeHigh)
 
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary.
+        Only the shifted elements are exact; the other counters are estimated in O(log n), without
+        running the binary searches or the heap of top_entries.
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: upper bound of the comparisons made by the binary searches, elements shifted within a
+        block by an addition or a deletion, estimate of the words autocomplete selects from
+        """
+        if not self.blocks:
+            return {'comparisons_bound': 0}
+        isFound, blockIdx, idx = self.binSearch(word)
+        # bisect compares at most bit_length(n) times over n elements: once over mins, once within the block
+        comparisons = len(self.mins).bit_length() + len(self.keys[blockIdx]).bit_length()
+        if command == 'A':
+            return {'comparisons_bound': comparisons, 'shifted': 0 if isFound else len(self.keys[blockIdx]) - idx}
+        elif command == 'D':
+            return {'comparisons_bound': comparisons,
+                    'shifted': len(self.keys[blockIdx]) - idx - 1 if isFound else 0}
+        elif command == 'AC':
+            (lowBlock, lowIdx), (highBlock, highIdx) = self.prefix_range(word)
+            if lowBlock == highBlock:
+                matches = highIdx - lowIdx
+            else:
+                # The partial first and last blocks are counted, the whole blocks between them taken as full
+                matches = len(self.blocks[lowBlock]) - lowIdx + (highBlock - lowBlock - 1) * self.block_size + highIdx
+            return {'comparisons_bound': 2 * comparisons, 'matches_estimate': matches}
+        return {'comparisons_bound': comparisons}
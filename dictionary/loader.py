@@ -0,0 +1,54 @@
+from array import array
+
+
+# ------------------------------------------------------------------------
+# Bulk loader for the data files, where each line holds a word and its
+# frequency. The whole file is read at once and tokenised with a single
+# split(), giving a column of words and a compact column of frequencies
+# instead of one WordFrequency object per line.
+#
+# Every line break is replaced by a separator token before the split, so
+# that checking the separator is every third token checks that every line
+# holds exactly two tokens. Otherwise, e.g. with blank lines, the file is
+# parsed line by line, which also reports the first malformed line.
+# ------------------------------------------------------------------------
+
+# token standing for a line break, never part of a data file
+LINE_SEPARATOR = '\0'
+
+
+def load_columns(data_filename: str) -> ([str], array):
+    """
+    read a data file into columns
+    @param data_filename: the data file to be read
+    @return: (list of words, array of frequencies) in file order
+    @raise ValueError: a line that is not blank does not hold a word and an integer frequency
+    """
+    with open(data_filename, 'rb') as data_file:
+        text = data_file.read().decode()
+    if LINE_SEPARATOR not in text:
+        num_lines = text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+        tokens = text.replace('\n', ' ' + LINE_SEPARATOR + ' ').split()
+        if not text.endswith('\n'):
+            tokens.append(LINE_SEPARATOR)
+        if len(tokens) == 3 * num_lines and tokens[2::3].count(LINE_SEPARATOR) == num_lines:
+            try:
+                return tokens[0::3], array('q', map(int, tokens[1::3]))
+            except ValueError:
+                pass
+
+    # Blank lines or a malformed line: parse line by line
+    words = []
+    frequencies = array('q')
+    for line_number, line in enumerate(text.split('\n'), 1):
+        values = line.split()
+        if not values:
+            continue
+        if len(values) != 2:
+            raise ValueError(f"{data_filename}:{line_number}: expected a word and its frequency, got {line!r}")
+        try:
+            frequencies.append(int(values[1]))
+        except ValueError:
+            raise ValueError(f"{data_filename}:{line_number}: frequency is not an integer in {line!r}") from None
+        words.append(values[0])
+    return words, frequencies
@@ -15,3 +15,4 @@ class Node:
         self.left = None    # pointing to the left child Node, which holds a letter < self.letter
         self.middle = None  # pointing to the middle child Node
         self.right = None   # pointing to the right child Node, which holds a letter > self.letter
+        self.top_words = [] # cached most-frequent WordFrequency ending at this node or below its middle child
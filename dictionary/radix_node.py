@@ -0,0 +1,11 @@
+# Class representing a node in the Radix Tree
+class RadixNode:
+    # Radix trees hold many small nodes, slots keep each of them free of a per-instance __dict__
+    __slots__ = ('label', 'frequency', 'end_word', 'children', 'top_words')
+
+    def __init__(self, label='', frequency=None, end_word=False):
+        self.label = label              # letters on the edge from the parent down to this node
+        self.frequency = frequency      # frequency of the word if the path down to this node spells a word
+        self.end_word = end_word        # True if the path down to this node spells a word
+        self.children = {}              # first letter of the label of each child -> child
+        self.top_words = []             # cached most-frequent WordFrequency at this node or below
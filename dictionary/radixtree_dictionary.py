@@ -0,0 +1,242 @@
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.radix_node import RadixNode
+
+
+# ------------------------------------------------------------------------
+# Path-compressed radix tree implementation.
+#
+# Every edge carries a string instead of a single letter: a chain of nodes
+# with a single child and no word, as the TST builds for the tail of most
+# words, is stored as one node. The children of a node start with distinct
+# letters and are indexed by that letter. Apart from the root, a node either
+# ends a word or has at least two children, which add and delete maintain by
+# splitting an edge when a word diverges inside it and merging a node with
+# its only child once it no longer ends a word.
+#
+# As in the TST, every node caches the ac_size most frequent words of its
+# subtree, so autocomplete only walks down to the prefix.
+# ------------------------------------------------------------------------
+
+class RadixTreeDictionary(BaseDictionary):
+    def __init__(self, ac_size: int = 3):
+        self.root = RadixNode()
+        # number of most-frequent words returned by autocomplete
+        self.ac_size = ac_size
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.root = RadixNode()
+        for entry in words_frequencies:
+            self.add_word_frequency(entry)
+
+    def node_count(self) -> int:
+        """
+        @return: the number of nodes in the tree, the root included
+        """
+        count = 0
+        stack = [self.root]
+        while stack:
+            currNode = stack.pop()
+            count += 1
+            stack.extend(currNode.children.values())
+        return count
+
+    def search_prefix_node(self, prefix_word: str) -> RadixNode:
+        """
+        @param prefix_word: a prefix
+        @return: the highest node whose subtree holds exactly the words starting with prefix_word,
+        None if there is no such word
+        """
+        currNode = self.root
+        currIdx = 0
+        while currIdx < len(prefix_word):
+            currNode = currNode.children.get(prefix_word[currIdx])
+            if currNode == None:
+                return None
+            label = currNode.label
+            # The prefix ends inside the edge: the node below it holds the words having the prefix
+            if len(prefix_word) - currIdx <= len(label):
+                return currNode if label.startswith(prefix_word[currIdx:]) else None
+            if not prefix_word.startswith(label, currIdx):
+                return None
+            currIdx += len(label)
+        return currNode
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        currNode = self.root
+        currIdx = 0
+        while currIdx < len(word):
+            currNode = currNode.children.get(word[currIdx])
+            if currNode == None or not word.startswith(currNode.label, currIdx):
+                return 0
+            currIdx += len(currNode.label)
+        return currNode.frequency if currNode.end_word else 0
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        word = word_frequency.word
+        # Nodes whose subtree holds the word, i.e. whose top_words may take it
+        pathNodes = [self.root]
+        currNode = self.root
+        currIdx = 0
+        while currIdx < len(word):
+            child = currNode.children.get(word[currIdx])
+            if child == None:
+                # No edge starts with the next letter: hang the rest of the word below currNode
+                leaf = RadixNode(word[currIdx:], word_frequency.frequency, True)
+                currNode.children[word[currIdx]] = leaf
+                pathNodes.append(leaf)
+                break
+            label = child.label
+            common = 1
+            maxCommon = min(len(label), len(word) - currIdx)
+            while common < maxCommon and label[common] == word[currIdx + common]:
+                common += 1
+            if common < len(label):
+                # The word diverges or ends inside the edge: split it at the last common letter
+                middle = RadixNode(label[:common])
+                middle.top_words = list(child.top_words)
+                child.label = label[common:]
+                middle.children[child.label[0]] = child
+                currNode.children[word[currIdx]] = middle
+                currIdx += common
+                pathNodes.append(middle)
+                if currIdx == len(word):
+                    middle.frequency = word_frequency.frequency
+                    middle.end_word = True
+                else:
+                    leaf = RadixNode(word[currIdx:], word_frequency.frequency, True)
+                    middle.children[word[currIdx]] = leaf
+                    pathNodes.append(leaf)
+                break
+            currNode = child
+            currIdx += len(label)
+            pathNodes.append(currNode)
+        else:
+            # The word ends exactly at an existing node
+            if currNode.end_word:
+                return False
+            currNode.frequency = word_frequency.frequency
+            currNode.end_word = True
+
+        for pathNode in pathNodes:
+            self.cache_word(pathNode, word_frequency)
+        return True
+
+    def cache_word(self, currNode: RadixNode, word_frequency: WordFrequency):
+        """
+        insert a word into the top_words of currNode if it is among the ac_size most frequent
+        @param currNode, word_frequency: node on the path of the word, the word being added
+        """
+        top = currNode.top_words
+        freq = word_frequency.frequency
+        word = word_frequency.word
+        i = len(top)
+        # Ties on frequency are broken alphabetically
+        while i > 0 and (top[i - 1].frequency < freq or (top[i - 1].frequency == freq and top[i - 1].word > word)):
+            i -= 1
+        if i < self.ac_size:
+            top.insert(i, word_frequency)
+            del top[self.ac_size:]
+
+    def refresh_top_words(self, currNode: RadixNode, prefix: str, deleted: str) -> bool:
+        """
+        recompute the top_words of currNode after 'deleted' was removed below it,
+        from the word ending at currNode and the top_words of its children, which are up to date
+        @param currNode, prefix, deleted: prefix is the word spelled by the path down to currNode
+        @return: False if 'deleted' was not cached at currNode, in which case nothing changes
+        """
+        if not any(entry.word == deleted for entry in currNode.top_words):
+            return False
+        candidates = []
+        if currNode.end_word:
+            candidates.append(WordFrequency(prefix, currNode.frequency))
+        for child in currNode.children.values():
+            candidates.extend(child.top_words)
+        candidates.sort(key=lambda entry: (-entry.frequency, entry.word))
+        currNode.top_words = candidates[:self.ac_size]
+        return True
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        # (node, length of the prefix spelled down to the node) from the root down to the word
+        path = [(self.root, 0)]
+        currNode = self.root
+        currIdx = 0
+        while currIdx < len(word):
+            currNode = currNode.children.get(word[currIdx])
+            if currNode == None or not word.startswith(currNode.label, currIdx):
+                return False
+            currIdx += len(currNode.label)
+            path.append((currNode, currIdx))
+        if not currNode.end_word:
+            return False
+        currNode.frequency = None
+        currNode.end_word = False
+
+        # A leaf without a word goes, which can leave its parent with a single child
+        if not currNode.children and len(path) > 1:
+            del path[-2][0].children[currNode.label[0]]
+            path.pop()
+        # A node other than the root with no word and a single child is merged into that child,
+        # whose subtree and top_words are the same
+        lastNode = path[-1][0]
+        if len(path) > 1 and not lastNode.end_word and len(lastNode.children) == 1:
+            child, = lastNode.children.values()
+            child.label = lastNode.label + child.label
+            path[-2][0].children[child.label[0]] = child
+            path.pop()
+
+        # Refresh bottom-up; an ancestor can only cache the word if its descendant on the path did
+        for pathNode, length in reversed(path):
+            if not self.refresh_top_words(pathNode, word[:length], word):
+                break
+        return True
+
+    def autocomplete(self, word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        currNode = self.search_prefix_node(word)
+        if currNode == None:
+            return []
+        return list(currNode.top_words)
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: nodes visited on the way down, candidates autocomplete returns
+        """
+        visited = 0
+        currNode = self.root
+        currIdx = 0
+        while currIdx < len(word) and currNode != None:
+            currNode = currNode.children.get(word[currIdx])
+            if currNode != None:
+                visited += 1
+                currIdx += len(currNode.label)
+        cost = {'nodes_visited': visited}
+        if command == 'AC':
+            prefixNode = self.search_prefix_node(word)
+            cost['candidates'] = len(prefixNode.top_words) if prefixNode != None else 0
+        return cost
@@ -0,0 +1,241 @@
+import bisect
+import heapq
+import itertools
+import multiprocessing
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Dictionary partitioned across worker processes.
+#
+# Words are routed by their first key_length letters (their key). Shard i
+# owns the keys between bounds[i - 1] (included) and bounds[i] (excluded),
+# the bounds being chosen when the dictionary is built so that every shard
+# holds about the same total frequency. search, add and delete go to the
+# shard owning the word. autocomplete goes to the single shard owning the
+# prefix when the prefix is at least key_length letters long, and otherwise
+# to every shard whose keys can start with it, their top-k being merged.
+#
+# Every shard is a process holding its own backend, driven through a pipe.
+# Batches (search_many, autocomplete_many) are sent to all the shards
+# before any reply is read, so that the shards work on them in parallel.
+# ------------------------------------------------------------------------
+
+MAX_CHAR = chr(0x10FFFF)
+
+
+def serve_shard(connection, agent_class):
+    """
+    body of a shard process: apply the (method name, arguments) requests received on the connection to a
+    dictionary of its own and send back the results, until None is received
+    @param connection, agent_class: end of the pipe of the shard, class of the dictionary to be held
+    """
+    agent = agent_class()
+    while True:
+        request = connection.recv()
+        if request == None:
+            break
+        method, args = request
+        connection.send(getattr(agent, method)(*args))
+    connection.close()
+
+
+def rank(word_frequency: WordFrequency) -> (int, str):
+    """
+    @param word_frequency: an autocomplete result
+    @return: sort key putting the most frequent word first, ties broken alphabetically
+    """
+    return (-word_frequency.frequency, word_frequency.word)
+
+
+class ShardedDictionary(BaseDictionary):
+    def __init__(self, agent_class, num_shards: int = None, key_length: int = 2,
+                 ac_size: int = 3):
+        """
+        @param agent_class: class of the dictionary held by each shard, e.g. TernarySearchTreeDictionary
+        @param num_shards, key_length: number of shard processes, one per CPU if None, number of leading letters
+        words are routed by
+        @param ac_size: number of most-frequent words returned by autocomplete
+        """
+        if num_shards == None:
+            num_shards = multiprocessing.cpu_count()
+        self.key_length = key_length
+        self.ac_size = ac_size
+        self.bounds = []        # first key of shards 1 to num_shards - 1, ascending
+        self.connections = []   # pipe to each shard
+        self.processes = []
+        for _ in range(num_shards):
+            connection, shard_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serve_shard, args=(shard_connection, agent_class), daemon=True)
+            process.start()
+            shard_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def close(self):
+        """
+        stop the shard processes
+        """
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def call(self, shard: int, method: str, *args):
+        """
+        @param shard, method, args: index of the shard, name of the dictionary method and its arguments
+        @return: what the method returns in the shard
+        """
+        self.connections[shard].send((method, args))
+        return self.connections[shard].recv()
+
+    def scatter(self, method: str, args_by_shard: dict) -> dict:
+        """
+        call a method on several shards at once
+        @param method, args_by_shard: name of the dictionary method, shard index -> arguments
+        @return: shard index -> what the method returned
+        """
+        for shard, args in args_by_shard.items():
+            self.connections[shard].send((method, args))
+        return {shard: self.connections[shard].recv() for shard in args_by_shard}
+
+    def shard_of(self, word: str) -> int:
+        """
+        @param word: a word
+        @return: the index of the shard owning the word
+        """
+        return bisect.bisect_right(self.bounds, word[:self.key_length])
+
+    def shards_of_prefix(self, prefix_word: str) -> range:
+        """
+        @param prefix_word: a prefix
+        @return: the indices of the shards that may hold words starting with the prefix
+        """
+        if len(prefix_word) >= self.key_length:
+            shard = self.shard_of(prefix_word)
+            return range(shard, shard + 1)
+        # The keys having the prefix lie between the prefix itself and the prefix padded with the largest letter
+        last = prefix_word + MAX_CHAR * (self.key_length - len(prefix_word))
+        return range(bisect.bisect_right(self.bounds, prefix_word), bisect.bisect_right(self.bounds, last) + 1)
+
+    def balance(self, words: [str], frequencies: [int]):
+        """
+        choose the bounds so that every shard holds about the same total frequency
+        @param words, frequencies: the words to be stored and their frequencies
+        """
+        weights = {}
+        for word, frequency in zip(words, frequencies):
+            key = word[:self.key_length]
+            weights[key] = weights.get(key, 0) + frequency
+        total = sum(weights.values())
+        self.bounds = []
+        cumulative = 0
+        for key in sorted(weights):
+            # Start the next shard once the shards so far hold their share of the total
+            if cumulative >= total * (len(self.bounds) + 1) / len(self.connections) \
+                    and len(self.bounds) < len(self.connections) - 1:
+                self.bounds.append(key)
+            cumulative += weights[key]
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.build_from_columns([entry.word for entry in words_frequencies],
+                                [entry.frequency for entry in words_frequencies])
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.balance(words, frequencies)
+        columns = {shard: ([], []) for shard in range(len(self.connections))}
+        for word, frequency in zip(words, frequencies):
+            shard_words, shard_frequencies = columns[self.shard_of(word)]
+            shard_words.append(word)
+            shard_frequencies.append(frequency)
+        self.scatter('build_from_columns', columns)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.call(self.shard_of(word), 'search', word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words, every shard searching its own words in parallel
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        positions = {}
+        for position, word in enumerate(words):
+            positions.setdefault(self.shard_of(word), []).append(position)
+        replies = self.scatter('search_many', {shard: ([words[position] for position in shard_positions],)
+                                               for shard, shard_positions in positions.items()})
+        results = [0] * len(words)
+        for shard, shard_positions in positions.items():
+            for position, result in zip(shard_positions, replies[shard]):
+                results[position] = result
+        return results
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        return self.call(self.shard_of(word_frequency.word), 'add_word_frequency', word_frequency)
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        return self.call(self.shard_of(word), 'delete_word', word)
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.autocomplete_many([prefix_word])[0]
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes, every shard autocompleting its own prefixes in parallel
+        @param prefix_words: the prefixes to be autocompleted
+        @return: the autocomplete list of each prefix
+        """
+        positions = {}
+        for position, prefix_word in enumerate(prefix_words):
+            for shard in self.shards_of_prefix(prefix_word):
+                positions.setdefault(shard, []).append(position)
+        replies = self.scatter('autocomplete_many', {shard: ([prefix_words[position] for position in shard_positions],)
+                                                     for shard, shard_positions in positions.items()})
+        partial_results = [[] for _ in prefix_words]
+        for shard, shard_positions in positions.items():
+            for position, result in zip(shard_positions, replies[shard]):
+                partial_results[position].append(result)
+        # A prefix answered by a single shard keeps its result, otherwise the shards' top-k are merged
+        return [results[0] if len(results) == 1
+                else list(itertools.islice(heapq.merge(*results, key=rank), self.ac_size))
+                for results in partial_results]
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: the cost reported by the shard owning the word, or by the first shard of the prefix
+        """
+        return self.call(self.shards_of_prefix(word)[0], 'operation_cost', command, word)
@@ -0,0 +1,113 @@
+import threading
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Copy-on-write versions of a dictionary for concurrent readers.
+#
+# self.current is an immutable version of the dictionary. Readers take it
+# once per call (or once per batch, or keep it as a snapshot()) without any
+# lock, so they never wait for a writer and never see a change half applied.
+# Writers are serialised by a lock. A write asks the current version for
+# copy_for_write(word), a new version sharing everything the write cannot
+# touch (path-copying in TernarySearchTreeDictionary, copying one block in
+# ListDictionary), applies the change to it, then publishes it with a single
+# assignment of self.current. An old version is reclaimed by the garbage
+# collector as soon as no reader holds it any more.
+#
+# The wrapped dictionary must not be changed other than through this class.
+# ------------------------------------------------------------------------
+
+class SnapshotDictionary(BaseDictionary):
+    def __init__(self, agent: BaseDictionary):
+        self.current = agent            # latest published version, never modified once published
+        self.lock = threading.Lock()    # held by the writer building the next version
+
+    def snapshot(self) -> BaseDictionary:
+        """
+        @return: the latest version, which stays unchanged while later versions are published
+        """
+        return self.current
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        with self.lock:
+            self.current.build_dictionary(words_frequencies)
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        with self.lock:
+            self.current.build_from_columns(words, frequencies)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.current.search(word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words, all in the same version
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        return self.current.search_many(words)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary, publishing a new version if it succeeds
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        with self.lock:
+            new = self.current.copy_for_write(word_frequency.word)
+            if not new.add_word_frequency(word_frequency):
+                return False
+            self.current = new
+            return True
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary, publishing a new version if it succeeds
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        with self.lock:
+            new = self.current.copy_for_write(word)
+            if not new.delete_word(word):
+                return False
+            self.current = new
+            return True
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.current.autocomplete(prefix_word)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes, all in the same version
+        @param prefix_words: the prefixes to be autocompleted
+        @return: the autocomplete list of each prefix
+        """
+        return self.current.autocomplete_many(prefix_words)
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: the cost reported by the latest version
+        """
+        return self.current.operation_cost(command, word)
@@ -1,3 +1,5 @@
+import copy
+import heapq
 from dictionary.base_dictionary import BaseDictionary
 from dictionary.word_frequency import WordFrequency
 from dictionary.node import Node
@@ -12,16 +14,78 @@ from dictionary.node import Node
 
 
 class TernarySearchTreeDictionary(BaseDictionary):
-    def __init__(self):
+    def __init__(self, ac_size: int = 3, bulk_load: bool = True):
         self.root = Node()
+        # number of most-frequent words cached at every node and returned by autocomplete
+        self.ac_size = ac_size
+        # build_dictionary inserts medians of the sorted input first instead of following the input order
+        self.bulk_load = bulk_load
 
     def build_dictionary(self, words_frequencies: [WordFrequency]):
         """
         construct the data structure to store nodes
         @param words_frequencies: list of (word, frequency) to be stored
         """
-        for idx, entry in enumerate(words_frequencies):
-            self.add_word_frequency(entry)
+        if self.bulk_load:
+            self.balanced_build(words_frequencies)
+        else:
+            for idx, entry in enumerate(words_frequencies):
+                self.add_word_frequency(entry)
+
+    def balanced_build(self, words_frequencies: [WordFrequency]):
+        """
+        add words in median-first order of the sorted input, so that every sibling tree
+        (the left/right links below a middle link) comes out balanced regardless of input order
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        # Sorting is skipped when the input is already sorted
+        if all(words_frequencies[i].word <= words_frequencies[i + 1].word for i in range(len(words_frequencies) - 1)):
+            sorted_entries = words_frequencies
+        else:
+            # Stable, so the first of duplicated words is kept as with one-by-one insertion
+            sorted_entries = sorted(words_frequencies, key=lambda entry: entry.word)
+        unique_entries = [entry for i, entry in enumerate(sorted_entries)
+                          if i == 0 or sorted_entries[i - 1].word != entry.word]
+
+        # Ranges of unique_entries still to be added, as (low, high) inclusive
+        ranges = [(0, len(unique_entries) - 1)]
+        while ranges:
+            low, high = ranges.pop()
+            if low > high:
+                continue
+            mid = (low + high) // 2
+            self.add_word_frequency(unique_entries[mid])
+            ranges.append((mid + 1, high))
+            ranges.append((low, mid - 1))
+
+    def rebalance(self):
+        """
+        rebuild the tree from its own words with balanced_build, e.g. after heavy add/delete churn
+        """
+        words_frequencies = []
+        if self.root.letter != None:
+            self.add_ac_words(self.root, '', words_frequencies)
+        self.root = Node()
+        self.balanced_build(words_frequencies)
+
+    def average_search_depth(self) -> float:
+        """
+        @return: the average number of nodes visited by a successful search, 0 if the tree is empty
+        """
+        total_depth = 0
+        num_words = 0
+        stack = [(self.root, 1)]
+        while stack:
+            currNode, depth = stack.pop()
+            if currNode == None or currNode.letter == None:
+                continue
+            if currNode.end_word:
+                total_depth += depth
+                num_words += 1
+            stack.append((currNode.left, depth + 1))
+            stack.append((currNode.middle, depth + 1))
+            stack.append((currNode.right, depth + 1))
+        return total_depth / num_words if num_words else 0
 
     def search(self, word: str) -> int:
         """
@@ -41,22 +105,64 @@ class TernarySearchTreeDictionary(BaseDictionary):
 
     def search_from_node(self, currNode, word, currIdx):
         """
-        search for a word recursively
+        search for a word iteratively
         @param node, word, currIdx: node to start from, the word to be searched, currIdx to search curLetter at
-        @return: frequency > 0 if found and 0 if NOT found
+        @return: the node holding the last letter of word, None if there is none
         """
+        lastIdx = len(word) - 1
         currLetter = word[currIdx]
-        if currNode == None or currNode.letter == None:
-            return None
-        if currNode.letter < currLetter:
-            return self.search_from_node(currNode.right, word, currIdx)
-        elif currNode.letter > currLetter:
-            return self.search_from_node(currNode.left, word, currIdx)
-        elif currIdx < len(word) - 1:
-            return self.search_from_node(currNode.middle, word, currIdx + 1)
-        else:
-            return currNode
+        while currNode != None and currNode.letter != None:
+            if currNode.letter < currLetter:
+                currNode = currNode.right
+            elif currNode.letter > currLetter:
+                currNode = currNode.left
+            elif currIdx < lastIdx:
+                currNode = currNode.middle
+                currIdx += 1
+                currLetter = word[currIdx]
+            else:
+                return currNode
+        return None
+
+    def copy_for_write(self, word: str):
+        """
+        copy the dictionary for SnapshotDictionary: the nodes on the search path of 'word', which are the
+        only ones adding or deleting it can modify, are copied and every other node is shared
+        @param word: the word about to be added or deleted
+        @return: a TernarySearchTreeDictionary that can be changed without affecting this one
+        """
+        new = copy.copy(self)
+        new.root = self.copy_node(self.root)
+        currNode = new.root
+        lastIdx = len(word) - 1
+        currIdx = 0
+        while currNode.letter != None:
+            currLetter = word[currIdx]
+            if currNode.letter < currLetter:
+                link = 'right'
+            elif currNode.letter > currLetter:
+                link = 'left'
+            elif currIdx < lastIdx:
+                link = 'middle'
+                currIdx += 1
+            else:
+                break
+            child = getattr(currNode, link)
+            if child == None:
+                break
+            child = self.copy_node(child)
+            setattr(currNode, link, child)
+            currNode = child
+        return new
 
+    def copy_node(self, currNode: Node) -> Node:
+        """
+        @param currNode: the node to be copied
+        @return: a node with the same letter, word, children and a copy of the top_words
+        """
+        new = copy.copy(currNode)
+        new.top_words = list(currNode.top_words)
+        return new
 
     def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
         """
@@ -64,64 +170,88 @@ class TernarySearchTreeDictionary(BaseDictionary):
         @param word_frequency: (word, frequency) to be added
         :return: True whether succeeded, False when word is already in the dictionary
         """
-        return self.add_word_from_root(self.root, word_frequency.word, word_frequency.frequency, 0)
+        return self.add_word_from_root(self.root, word_frequency, 0)
 
-    def add_word_from_root(self, currNode, word, freq, currIdx) -> bool:
+    def add_word_from_root(self, currNode, word_frequency: WordFrequency, currIdx) -> bool:
         """
-        add a word recursively
-        @param currNode, word, freq, currIdx: currNode initially self.root; currIdx is used for the base case.
+        add a word iteratively and cache it in the top_words of every node on its path
+        @param currNode, word_frequency, currIdx: currNode initially self.root; currIdx of the letter to place at currNode.
         :return: True if addition is successful, false if the word being added already exists.
         """
-        currLetter = word[currIdx]
-        # Base case on the last word
-        if currIdx == len(word) - 1:
+        word = word_frequency.word
+        lastIdx = len(word) - 1
+        # Nodes whose letter is part of the word, i.e. whose top_words may take the word
+        pathNodes = []
+        while True:
+            currLetter = word[currIdx]
+            # An empty node takes the current letter
             if currNode.letter == None:
                 currNode.letter = currLetter
-                currNode.frequency = freq
-                currNode.end_word = True
-                return True
-            # If currNode is the same as curLetter
-            else:
-                if currNode.letter > currLetter:
-                    if currNode.left == None:
-                        currNode.left = Node()
-                    currNode = currNode.left
-                    return self.add_word_from_root(currNode, word, freq, currIdx)
-                elif currNode.letter < currLetter:
-                    if currNode.right == None:
-                        currNode.right = Node()
-                    currNode = currNode.right
-                    return self.add_word_from_root(currNode, word, freq, currIdx)
-                else:
-                    if currNode.end_word == True:
-                        return False
-                    else:
-                        currNode.frequency = freq
-                        currNode.end_word = True
-                        return True
-        # Recursive case
-        else:
-            # When no word is present
-            if currNode.letter == None:
-                currNode.letter = currLetter
-                currNode.middle = Node()
-                currNode = currNode.middle
-                return self.add_word_from_root(currNode, word, freq, currIdx + 1)
-            elif currNode.letter < currLetter:
+            if currNode.letter < currLetter:
                 if currNode.right == None:
                     currNode.right = Node()
                 currNode = currNode.right
-                return self.add_word_from_root(currNode, word, freq, currIdx)
             elif currNode.letter > currLetter:
                 if currNode.left == None:
                     currNode.left = Node()
                 currNode = currNode.left
-                return self.add_word_from_root(currNode, word, freq, currIdx)
-            else:
+            elif currIdx < lastIdx:
+                pathNodes.append(currNode)
                 if currNode.middle == None:
                     currNode.middle = Node()
                 currNode = currNode.middle
-                return self.add_word_from_root(currNode, word, freq, currIdx + 1)
+                currIdx += 1
+            else:
+                if currNode.end_word == True:
+                    return False
+                currNode.frequency = word_frequency.frequency
+                currNode.end_word = True
+                pathNodes.append(currNode)
+                break
+
+        for pathNode in pathNodes:
+            self.cache_word(pathNode, word_frequency)
+        return True
+
+    def cache_word(self, currNode, word_frequency: WordFrequency):
+        """
+        insert a word into the top_words of currNode if it is among the ac_size most frequent
+        @param currNode, word_frequency: node on the path of the word, the word being added
+        """
+        top = currNode.top_words
+        freq = word_frequency.frequency
+        word = word_frequency.word
+        i = len(top)
+        # Ties on frequency are broken alphabetically
+        while i > 0 and (top[i - 1].frequency < freq or (top[i - 1].frequency == freq and top[i - 1].word > word)):
+            i -= 1
+        if i < self.ac_size:
+            top.insert(i, word_frequency)
+            del top[self.ac_size:]
+
+    def refresh_top_words(self, currNode, prefix: str, deleted: str) -> bool:
+        """
+        recompute the top_words of currNode after 'deleted' was removed below it.
+        The candidates are the word ending at currNode and the top_words of every node in the
+        sibling tree of its middle child, all of which are already up to date.
+        @param currNode, prefix, deleted: prefix is the word spelled by the path down to currNode
+        @return: False if 'deleted' was not cached at currNode, in which case nothing changes
+        """
+        if not any(entry.word == deleted for entry in currNode.top_words):
+            return False
+        candidates = []
+        if currNode.end_word:
+            candidates.append(WordFrequency(prefix, currNode.frequency))
+        stack = [currNode.middle]
+        while stack:
+            sibling = stack.pop()
+            if sibling != None:
+                candidates.extend(sibling.top_words)
+                stack.append(sibling.left)
+                stack.append(sibling.right)
+        candidates.sort(key=lambda entry: (-entry.frequency, entry.word))
+        currNode.top_words = candidates[:self.ac_size]
+        return True
 
     def delete_word(self, word: str) -> bool:
         """
@@ -145,62 +275,72 @@ class TernarySearchTreeDictionary(BaseDictionary):
 
     def delete_from_node(self, currNode, word, currIdx, deleteStatus: list[bool]):
         """
-        delete a word recursively
-        @param prevNode, currNode, word, currIdx, deleteStatus
-        @return: False if not found or end_word equals False, True if found and end_word equals True
+        delete a word iteratively, then walk back up the path pruning dead leaves and
+        refreshing the top_words that cached the word
+        @param currNode, word, currIdx, deleteStatus
+        @return: True if currNode itself is left as a leaf without a word and can be pruned, False otherwise
         """
-        currLetter = word[currIdx]
-        if currNode == None or currNode.letter == None:
-            return False
-        if currNode.letter < currLetter:
-            if self.delete_from_node(currNode.right, word, currIdx, deleteStatus):
-                currNode.right = None
-            else:
-                return False
-        elif currNode.letter > currLetter:
-            if self.delete_from_node(currNode.left, word, currIdx, deleteStatus):
-                currNode.left = None
-            else:
+        lastIdx = len(word) - 1
+        # (parent, name of the parent's link that was followed) from currNode down to the word's last letter
+        path = []
+        while True:
+            if currNode == None or currNode.letter == None:
                 return False
-        elif currIdx < len(word) - 1:
-            if self.delete_from_node(currNode.middle, word, currIdx + 1, deleteStatus):
-                currNode.middle = None
+            currLetter = word[currIdx]
+            if currNode.letter < currLetter:
+                path.append((currNode, 'right'))
+                currNode = currNode.right
+            elif currNode.letter > currLetter:
+                path.append((currNode, 'left'))
+                currNode = currNode.left
+            elif currIdx < lastIdx:
+                path.append((currNode, 'middle'))
+                currNode = currNode.middle
+                currIdx += 1
             else:
-                return False
-        else:
-            if currNode.end_word:
-                deleteStatus[0] = True
-                currNode.frequency = None
-                currNode.end_word = False
+                break
 
         if currNode.end_word == False:
-            if currNode.left == None and currNode.middle == None and currNode.right == None:
-                return True
-            else:
-                return False
-        # If currNode.end_word is True
-        else:
             return False
+        deleteStatus[0] = True
+        currNode.frequency = None
+        currNode.end_word = False
+        refreshing = self.refresh_top_words(currNode, word, word)
+
+        pruning = currNode.left == None and currNode.middle == None and currNode.right == None
+        for parent, link in reversed(path):
+            if not pruning and not refreshing:
+                break
+            if pruning:
+                setattr(parent, link, None)
+                pruning = (parent.end_word == False and parent.left == None
+                           and parent.middle == None and parent.right == None)
+            if link == 'middle':
+                currIdx -= 1
+                # An ancestor can only cache the word if its middle descendant did
+                if refreshing:
+                    refreshing = self.refresh_top_words(parent, word[:currIdx + 1], word)
+        return pruning
 
     def add_ac_words(self, currNode: Node, compoundWord: str, ac_lst: list) -> [WordFrequency]:
         """
-        Recursively traverse all the children nodes of currNode and create an instance of WordFrequency
+        Traverse all the children nodes of currNode with an explicit stack and create an instance of WordFrequency
         using compoundWord and the frequency of currNode if its end_word is True.
+        Nodes are visited in the same order as a recursive (node, left, middle, right) traversal.
         @param currNode, compoundWord, ac_lst: compoundWord to keep track of the word to be added
         ac_lst: the list to which an instance of WordFrequency is added
         @return: a list (could be empty) of all the words with prefix 'word'
         """
-
-        # Base Case 1: currNode is None
-        if currNode == None:
-            return
-        # Recursive case:
-        else:
+        stack = [(currNode, compoundWord)]
+        while stack:
+            currNode, compoundWord = stack.pop()
+            if currNode == None:
+                continue
             if currNode.end_word == True:
                 ac_lst.append(WordFrequency(compoundWord + currNode.letter, currNode.frequency))
-            self.add_ac_words(currNode.left, compoundWord, ac_lst)
-            self.add_ac_words(currNode.middle, compoundWord + currNode.letter, ac_lst)
-            self.add_ac_words(currNode.right, compoundWord, ac_lst)
+            stack.append((currNode.right, compoundWord))
+            stack.append((currNode.middle, compoundWord + currNode.letter))
+            stack.append((currNode.left, compoundWord))
 
     def autocomplete(self, word: str) -> [WordFrequency]:
         """
@@ -208,22 +348,211 @@ class TernarySearchTreeDictionary(BaseDictionary):
         @param word: word to be autocompleted
         @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
         """
-        # a list of words to be autocompleted
-        ac_lst = []
-
         # Find the prefix
         currNode = self.search_from_node(self.root, word, 0)
 
         # If the prefix does not exist
         if not currNode:
-            return ac_lst
+            return []
+        # The node already caches the most frequent words ending at it or below its middle child
+        return list(currNode.top_words)
+
+    def fuzzy_autocomplete(self, word: str, max_edits: int = 1, k: int = None) -> [WordFrequency]:
+        """
+        return the k most-frequent words in the dictionary having a prefix within max_edits insertions,
+        deletions or substitutions of 'word'. The tree is walked carrying the edit distances between the
+        letters spelled so far and the prefixes of 'word'; a branch is pruned once they all exceed max_edits,
+        and once the letters spelled are within max_edits of 'word', all the words below are candidates,
+        whose most frequent ones the node already caches. The branches are explored best first: the most
+        frequent word cached by a node bounds the frequency of every word below it, so the walk stops once
+        k candidates are more frequent than the best bound left.
+        @param word: word to be autocompleted, possibly mistyped
+        @param max_edits: the largest edit distance accepted
+        @param k: number of words returned, ac_size by default
+        @return: a list (could be empty) of (at most) k most-frequent words, ties broken alphabetically
+        """
+        if k == None:
+            k = self.ac_size
+        candidates = []
+        if len(word) <= max_edits:
+            # Even no letter is close enough: every word is a candidate, from the nodes holding a first letter
+            self.add_fuzzy_candidates(self.root, '', k, candidates, True)
+            return sorted(candidates, key=lambda entry: (-entry.frequency, entry.word))[:k]
+        wordLetters = set(word)
+        # Only the prefixes of word whose length is within max_edits of the number of letters spelled can be
+        # within max_edits of them: the band of distances to those 2 * max_edits + 1 prefixes is kept
+        band = [min(prefixLength, max_edits + 1) if 0 <= prefixLength <= len(word) else max_edits + 1
+                for prefixLength in range(-max_edits, max_edits + 1)]
+        # Heap of (-frequency bound, letters spelled down to the node, node, band of those letters, letters
+        # spelled above the node, whether the words below it are candidates), most frequent bound first
+        heap = []
+        self.push_fuzzy_nodes(heap, word, wordLetters, self.root, band, '', max_edits)
+        while heap:
+            # Candidates more frequent than every word left to explore, ties included, are final
+            if len(candidates) >= k and candidates[k - 1].frequency > -heap[0][0]:
+                break
+            _, _, currNode, band, spelled, isMatch = heapq.heappop(heap)
+            if isMatch:
+                self.add_fuzzy_candidates(currNode, spelled, k, candidates, False)
+                candidates.sort(key=lambda entry: (-entry.frequency, entry.word))
+                del candidates[k:]
+            else:
+                self.push_fuzzy_nodes(heap, word, wordLetters, currNode.middle, band, spelled + currNode.letter,
+                                      max_edits)
+        return candidates
+
+    def push_fuzzy_nodes(self, heap: list, word: str, wordLetters: set, siblingRoot: Node, band: list,
+                         spelled: str, max_edits: int):
+        """
+        push onto the heap of fuzzy_autocomplete the nodes of a sibling tree whose letter keeps the letters
+        spelled within max_edits of a prefix of 'word'
+        @param heap, word, wordLetters: the heap, the word to be autocompleted and the set of its letters
+        @param siblingRoot, band, spelled: root of the sibling tree, band and letters spelled above it
+        @param max_edits: the largest edit distance accepted
+        """
+        depth = len(spelled)
+        if min(band) == max_edits:
+            # All the edits are used: the rest of word must follow exactly, from the end of each prefix still
+            # within max_edits, so the node ending it is looked up directly. A rest of which a shorter one is
+            # a prefix ends below the node of the shorter one, whose candidates already include its words.
+            rests = [word[depth - max_edits + bandIdx:] for bandIdx, distance in enumerate(band)
+                     if distance == max_edits]
+            keptRests = []
+            for rest in sorted(rests, key=len):
+                if not any(rest.startswith(keptRest) for keptRest in keptRests):
+                    keptRests.append(rest)
+                    matchNode = self.search_from_node(siblingRoot, rest, 0)
+                    if matchNode != None and matchNode.top_words:
+                        above = spelled + rest[:-1]
+                        heapq.heappush(heap, (-matchNode.top_words[0].frequency, above + matchNode.letter,
+                                              matchNode, None, above, True))
+            return
+        # Every letter absent from word gives the same band, which is pruned if all the edits are used
+        mismatchBand = None
+        if min(band) < max_edits:
+            mismatchBand = self.next_edit_band(word, band, depth, None, max_edits)
+        if mismatchBand != None and min(mismatchBand) <= max_edits:
+            nodes = self.sibling_nodes(siblingRoot)
         else:
-            # If the currNode's end_word is true
-            if currNode.end_word == True:
-                ac_lst.append(WordFrequency(word, currNode.frequency))
-            self.add_ac_words(currNode.middle, word, ac_lst)
+            # Only a letter matching word right after a prefix still within max_edits keeps the branch,
+            # those are looked up in the sibling tree instead of visiting all of its nodes
+            letters = {word[depth - max_edits + bandIdx] for bandIdx, distance in enumerate(band)
+                       if distance <= max_edits and 0 <= depth - max_edits + bandIdx < len(word)}
+            nodes = [self.find_sibling(siblingRoot, letter) for letter in letters]
+        # Position in the band of the distance to the whole word once a letter is added
+        wholeIdx = len(word) - depth - 1 + max_edits
+        for currNode in nodes:
+            # A node caching no word has none below it
+            if currNode == None or currNode.letter == None or not currNode.top_words:
+                continue
+            if currNode.letter in wordLetters:
+                nextBand = self.next_edit_band(word, band, depth, currNode.letter, max_edits)
+            else:
+                nextBand = mismatchBand
+            # Ties are explored in alphabetical order of the letters spelled, which are distinct for every node
+            bound = currNode.top_words[0].frequency
+            if 0 <= wholeIdx < len(nextBand) and nextBand[wholeIdx] <= max_edits:
+                heapq.heappush(heap, (-bound, spelled + currNode.letter, currNode, nextBand, spelled, True))
+            elif min(nextBand) <= max_edits and currNode.middle != None:
+                heapq.heappush(heap, (-bound, spelled + currNode.letter, currNode, nextBand, spelled, False))
+
+    def next_edit_band(self, word: str, band: list, depth: int, letter: str, max_edits: int) -> list:
+        """
+        @param word, depth: the word and the number of letters spelled
+        @param band: band[t] is the edit distance between the letters spelled and the first
+        depth - max_edits + t letters of word, capped at max_edits + 1
+        @param letter: the letter spelled next, None for a letter that is not in word
+        @param max_edits: the largest edit distance accepted
+        @return: the band of the letters spelled followed by 'letter'
+        """
+        cap = max_edits + 1
+        width = 2 * max_edits + 1
+        nextBand = []
+        for bandIdx in range(width):
+            prefixLength = depth + 1 - max_edits + bandIdx
+            if prefixLength < 0 or prefixLength > len(word):
+                distance = cap
+            elif prefixLength == 0:
+                distance = min(depth + 1, cap)
+            else:
+                # Substitution or match, then a letter of word left out, then the letter spelled left out
+                distance = band[bandIdx] + (word[prefixLength - 1] != letter)
+                if bandIdx > 0 and nextBand[bandIdx - 1] + 1 < distance:
+                    distance = nextBand[bandIdx - 1] + 1
+                if bandIdx < width - 1 and band[bandIdx + 1] + 1 < distance:
+                    distance = band[bandIdx + 1] + 1
+                distance = min(distance, cap)
+            nextBand.append(distance)
+        return nextBand
+
+    def sibling_nodes(self, siblingRoot: Node) -> [Node]:
+        """
+        @param siblingRoot: a node
+        @return: the node and all the nodes of its sibling tree, i.e. reached through left and right
+        """
+        nodes = []
+        stack = [siblingRoot]
+        while stack:
+            sibling = stack.pop()
+            if sibling != None and sibling.letter != None:
+                nodes.append(sibling)
+                stack.append(sibling.left)
+                stack.append(sibling.right)
+        return nodes
 
-            # Python's built-in Timsort
-            ac_lst.sort(key=lambda wordFrequency: wordFrequency.frequency, reverse=True)
+    def find_sibling(self, siblingRoot: Node, letter: str) -> Node:
+        """
+        @param siblingRoot, letter: a node and a letter
+        @return: the node of its sibling tree holding the letter, None if there is none
+        """
+        currNode = siblingRoot
+        while currNode != None and currNode.letter != None and currNode.letter != letter:
+            currNode = currNode.left if letter < currNode.letter else currNode.right
+        return currNode
+
+    def add_fuzzy_candidates(self, currNode: Node, spelled: str, k: int, candidates: list, siblings: bool):
+        """
+        add the k most-frequent words starting with the letters spelled down to currNode to candidates
+        @param currNode, spelled: a node and the letters spelled above it
+        @param k: number of words wanted, beyond ac_size the words below are listed rather than the cache used
+        @param candidates: the list to which the words are added
+        @param siblings: True to take the words of currNode and all the nodes of its sibling tree
+        """
+        for node in self.sibling_nodes(currNode) if siblings else [currNode]:
+            if k <= self.ac_size:
+                candidates.extend(node.top_words)
+            else:
+                if node.end_word:
+                    candidates.append(WordFrequency(spelled + node.letter, node.frequency))
+                self.add_ac_words(node.middle, spelled + node.letter, candidates)
 
-        return ac_lst[:3]
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary. The descent
+        compares letters as search_from_node does, so the nodes visited are those of the operation itself.
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: nodes visited on the way down, nodes an addition would create, words autocomplete copies from
+        the cache of the prefix node, which is all it does past the descent
+        """
+        visited = 0
+        matched = 0
+        lastNode = None
+        currNode = self.root
+        while currNode != None and currNode.letter != None:
+            visited += 1
+            if currNode.letter < word[matched]:
+                currNode = currNode.right
+            elif currNode.letter > word[matched]:
+                currNode = currNode.left
+            else:
+                matched += 1
+                if matched == len(word):
+                    lastNode = currNode
+                    break
+                currNode = currNode.middle
+        cost = {'nodes_visited': visited}
+        if command == 'A':
+            cost['nodes_created'] = 0 if lastNode != None and lastNode.end_word else len(word) - matched
+        elif command == 'AC':
+            cost['top_words_copied'] = len(lastNode.top_words) if lastNode != None else 0
+        return cost
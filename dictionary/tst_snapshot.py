@@ -0,0 +1,291 @@
+import gc
+import mmap
+import os
+import struct
+import sys
+from collections import deque
+from array import array
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+
+
+# ------------------------------------------------------------------------
+# Flattened, memory-mappable image of a TernarySearchTreeDictionary.
+#
+# Layout (native byte order, every section aligned to 8 bytes):
+#   header     magic, byte order, node count, word count, ac_size, size of the word blob,
+#              size and mtime_ns of the source data file, size of its path
+#   source     utf-8 bytes of the absolute path of the source data file
+#   frequency  int64[word count]            frequency of each word id
+#   letter     uint32[node count]           code point of the letter of each node
+#   left       int32[node count]            child indices, -1 for none; node 0 is the root
+#   middle     int32[node count]
+#   right      int32[node count]
+#   word_id    int32[node count]            id of the word ending at the node, -1 if none
+#   top        int32[node count * ac_size]  ids of the node's cached top_words, -1 padded
+#   offset     uint32[word count + 1]       start of each word in the blob
+#   blob       utf-8 bytes of all the words
+#
+# MappedTernarySearchTreeDictionary maps the file read-only and walks these
+# arrays in place, so loading costs nothing per node and processes mapping
+# the same file share its pages. is_snapshot_of tells whether a snapshot was
+# built from the current version of a data file, by its path, size and
+# modification time, so that a snapshot of another or a changed file is
+# rebuilt rather than used.
+#
+# The image is read-only: the first add or delete copies it into a
+# TernarySearchTreeDictionary, which costs as much as building the tree
+# from the data file (about 7 s for 200k words). Mapping a snapshot pays
+# off for runs that only search and autocomplete.
+# ------------------------------------------------------------------------
+
+MAGIC = b'TSTSNAP2'
+HEADER = struct.Struct('=8s8sqqqqqqq')
+NIL = -1
+
+
+def padding(size: int) -> bytes:
+    """
+    @param size: number of bytes written so far
+    @return: zero bytes up to the next multiple of 8
+    """
+    return b'\0' * (-size % 8)
+
+
+def source_identity(source_filename: str) -> (bytes, int, int):
+    """
+    @param source_filename: a data file
+    @return: (utf-8 absolute path, size, mtime_ns) identifying its current version
+    """
+    status = os.stat(source_filename)
+    return (os.path.abspath(source_filename).encode(), status.st_size, status.st_mtime_ns)
+
+
+def is_snapshot_of(snapshot_filename: str, source_filename: str) -> bool:
+    """
+    @param snapshot_filename, source_filename: a snapshot file and a data file
+    @return: whether the snapshot exists, is readable on this platform and was built from the data file
+    as it is now
+    """
+    try:
+        with open(snapshot_filename, 'rb') as snapshot_file:
+            header = snapshot_file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return False
+            magic, byteorder, _, _, _, _, source_size, source_mtime, path_size = HEADER.unpack(header)
+            if magic != MAGIC or byteorder.rstrip(b'\0').decode() != sys.byteorder:
+                return False
+            snapshot_file.seek(HEADER.size + len(padding(HEADER.size)))
+            source_path = snapshot_file.read(path_size)
+        return (source_path, source_size, source_mtime) == source_identity(source_filename)
+    except OSError:
+        return False
+
+
+def save_snapshot(tree: TernarySearchTreeDictionary, snapshot_filename: str, source_filename: str):
+    """
+    write the image of a tree to a file
+    @param tree, snapshot_filename: the tree to be saved, the file to be written
+    @param source_filename: the data file the tree was built from, recorded in the header
+    """
+    # The walk allocates objects per node faster than it frees them, triggering collections that rescan the whole tree
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        write_snapshot(tree, snapshot_filename, source_identity(source_filename))
+    finally:
+        if gcEnabled:
+            gc.enable()
+
+
+def write_snapshot(tree: TernarySearchTreeDictionary, snapshot_filename: str, source: (bytes, int, int)):
+    """
+    number the nodes of a tree breadth first and write their arrays to a file
+    @param tree, snapshot_filename: the tree to be saved, the file to be written
+    @param source: the identity of the data file the tree was built from, as returned by source_identity
+    """
+    letter = array('I')
+    left = array('i')
+    middle = array('i')
+    right = array('i')
+    word_id = array('i')
+    frequency = array('q')
+    words = []
+    top_nodes = []
+
+    # Number the nodes breadth first: a node's index is the order in which it is queued
+    queue = deque()
+    if tree.root.letter != None:
+        queue.append((tree.root, ''))
+    num_queued = len(queue)
+    while queue:
+        node, prefix = queue.popleft()
+        letter.append(ord(node.letter))
+        if node.end_word:
+            word_id.append(len(words))
+            words.append(prefix + node.letter)
+            frequency.append(node.frequency)
+        else:
+            word_id.append(NIL)
+        top_nodes.append(node.top_words)
+        for links, child, childPrefix in ((left, node.left, prefix), (middle, node.middle, prefix + node.letter),
+                                          (right, node.right, prefix)):
+            if child == None or child.letter == None:
+                links.append(NIL)
+            else:
+                links.append(num_queued)
+                queue.append((child, childPrefix))
+                num_queued += 1
+
+    word_index = {word: i for i, word in enumerate(words)}
+    top = array('i')
+    for top_words in top_nodes:
+        ids = [word_index[entry.word] for entry in top_words[:tree.ac_size]]
+        top.extend(ids + [NIL] * (tree.ac_size - len(ids)))
+
+    encoded = [word.encode() for word in words]
+    offset = array('I', [0])
+    for word_bytes in encoded:
+        offset.append(offset[-1] + len(word_bytes))
+    blob = b''.join(encoded)
+
+    source_path, source_size, source_mtime = source
+    with open(snapshot_filename, 'wb') as snapshot_file:
+        for section in (HEADER.pack(MAGIC, sys.byteorder.encode(), len(letter), len(words), tree.ac_size, len(blob),
+                                    source_size, source_mtime, len(source_path)),
+                        source_path, frequency.tobytes(), letter.tobytes(), left.tobytes(), middle.tobytes(), right.tobytes(),
+                        word_id.tobytes(), top.tobytes(), offset.tobytes(), blob):
+            snapshot_file.write(section)
+            snapshot_file.write(padding(len(section)))
+
+
+class MappedTernarySearchTreeDictionary(BaseDictionary):
+    def __init__(self, snapshot_filename: str):
+        with open(snapshot_filename, 'rb') as snapshot_file:
+            self.buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, num_nodes, num_words, self.ac_size, blob_size, _, _, path_size = \
+            HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or byteorder.rstrip(b'\0').decode() != sys.byteorder:
+            raise ValueError(f"{snapshot_filename} is not a TST snapshot of this platform")
+        self.num_nodes = num_nodes
+        view = memoryview(self.buffer)
+        position = HEADER.size + len(padding(HEADER.size))
+
+        def section(fmt: str, count: int) -> memoryview:
+            nonlocal position
+            size = count * struct.calcsize(fmt)
+            mapped = view[position:position + size].cast(fmt)
+            position += size + len(padding(size))
+            return mapped
+
+        # the path of the source data file, checked by is_snapshot_of
+        section('B', path_size)
+        self.frequency = section('q', num_words)
+        self.letter = section('I', num_nodes)
+        self.left = section('i', num_nodes)
+        self.middle = section('i', num_nodes)
+        self.right = section('i', num_nodes)
+        self.word_id = section('i', num_nodes)
+        self.top = section('i', num_nodes * self.ac_size)
+        self.offset = section('I', num_words + 1)
+        self.blob = view[position:position + blob_size]
+        # Tree the image is copied into on the first add or delete, after which it serves every call.
+        # The copy costs a full build of the tree, see the module comment
+        self.tree = None
+
+    def word(self, wordId: int) -> str:
+        """
+        @param wordId: id of a word in the image
+        @return: the word
+        """
+        return str(self.blob[self.offset[wordId]:self.offset[wordId + 1]], 'utf-8')
+
+    def materialise(self) -> TernarySearchTreeDictionary:
+        """
+        copy the image into a TernarySearchTreeDictionary, which takes over from then on;
+        this rebuilds the whole tree, about 7 s for 200k words
+        @return: the tree
+        """
+        if self.tree == None:
+            self.tree = TernarySearchTreeDictionary(ac_size=self.ac_size)
+            self.tree.build_from_columns([self.word(i) for i in range(len(self.frequency))], self.frequency)
+        return self.tree
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes, replacing the image
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.tree = TernarySearchTreeDictionary(ac_size=self.ac_size)
+        self.tree.build_dictionary(words_frequencies)
+
+    def search_from_node(self, currNode: int, word: str) -> int:
+        """
+        walk down the mapped node table from currNode following the letters of word
+        @param currNode, word: index of the node to start from, the word to be searched
+        @return: the index of the node holding the last letter of word, NIL if there is none
+        """
+        if self.num_nodes == 0:
+            return NIL
+        letters, left, middle, right = self.letter, self.left, self.middle, self.right
+        lastIdx = len(word) - 1
+        currIdx = 0
+        currLetter = ord(word[0])
+        while currNode != NIL:
+            nodeLetter = letters[currNode]
+            if nodeLetter < currLetter:
+                currNode = right[currNode]
+            elif nodeLetter > currLetter:
+                currNode = left[currNode]
+            elif currIdx < lastIdx:
+                currNode = middle[currNode]
+                currIdx += 1
+                currLetter = ord(word[currIdx])
+            else:
+                return currNode
+        return NIL
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        if self.tree != None:
+            return self.tree.search(word)
+        endNode = self.search_from_node(0, word)
+        if endNode == NIL or self.word_id[endNode] == NIL:
+            return 0
+        return self.frequency[self.word_id[endNode]]
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        return self.materialise().add_word_frequency(word_frequency)
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        return self.materialise().delete_word(word)
+
+    def autocomplete(self, word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        if self.tree != None:
+            return self.tree.autocomplete(word)
+        currNode = self.search_from_node(0, word)
+        if currNode == NIL:
+            return []
+        start = currNode * self.ac_size
+        return [WordFrequency(self.word(wordId), self.frequency[wordId])
+                for wordId in self.top[start:start + self.ac_size] if wordId != NIL]
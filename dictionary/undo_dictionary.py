@@ -0,0 +1,130 @@
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Undo log that can wrap any dictionary implementation.
+#
+# Every successful add or delete records the operation undoing it, so that
+# rollback() brings the wrapped dictionary back to the words and frequencies
+# it held when the log was last cleared, without rebuilding it. Used to
+# replay several command files against one dictionary built once.
+# ------------------------------------------------------------------------
+
+class UndoLogDictionary(BaseDictionary):
+    def __init__(self, agent: BaseDictionary):
+        self.agent = agent      # the wrapped dictionary
+        self.undo_log = []      # ('A' or 'D', WordFrequency) undoing each successful change, oldest first
+
+    def rollback(self):
+        """
+        undo every change recorded since the log was last cleared, newest first, and clear the log
+        """
+        while self.undo_log:
+            command, entry = self.undo_log.pop()
+            if command == 'A':
+                self.agent.add_word_frequency(entry)
+            else:
+                self.agent.delete_word(entry.word)
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.undo_log.clear()
+        self.agent.build_dictionary(words_frequencies)
+
+    def build_from_columns(self, words: [str], frequencies: [int]):
+        """
+        construct the data structure from parallel columns, e.g. as returned by dictionary.loader.load_columns
+        @param words, frequencies: words to be stored and their frequencies
+        """
+        self.undo_log.clear()
+        self.agent.build_from_columns(words, frequencies)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.agent.search(word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: the frequency of each word, 0 for a word NOT found
+        """
+        return self.agent.search_many(words)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if self.agent.add_word_frequency(word_frequency):
+            self.undo_log.append(('D', word_frequency))
+            return True
+        return False
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        frequency = self.agent.search(word)
+        if self.agent.delete_word(word):
+            self.undo_log.append(('A', WordFrequency(word, frequency)))
+            return True
+        return False
+
+    def add_many(self, words_frequencies: [WordFrequency]) -> [bool]:
+        """
+        add a batch of words
+        @param words_frequencies: list of (word, frequency) to be added
+        @return: whether each addition succeeded, as if they were added one by one in batch order
+        """
+        results = self.agent.add_many(words_frequencies)
+        self.undo_log.extend([('D', word_frequency)
+                              for word_frequency, result in zip(words_frequencies, results) if result])
+        return results
+
+    def delete_many(self, words: [str]) -> [bool]:
+        """
+        delete a batch of words
+        @param words: words to be deleted
+        @return: whether each deletion succeeded, as if they were deleted one by one in batch order
+        """
+        frequencies = self.agent.search_many(words)
+        results = self.agent.delete_many(words)
+        self.undo_log.extend([('A', WordFrequency(word, frequency))
+                              for word, frequency, result in zip(words, frequencies, results) if result])
+        return results
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.agent.autocomplete(prefix_word)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes
+        @param prefix_words: the prefixes to be autocompleted
+        @return: the autocomplete list of each prefix
+        """
+        return self.agent.autocomplete_many(prefix_words)
+
+    def operation_cost(self, command: str, word: str) -> dict:
+        """
+        count the work an operation would do, without performing it, for InstrumentedDictionary
+        @param command, word: 'S', 'A', 'D' or 'AC', and the word or prefix it applies to
+        @return: the cost reported by the wrapped dictionary
+        """
+        return self.agent.operation_cost(command, word)
@@ -1,10 +1,27 @@
+import os
 import sys
+import getopt
+import json
+import cProfile
+import pstats
+import itertools
+import operator
 from dictionary.node import Node
 from dictionary.word_frequency import WordFrequency
 from dictionary.base_dictionary import BaseDictionary
 from dictionary.list_dictionary import ListDictionary
 from dictionary.hashtable_dictionary import HashTableDictionary
 from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.array_ternarysearchtree_dictionary import ArrayTernarySearchTreeDictionary
+from dictionary.radixtree_dictionary import RadixTreeDictionary
+from dictionary.dawg_dictionary import DawgDictionary
+from dictionary.columnar_dictionary import ColumnarDictionary
+from dictionary.cached_dictionary import CachedDictionary
+from dictionary.instrumented_dictionary import InstrumentedDictionary
+from dictionary.sharded_dictionary import ShardedDictionary
+from dictionary.loader import load_columns, LINE_SEPARATOR
+from dictionary.tst_snapshot import save_snapshot, is_snapshot_of, MappedTernarySearchTreeDictionary
+from dictionary.journal import MutationJournal, JournaledDictionary
 
 
 # -------------------------------------------------------------------
@@ -18,51 +35,300 @@ from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
 # __copyright__ = 'Copyright 2022, RMIT University'
 # -------------------------------------------------------------------
 
+# number of bytes of command lines read at once in batched mode
+BATCH_READ_SIZE = 1 << 20
+# key grouping consecutive lines of the same command: 'S ', 'A ', 'D ' or 'AC'
+COMMAND_KEY = operator.itemgetter(slice(0, 2))
+# number of tokens in a line of each command
+COMMAND_WIDTH = {'S': 2, 'A': 3, 'D': 2, 'AC': 2}
+# number of consecutive A or D commands from which they are applied with a single add_many or delete_many call
+BULK_RUN = 16
+
+
+def make_agent(approach: str) -> BaseDictionary:
+    """
+    @param approach: name of the implementation, see usage()
+    @return: an empty dictionary of that implementation, None if the name is unknown
+    """
+    if approach == 'list':
+        return ListDictionary()
+    elif approach == 'hashtable':
+        return HashTableDictionary()
+    elif approach == 'tst':
+        return TernarySearchTreeDictionary()
+    elif approach == 'arraytst':
+        return ArrayTernarySearchTreeDictionary()
+    elif approach == 'radix':
+        return RadixTreeDictionary()
+    elif approach == 'dawg':
+        return DawgDictionary()
+    elif approach == 'columnar':
+        return ColumnarDictionary()
+    return None
+
+
+def run_each(agent: BaseDictionary, command_file, output_file):
+    """
+    Execute a command file one line at a time, calling the single-word operation of each command.
+    """
+    for line in command_file:
+        command_values = line.split()
+        command = command_values[0]
+        # search
+        if command == 'S':
+            word = command_values[1]
+            search_result = agent.search(word)
+            if search_result > 0:
+                output_file.write(f"Found '{word}' with frequency {search_result}\n")
+            else:
+                output_file.write(f"NOT Found '{word}'\n")
+
+        # add
+        elif command == 'A':
+            word = command_values[1]
+            frequency = int(command_values[2])
+            word_frequency = WordFrequency(word, frequency)
+            if not agent.add_word_frequency(word_frequency):
+                output_file.write(f"Add '{word}' failed\n")
+            else:
+                output_file.write(f"Add '{word}' succeeded\n")
+
+        # delete
+        elif command == 'D':
+            word = command_values[1]
+            if not agent.delete_word(word):
+                output_file.write(f"Delete '{word}' failed\n")
+            else:
+                output_file.write(f"Delete '{word}' succeeded\n")
+
+        # check
+        elif command == 'AC':
+            word = command_values[1]
+            list_words = agent.autocomplete(word)
+            line = "Autocomplete for '" + word + "': [ "
+            for item in list_words:
+                line = line + item.word + ": " + str(item.frequency) + "  "
+            output_file.write(line + ']\n')
+
+        else:
+            print('Unknown command.')
+            print(line)
+
+
+def run_batched(agent: BaseDictionary, command_file, output_file):
+    """
+    Execute a command file block by block. Consecutive lines of the same command are
+    tokenised together, runs of S or AC commands are answered with a single search_many or
+    autocomplete_many call, long runs of A or D commands are applied with a single add_many or
+    delete_many call, and the output of each block is written at once.
+    """
+    while True:
+        lines = command_file.readlines(BATCH_READ_SIZE)
+        if not lines:
+            break
+        output = []
+        run_lines(agent, lines, output)
+        output_file.write(''.join(output))
+
+
+def run_lines(agent: BaseDictionary, lines: [str], output: [str], unknown_reply: str = None):
+    """
+    Execute command lines in order and append their output lines, grouping runs of the same command.
+    A line that is not a valid command, e.g. an add whose frequency is not an integer, is unknown.
+    @param agent, lines, output: dictionary to run against, command lines, list the output lines are appended to
+    @param unknown_reply: output line of an unknown command; None prints the command instead
+    """
+    for key, group in itertools.groupby(lines, key=COMMAND_KEY):
+        group = list(group)
+        text = ''.join(group)
+        if len(group) > 1 and LINE_SEPARATOR not in text:
+            # Every line break becomes a separator token, so that the tokens of a line cannot be paired with
+            # those of the next one: each line must be the command and its arguments followed by a separator
+            tokens = text.replace('\n', ' ' + LINE_SEPARATOR + ' ').split()
+            if not text.endswith('\n'):
+                tokens.append(LINE_SEPARATOR)
+            command = tokens[0]
+            width = COMMAND_WIDTH.get(command)
+            if (width != None and len(tokens) == (width + 1) * len(group)
+                    and tokens[width::width + 1].count(LINE_SEPARATOR) == len(group)
+                    and tokens[::width + 1].count(command) == len(group)):
+                del tokens[width::width + 1]
+                try:
+                    run_commands(agent, command, tokens, output)
+                    continue
+                except ValueError:
+                    # Raised before any command of the run is executed, which are then executed one at a time
+                    pass
+        # Otherwise execute one line at a time, e.g. for a single command, blank lines or extra tokens
+        for line in group:
+            command_values = line.split()
+            if not command_values:
+                continue
+            command = command_values[0]
+            width = COMMAND_WIDTH.get(command)
+            try:
+                if width != None and len(command_values) >= width:
+                    run_commands(agent, command, command_values[:width], output)
+                    continue
+            except ValueError:
+                pass
+            if unknown_reply != None:
+                output.append(unknown_reply)
+            else:
+                print('Unknown command.')
+                print(line)
+
+
+def run_commands(agent: BaseDictionary, command: str, tokens: [str], output: [str]):
+    """
+    Execute a run of the same command and append their output lines.
+    @param agent, command, tokens, output: tokens holds '<command> <word> [frequency]' for every command of the run
+    @raise ValueError: a frequency is not an integer, raised before any command is executed
+    """
+    if len(tokens) == 2 and command == 'S':
+        word = tokens[1]
+        search_result = agent.search(word)
+        if search_result > 0:
+            output.append(f"Found '{word}' with frequency {search_result}\n")
+        else:
+            output.append(f"NOT Found '{word}'\n")
+    elif len(tokens) == 2 and command == 'AC':
+        word = tokens[1]
+        output.append("Autocomplete for '" + word + "': [ "
+                      + ''.join([f"{item.word}: {item.frequency}  " for item in agent.autocomplete(word)]) + ']\n')
+    elif command == 'S':
+        words = tokens[1::2]
+        output.extend([f"Found '{word}' with frequency {search_result}\n" if search_result > 0
+                       else f"NOT Found '{word}'\n"
+                       for word, search_result in zip(words, agent.search_many(words))])
+    elif command == 'AC':
+        words = tokens[1::2]
+        output.extend(["Autocomplete for '" + word + "': [ "
+                       + ''.join([f"{item.word}: {item.frequency}  " for item in list_words]) + ']\n'
+                       for word, list_words in zip(words, agent.autocomplete_many(words))])
+    elif command == 'A' and len(tokens) >= 3 * BULK_RUN:
+        words = tokens[1::3]
+        results = agent.add_many(list(map(WordFrequency, words, list(map(int, tokens[2::3])))))
+        output.extend([f"Add '{word}' succeeded\n" if result else f"Add '{word}' failed\n"
+                       for word, result in zip(words, results)])
+    elif command == 'D' and len(tokens) >= 2 * BULK_RUN:
+        words = tokens[1::2]
+        output.extend([f"Delete '{word}' succeeded\n" if result else f"Delete '{word}' failed\n"
+                       for word, result in zip(words, agent.delete_many(words))])
+    elif command == 'A':
+        for word, frequency in zip(tokens[1::3], list(map(int, tokens[2::3]))):
+            if not agent.add_word_frequency(WordFrequency(word, frequency)):
+                output.append(f"Add '{word}' failed\n")
+            else:
+                output.append(f"Add '{word}' succeeded\n")
+    else:
+        for word in tokens[1::2]:
+            if not agent.delete_word(word):
+                output.append(f"Delete '{word}' failed\n")
+            else:
+                output.append(f"Delete '{word}' succeeded\n")
+
+
 def usage():
     """
     Print help/usage message.
     """
-    print('python3 dictionary_file_based.py', '<approach> [data fileName] [command fileName] [output fileName]')
-    print('<approach> = <list | hashtable | tst>')
+    print('python3 dictionary_file_based.py', '[-b] [-c cache size] [-s snapshot fileName] [-i stats fileName] [-p profile fileName] [-w number of shards] [-j journal fileName] [-f fsync batch] <approach> [data fileName] [command fileName] [output fileName]')
+    print('<approach> = <list | hashtable | tst | arraytst | radix | dawg | columnar>')
+    print('-b: batched mode, reading the command file in blocks and grouping runs of S, AC, A and D commands')
+    print('-c: cache up to <cache size> autocomplete results and print the cache counters')
+    print('-s: tst only, map the tree from the snapshot file if it was built from this version of the data file, '
+          'otherwise build the tree and write the snapshot; the first add or delete copies the mapped tree, '
+          'which costs as much as building it')
+    print('-i: write per-command latency percentiles and operation counters as JSON to <stats fileName>')
+    print('-p: profile the execution of the commands with cProfile and write the report to <profile fileName>')
+    print('-w: partition the words across <number of shards> worker processes, each holding a dictionary')
+    print('-j: replay the journal over the data file, then append every successful add and delete to it; '
+          'the journal is compacted into <journal fileName>.base in the background')
+    print('-f: with -j, write and fsync the journal once every <fsync batch> changes (default 64)')
     sys.exit(1)
 
 
 if __name__ == '__main__':
     # Fetch the command line arguments
-    args = sys.argv
+    try:
+        optList, remainArgs = getopt.gnu_getopt(sys.argv[1:], "bc:s:i:p:w:j:f:")
+    except getopt.GetoptError as err:
+        print(str(err))
+        usage()
+    args = [sys.argv[0]] + remainArgs
+
+    batched = False
+    cache_size = 0
+    snapshot_filename = None
+    stats_filename = None
+    profile_filename = None
+    num_shards = 0
+    journal_filename = None
+    sync_every = 64
+    for opt, arg in optList:
+        if opt == '-b':
+            batched = True
+        elif opt == '-c':
+            cache_size = int(arg)
+        elif opt == '-s':
+            snapshot_filename = arg
+        elif opt == '-i':
+            stats_filename = arg
+        elif opt == '-p':
+            profile_filename = arg
+        elif opt == '-w':
+            num_shards = int(arg)
+        elif opt == '-j':
+            journal_filename = arg
+        elif opt == '-f':
+            sync_every = int(arg)
 
     if len(args) != 5:
         print('Incorrect number of arguments.')
         usage()
 
     # initialise search agent
-    agent: BaseDictionary = None
-    if args[1] == 'list':
-        agent = ListDictionary()
-    elif args[1] == 'hashtable':
-        agent = HashTableDictionary()
-    elif args[1] == 'tst':
-        agent = TernarySearchTreeDictionary()
-    else:
+    agent: BaseDictionary = make_agent(args[1])
+    if agent == None:
         print('Incorrect argument value.')
         usage()
+    if snapshot_filename != None and (args[1] != 'tst' or num_shards > 0):
+        print('Snapshots are only supported by tst without shards.')
+        usage()
+    if num_shards > 0:
+        agent = ShardedDictionary(type(agent), num_shards)
 
     # read from data file to populate the initial set of points
     data_filename = args[2]
-    words_frequencies_from_file = []
+    journal = None
+    if journal_filename != None:
+        # Once compacted, the journal's base file replaces the data file
+        journal = MutationJournal(journal_filename, data_filename, sync_every)
+        data_filename = journal.base_filename()
     try:
-        data_file = open(data_filename, 'r')
-        for line in data_file:
-            values = line.split()
-            word = values[0]
-            frequency = int(values[1])
-            word_frequency = WordFrequency(word, frequency)  # each line contains a word and its frequency
-            words_frequencies_from_file.append(word_frequency)
-        data_file.close()
-        agent.build_dictionary(words_frequencies_from_file)
+        if snapshot_filename != None and is_snapshot_of(snapshot_filename, data_filename):
+            # the snapshot was built from this version of the data file, map it instead of rebuilding the tree
+            agent = MappedTernarySearchTreeDictionary(snapshot_filename)
+        else:
+            # each line contains a word and its frequency, loaded as a column of words and a column of frequencies
+            words_from_file, frequencies_from_file = load_columns(data_filename)
+            agent.build_from_columns(words_from_file, frequencies_from_file)
+            if snapshot_filename != None:
+                save_snapshot(agent, snapshot_filename, data_filename)
     except FileNotFoundError as e:
         print("Data file doesn't exist.")
         usage()
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    if journal != None:
+        journal.replay(agent)
+        agent = JournaledDictionary(agent, journal)
+    if cache_size > 0:
+        cache = agent = CachedDictionary(agent, cache_size)
+    if stats_filename != None:
+        instrumented = agent = InstrumentedDictionary(agent)
 
     command_filename = args[3]
     output_filename = args[4]
@@ -71,51 +337,24 @@ if __name__ == '__main__':
         command_file = open(command_filename, 'r')
         output_file = open(output_filename, 'w')
 
-        for line in command_file:
-            command_values = line.split()
-            command = command_values[0]
-            # search
-            if command == 'S':
-                word = command_values[1]
-                search_result = agent.search(word)
-                if search_result > 0:
-                    output_file.write(f"Found '{word}' with frequency {search_result}\n")
-                else:
-                    output_file.write(f"NOT Found '{word}'\n")
-
-            # add
-            elif command == 'A':
-                word = command_values[1]
-                frequency = int(command_values[2])
-                word_frequency = WordFrequency(word, frequency)
-                if not agent.add_word_frequency(word_frequency):
-                    output_file.write(f"Add '{word}' failed\n")
-                else:
-                    output_file.write(f"Add '{word}' succeeded\n")
-
-            # delete
-            elif command == 'D':
-                word = command_values[1]
-                if not agent.delete_word(word):
-                    output_file.write(f"Delete '{word}' failed\n")
-                else:
-                    output_file.write(f"Delete '{word}' succeeded\n")
-
-            # check
-            elif command == 'AC':
-                word = command_values[1]
-                list_words = agent.autocomplete(word)
-                line = "Autocomplete for '" + word + "': [ "
-                for item in list_words:
-                    line = line + item.word + ": " + str(item.frequency) + "  "
-                output_file.write(line + ']\n')
-
-            else:
-                print('Unknown command.')
-                print(line)
+        profiler = cProfile.Profile() if profile_filename != None else None
+        if profiler != None:
+            profiler.enable()
+        if batched:
+            run_batched(agent, command_file, output_file)
+        else:
+            run_each(agent, command_file, output_file)
 
+        if profiler != None:
+            profiler.disable()
+            with open(profile_filename, 'w') as profile_file:
+                pstats.Stats(profiler, stream=profile_file).sort_stats('cumulative').print_stats()
         output_file.close()
         command_file.close()
+        if journal != None:
+            journal.close()
+            if journal.error != None:
+                print(f"Journal compaction failed: {journal.error}")
 
         # Compare exp to actual
         expFileName = args[3][:-2] + "exp"
@@ -129,6 +368,12 @@ if __name__ == '__main__':
                 else:
                     print(f"FAILED - {expFileName} and {actualFileName} are different")
 
+        if cache_size > 0:
+            print(f"Autocomplete cache: {cache.stats()}")
+        if stats_filename != None:
+            with open(stats_filename, 'w') as stats_file:
+                json.dump(instrumented.stats(), stats_file, indent=2)
+
         # Print the dictionary
         # print("The contents of the dictionary are:")
         # print(agent)
@@ -0,0 +1,139 @@
+import sys
+import getopt
+import asyncio
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.cached_dictionary import CachedDictionary
+from dictionary.loader import load_columns
+from dictionary_file_based import make_agent, run_lines
+
+
+# -------------------------------------------------------------------
+# Autocomplete server speaking the command file protocol.
+# Clients send the same lines as a command file (S, A, D and AC) over TCP
+# or a Unix socket and receive the lines dictionary_file_based.py would
+# write to the output file, one response line per command, in order.
+#
+# Requests can be pipelined: everything that has arrived on a connection
+# is executed as one block, runs of the same command being grouped as in
+# the batched mode of the driver, and the responses are written at once.
+# All the connections share one dictionary served by a single event loop,
+# so every command sees the effect of the commands executed before it.
+# A line that is not a valid command, e.g. an add with a frequency that is
+# not an integer, is answered with "Unknown command." and the connection
+# stays open. Bytes that are not valid UTF-8 are decoded as U+FFFD. A
+# line longer than MAX_LINE_SIZE bytes is answered with "Unknown command."
+# and the connection is closed, so that a client never sending a line
+# break cannot make the server buffer without limit.
+#
+# python3 dictionary_server.py [-p port | -u socket fileName] [-c cache size] <approach> <data fileName>
+# -------------------------------------------------------------------
+
+# number of bytes read from a connection at once
+READ_SIZE = 1 << 16
+# number of bytes of an incomplete line after which the connection is closed
+MAX_LINE_SIZE = 1 << 16
+UNKNOWN_REPLY = 'Unknown command.\n'
+
+
+def usage():
+    """
+    Print help/usage message.
+    """
+    print('python3 dictionary_server.py', '[-p port | -u socket fileName] [-c cache size] <approach> <data fileName>')
+    print('<approach> = <list | hashtable | tst | arraytst | radix | dawg | columnar>')
+    print('-p: listen on TCP port <port> of localhost (default 7777)')
+    print('-u: listen on the Unix socket <socket fileName> instead')
+    print('-c: cache up to <cache size> autocomplete results')
+    sys.exit(1)
+
+
+def make_handler(agent: BaseDictionary):
+    """
+    @param agent: the dictionary shared by every connection
+    @return: the connection callback of asyncio.start_server
+    """
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        pending = b''
+        try:
+            while True:
+                chunk = await reader.read(READ_SIZE)
+                pending += chunk
+                # Execute the complete lines received so far and keep the partial last line for the next read,
+                # except at the end of the stream where the last line counts even without a line break
+                end = pending.rfind(b'\n') + 1 if chunk else len(pending)
+                if end > 0:
+                    lines = pending[:end].decode(errors='replace').splitlines(keepends=True)
+                    pending = pending[end:]
+                    output = []
+                    run_lines(agent, lines, output, UNKNOWN_REPLY)
+                    writer.write(''.join(output).encode())
+                    await writer.drain()
+                if not chunk:
+                    break
+                if len(pending) > MAX_LINE_SIZE:
+                    writer.write(UNKNOWN_REPLY.encode())
+                    await writer.drain()
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(agent: BaseDictionary, port: int, socket_filename: str):
+    """
+    accept connections until the process is interrupted
+    @param agent, port, socket_filename: dictionary to serve, TCP port, Unix socket used instead if not None
+    """
+    if socket_filename != None:
+        server = await asyncio.start_unix_server(make_handler(agent), path=socket_filename)
+    else:
+        server = await asyncio.start_server(make_handler(agent), host='127.0.0.1', port=port)
+    print('Serving on', ', '.join(str(sock.getsockname()) for sock in server.sockets), flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    try:
+        optList, args = getopt.gnu_getopt(sys.argv[1:], "p:u:c:")
+    except getopt.GetoptError as err:
+        print(str(err))
+        usage()
+
+    port = 7777
+    socket_filename = None
+    cache_size = 0
+    for opt, arg in optList:
+        if opt == '-p':
+            port = int(arg)
+        elif opt == '-u':
+            socket_filename = arg
+        elif opt == '-c':
+            cache_size = int(arg)
+
+    if len(args) != 2:
+        print('Incorrect number of arguments.')
+        usage()
+    agent = make_agent(args[0])
+    if agent == None:
+        print('Incorrect argument value.')
+        usage()
+
+    try:
+        agent.build_from_columns(*load_columns(args[1]))
+    except FileNotFoundError as e:
+        print("Data file doesn't exist.")
+        usage()
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    if cache_size > 0:
+        agent = CachedDictionary(agent, cache_size)
+
+    try:
+        asyncio.run(serve(agent, port, socket_filename))
+    except KeyboardInterrupt:
+        pass
@@ -10,11 +10,20 @@
 #
 # Usage, assuming you are in the directory where the test script "dictionary_test_script.py" is located.
 #
-# > python dictionary_test_script.py [-v] <codeDirectory> <name of implementation to test> <data filename> <list of input files to test on>
+# > python dictionary_test_script.py [-v] [-b] [-j number of workers] <codeDirectory> <name of implementation to test> <data filename> <list of input files to test on>
 #
 # options:
 #
 #    -v : verbose mode
+#    -b : batched mode, the command files are run by dictionary_file_based.py -b, which groups runs of the
+#       same command into batch calls, instead of one line at a time
+#    -j <number of workers> : parallel mode. The test files are replayed in-process on a pool of worker
+#       processes instead of spawning dictionary_file_based.py for each of them, through the same function
+#       of dictionary_file_based.py as the spawned program (one line at a time, or batched with -b). Every
+#       worker loads the data file once and builds each implementation at most once, rolling the dictionary
+#       back after each test file through UndoLogDictionary, which only records the changes and passes every
+#       call on. In this mode, several implementations can be given separated by commas, e.g. "list,tst",
+#       and test files of the same basename in different directories get distinct output files.
 #
 # Input:
 #
@@ -58,13 +67,18 @@ import re
 import sys
 import subprocess as sp
 import difflib
+import multiprocessing
+
+
+# state of a worker process in parallel mode: the columns of the data file and the dictionaries built so far
+workerState = {}
 
 
 def main():
     # process command line arguments
     try:
         # option list
-        sOptions = "v"
+        sOptions = "vbj:"
         # get options
         optList, remainArgs = getopt.gnu_getopt(sys.argv[1:], sOptions)
     except getopt.GetoptError as err:
@@ -72,10 +86,16 @@ def main():
         usage(sys.argv[0])
 
     bVerbose = False
+    bBatched = False
+    iWorkers = 0
 
     for opt, arg in optList:
         if opt == "-v":
             bVerbose = True
+        elif opt == "-b":
+            bBatched = True
+        elif opt == "-j":
+            iWorkers = int(arg)
         else:
             usage(sys.argv[0])
 
@@ -94,10 +114,16 @@ def main():
     lsInFile = remainArgs[3:]
 
     # check implementation
-    setValidImpl = set(["list", "hashtable", "tst"])
-    if sImpl not in setValidImpl:
-        print(sImpl + " is not a valid implementation name.")
-        sys.exit(1)
+    setValidImpl = set(["list", "hashtable", "tst", "arraytst", "radix", "dawg", "columnar"])
+    lsImpl = sImpl.split(",") if iWorkers > 0 else [sImpl]
+    for sImpl in lsImpl:
+        if sImpl not in setValidImpl:
+            print(sImpl + " is not a valid implementation name.")
+            sys.exit(1)
+
+    if iWorkers > 0:
+        mainParallel(bVerbose, bBatched, iWorkers, sOrigPath, sCodeDir, lsImpl, sDataFile, lsInFile)
+        return
 
     # python file to run
     sExec = "dictionary_file_based.py"
@@ -127,7 +153,8 @@ def main():
                 print(sExpectedFile + " is missing.")
                 continue
 
-            sCommand = 'python {sExec} {sImpl} "{sDataFile}" "{sInFile}" "{sOutputFile}"'.format(sExec=sExec,
+            sCommand = 'python {sExec} {sBatched}{sImpl} "{sDataFile}" "{sInFile}" "{sOutputFile}"'.format(sExec=sExec,
+                                                                                                 sBatched="-b " if bBatched else "",
                                                                                                  sImpl=sImpl,
                                                                                                  sDataFile=sDataFile,
                                                                                                  sInFile=sInFile,
@@ -165,6 +192,120 @@ def main():
     print("FAILED: " + ", ".join(lsTestFailed) + "\n")
 
 
+def mainParallel(bVerbose, bBatched, iWorkers, sOrigPath, sCodeDir, lsImpl, sDataFile, lsInFile):
+    """
+    Run every (implementation, test file) pair on a pool of worker processes, then evaluate the outputs.
+    """
+    sExec = "dictionary_file_based.py"
+    print('')
+    if not os.path.isfile(os.path.join(sCodeDir, sExec)):
+        print(sExec + " does not exists in directory.")
+        return
+    # checked here, as a worker failing to start would be restarted by the pool forever
+    if not os.path.isfile(sDataFile):
+        print(sDataFile + " does not exist.")
+        sys.exit(1)
+
+    # test names of the input files, made distinct when several share a basename so that their outputs do not clash
+    lsTestName = [os.path.splitext(os.path.basename(sInLoopFile))[0] for sInLoopFile in lsInFile]
+    lsTestName = [sTestName if lsTestName.count(sTestName) == 1 else sTestName + "-" + str(j + 1)
+                  for j, sTestName in enumerate(lsTestName)]
+
+    # (implementation, input file, output file, expected file, test name), grouped by implementation so that
+    # consecutive tasks handed to a worker tend to reuse the dictionary it already built
+    lsTask = []
+    for sImpl in lsImpl:
+        for sInLoopFile, sTestName in zip(lsInFile, lsTestName):
+            sInFile = os.path.join(sOrigPath, sInLoopFile)
+            sOutputFile = os.path.join(sCodeDir, sTestName + "-" + sImpl + ".out")
+            sExpectedFile = os.path.splitext(sInFile)[0] + ".exp"
+            # check if expected files exist
+            if not os.path.isfile(sExpectedFile):
+                print(sExpectedFile + " is missing.")
+                continue
+            lsTask.append((sImpl, bBatched, sInFile, sOutputFile, sExpectedFile, sTestName))
+
+    with multiprocessing.Pool(iWorkers, initializer=initWorker, initargs=(sCodeDir, sDataFile)) as pool:
+        lsError = pool.map(runInProcess, lsTask, chunksize=1)
+
+    for sImpl in lsImpl:
+        passedNum = 0
+        lsTestPassed = []
+        lsTestFailed = []
+        for (sTaskImpl, _, sInFile, sOutputFile, sExpectedFile, sTestName), sError in zip(lsTask, lsError):
+            if sTaskImpl != sImpl:
+                continue
+            if bVerbose:
+                print("Tested in-process: " + sImpl + " " + sInFile)
+            if sError:
+                lsTestFailed.append(sTestName)
+                if bVerbose:
+                    print("\nWarnings and error messages from running python program:\n" + sError)
+                continue
+            # compare expected with output
+            bPassed, bFailedOutput = evaluate(sExpectedFile, sOutputFile)
+            if bPassed:
+                passedNum += 1
+                lsTestPassed.append(sTestName)
+            else:
+                # print difference if failed
+                lsTestFailed.append(sTestName)
+                if bVerbose:
+                    for line in bFailedOutput:
+                        print(line)
+
+        print("\nSUMMARY: " + sExec + " (" + sImpl + ") has passed " + str(passedNum) + " out of " +
+              str(len(lsInFile)) + " tests.")
+        print("PASSED: " + ", ".join(lsTestPassed))
+        print("FAILED: " + ", ".join(lsTestFailed) + "\n")
+
+
+def initWorker(sCodeDir, sDataFile):
+    """
+    Make the code directory importable. The data file is loaded by the first task, so that an error
+    loading it is reported as the result of the task rather than killing the worker.
+    """
+    os.chdir(sCodeDir)
+    sys.path.insert(0, sCodeDir)
+    workerState['dataFile'] = sDataFile
+    workerState['agents'] = {}
+
+
+def runInProcess(task):
+    """
+    Replay a command file against the worker's dictionary of the implementation, building it on first use,
+    and roll the dictionary back to the content of the data file afterwards. The commands are run by the
+    same function of dictionary_file_based.py as in serial mode.
+    @return: an empty string, or the error raised while running the commands
+    """
+    import dictionary_file_based
+    from dictionary.loader import load_columns
+    from dictionary.undo_dictionary import UndoLogDictionary
+
+    sImpl, bBatched, sInFile, sOutputFile, sExpectedFile, sTestName = task
+    agents = workerState['agents']
+    try:
+        if 'columns' not in workerState:
+            workerState['columns'] = load_columns(workerState['dataFile'])
+        if sImpl not in agents:
+            agents[sImpl] = UndoLogDictionary(dictionary_file_based.make_agent(sImpl))
+            agents[sImpl].build_from_columns(*workerState['columns'])
+        agent = agents[sImpl]
+        try:
+            with open(sInFile, 'r') as fCommand, open(sOutputFile, 'w') as fOutput:
+                if bBatched:
+                    dictionary_file_based.run_batched(agent, fCommand, fOutput)
+                else:
+                    dictionary_file_based.run_each(agent, fCommand, fOutput)
+        finally:
+            agent.rollback()
+    except Exception as err:
+        # the dictionary may be left half updated, rebuild it for the next test file
+        agents.pop(sImpl, None)
+        return repr(err)
+    return ""
+
+
 ########################################################################################################################
 
 def evaluate(sExpectedFile, sOutputFile):
@@ -206,7 +347,11 @@ def evaluate(sExpectedFile, sOutputFile):
 
 def usage(sProg):
     print(
-        sProg + " [-v] <code directory> <name of implementation to test> <input data file> <list of test command files>")
+        sProg + " [-v] [-b] [-j number of workers] <code directory> <name of implementation to test> <input data file> <list of test command files>")
+    print("-v: verbose mode, print the differences of the failed tests")
+    print("-b: run the command files in batched mode (dictionary_file_based.py -b)")
+    print("-j: run the tests in-process on <number of workers> processes; the implementation can then be a "
+          "comma-separated list, e.g. list,tst")
     sys.exit(1)
 
 
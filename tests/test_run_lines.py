@@ -0,0 +1,50 @@
+import unittest
+from dictionary_file_based import make_agent, run_lines
+
+
+# -------------------------------------------------------------------
+# Regression tests of the grouped execution of command lines, which must
+# answer every line as dictionary_file_based.py does one line at a time.
+#
+# python3 -m unittest discover tests
+# -------------------------------------------------------------------
+
+UNKNOWN_REPLY = 'Unknown command.\n'
+
+
+class RunLinesTest(unittest.TestCase):
+    def setUp(self):
+        self.agent = make_agent('list')
+        self.agent.build_from_columns(['apple', 'banana'], [10, 20])
+
+    def run_lines(self, lines: [str]) -> [str]:
+        """
+        @param lines: command lines
+        @return: the output lines, an unknown command being answered with UNKNOWN_REPLY
+        """
+        output = []
+        run_lines(self.agent, lines, output, UNKNOWN_REPLY)
+        return output
+
+    def test_grouped_run(self):
+        self.assertEqual(self.run_lines(['S apple\n', 'S cherry\n', 'S banana']),
+                         ["Found 'apple' with frequency 10\n", "NOT Found 'cherry'\n",
+                          "Found 'banana' with frequency 20\n"])
+
+    def test_misaligned_lines(self):
+        # The tokens of the two lines have the count and layout of two adds, but neither line is 'A word frequency'
+        self.assertEqual(self.run_lines(['A y 5 A\n', 'A 3\n']), ["Add 'y' succeeded\n", UNKNOWN_REPLY])
+        self.assertEqual(self.agent.search('A'), 0)
+        self.assertEqual(self.agent.search('y'), 5)
+
+    def test_misaligned_searches(self):
+        self.assertEqual(self.run_lines(['S\n', 'S apple S\n']), [UNKNOWN_REPLY, "Found 'apple' with frequency 10\n"])
+
+    def test_bad_frequency(self):
+        self.assertEqual(self.run_lines(['A cherry 1\n', 'A date x\n', 'S cherry\n']),
+                         ["Add 'cherry' succeeded\n", UNKNOWN_REPLY, "Found 'cherry' with frequency 1\n"])
+        self.assertEqual(self.agent.search('date'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()